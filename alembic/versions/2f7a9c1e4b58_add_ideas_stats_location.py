@@ -0,0 +1,37 @@
+"""add ideas stats location
+
+Revision ID: 2f7a9c1e4b58
+Revises: 8d3b6f0a2e74
+Create Date: 2026-10-18 16:05:12.640318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f7a9c1e4b58'
+down_revision: Union[str, None] = '8d3b6f0a2e74'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('ideas', sa.Column('stats_plant_id', sa.Integer(), nullable=True))
+    op.add_column('ideas', sa.Column('stats_bu_id', sa.Integer(), nullable=True))
+
+    # The idea_stats rows were counted under the current plant and BU of the submitters
+    ideas = sa.table('ideas', sa.column('submitter_id', sa.Integer), sa.column('stats_plant_id', sa.Integer), sa.column('stats_bu_id', sa.Integer))
+    users = sa.table('users', sa.column('id', sa.Integer), sa.column('plant_id', sa.Integer), sa.column('bu_id', sa.Integer))
+
+    def submitter(column):
+        return sa.select(column).where(users.c.id == ideas.c.submitter_id).scalar_subquery()
+
+    op.execute(ideas.update().values(stats_plant_id=submitter(users.c.plant_id), stats_bu_id=submitter(users.c.bu_id)))
+
+
+def downgrade() -> None:
+    op.drop_column('ideas', 'stats_bu_id')
+    op.drop_column('ideas', 'stats_plant_id')
@@ -0,0 +1,55 @@
+"""add idea_stats summary
+
+Revision ID: 3e5d8f2b9c41
+Revises: 7b1e9d3c5a20
+Create Date: 2026-10-18 09:24:37.905114
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e5d8f2b9c41'
+down_revision: Union[str, None] = '7b1e9d3c5a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    idea_stats = op.create_table('idea_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('status', sa.Enum('created', 'rejected', 'approved', 'assigned', 'in progress', 'implemented', 'closed', name='ideastatus'), nullable=False),
+    sa.Column('plant_id', sa.Integer(), nullable=True),
+    sa.Column('bu_id', sa.Integer(), nullable=True),
+    sa.Column('idea_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('month', 'status', 'plant_id', 'bu_id', name='uq_idea_stats_month_status_plant_bu')
+    )
+
+    # Backfill from the existing ideas, same grouping as `python -m app.commands.rebuild_idea_stats`
+    ideas = sa.table('ideas', sa.column('created_at', sa.DateTime), sa.column('status', sa.String), sa.column('submitter_id', sa.Integer))
+    users = sa.table('users', sa.column('id', sa.Integer), sa.column('plant_id', sa.Integer), sa.column('bu_id', sa.Integer))
+    year, month = sa.extract('year', ideas.c.created_at), sa.extract('month', ideas.c.created_at)
+    statement = (
+        sa.select(year, month, ideas.c.status, users.c.plant_id, users.c.bu_id, sa.func.count())
+        .select_from(ideas.outerjoin(users, users.c.id == ideas.c.submitter_id))
+        .where(ideas.c.created_at.is_not(None), ideas.c.status.is_not(None))
+        .group_by(year, month, ideas.c.status, users.c.plant_id, users.c.bu_id)
+    )
+    counts = {}
+    for row_year, row_month, status, plant_id, bu_id, count in op.get_bind().execute(statement):
+        key = (date(int(row_year), int(row_month), 1), status, plant_id, bu_id)
+        counts[key] = counts.get(key, 0) + count
+    op.bulk_insert(idea_stats, [
+        {'month': month, 'status': status, 'plant_id': plant_id, 'bu_id': bu_id, 'idea_count': count}
+        for (month, status, plant_id, bu_id), count in counts.items()
+    ])
+
+
+def downgrade() -> None:
+    op.drop_table('idea_stats')
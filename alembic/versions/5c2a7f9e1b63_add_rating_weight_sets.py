@@ -0,0 +1,52 @@
+"""add rating weight sets
+
+Revision ID: 5c2a7f9e1b63
+Revises: 9a4c6e1f7d32
+Create Date: 2026-10-18 10:02:48.671354
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2a7f9e1b63'
+down_revision: Union[str, None] = '9a4c6e1f7d32'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    rating_weight_sets = op.create_table('rating_weight_sets',
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+    sa.Column('quality', sa.Float(), nullable=False),
+    sa.Column('cost_reduction', sa.Float(), nullable=False),
+    sa.Column('time_savings', sa.Float(), nullable=False),
+    sa.Column('ehs', sa.Float(), nullable=False),
+    sa.Column('initiative', sa.Float(), nullable=False),
+    sa.Column('creativity', sa.Float(), nullable=False),
+    sa.Column('transversalization', sa.Float(), nullable=False),
+    sa.Column('effectiveness', sa.Float(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('activated_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+
+    # Equal weights: the scores computed so far (plain sum of the criteria) stay valid
+    now = datetime.now()
+    op.bulk_insert(rating_weight_sets, [{
+        'name': 'Default', 'quality': 1, 'cost_reduction': 1, 'time_savings': 1, 'ehs': 1,
+        'initiative': 1, 'creativity': 1, 'transversalization': 1, 'effectiveness': 1,
+        'is_active': True, 'activated_at': now, 'created_at': now,
+    }])
+
+
+def downgrade() -> None:
+    op.drop_table('rating_weight_sets')
@@ -0,0 +1,46 @@
+"""add rescore jobs
+
+Revision ID: 6e1b3d8f2a95
+Revises: 2f7a9c1e4b58
+Create Date: 2026-10-18 17:32:48.207163
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e1b3d8f2a95'
+down_revision: Union[str, None] = '2f7a9c1e4b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('rescore_jobs',
+    sa.Column('id', sqlmodel.sql.sqltypes.AutoString(length=32), nullable=False),
+    sa.Column('weight_set_id', sa.Integer(), nullable=False),
+    sa.Column('status', sqlmodel.sql.sqltypes.AutoString(length=16), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('processed', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=True),
+    sa.Column('error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # One pending or running job at a time, across the workers
+    op.create_index(
+        'ux_rescore_jobs_active', 'rescore_jobs', ['is_active'], unique=True,
+        mssql_where=sa.text('is_active = 1'), sqlite_where=sa.text('is_active = 1')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ux_rescore_jobs_active', table_name='rescore_jobs')
+    op.drop_table('rescore_jobs')
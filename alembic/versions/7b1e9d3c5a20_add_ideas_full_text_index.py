@@ -0,0 +1,45 @@
+"""add ideas full-text index
+
+Revision ID: 7b1e9d3c5a20
+Revises: c4f2a48e9097
+Create Date: 2026-10-18 09:05:12.418230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b1e9d3c5a20'
+down_revision: Union[str, None] = 'c4f2a48e9097'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Full-text indexes only exist on SQL Server, the search falls back to LIKE elsewhere
+CATALOG = 'ideas_catalog'
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'mssql':
+        return
+    # Full-text statements can't run inside a user transaction
+    with op.get_context().autocommit_block():
+        key_index = op.get_bind().execute(sa.text(
+            "SELECT name FROM sys.key_constraints WHERE type = 'PK' AND parent_object_id = OBJECT_ID('ideas')"
+        )).scalar_one()
+        op.execute(f"CREATE FULLTEXT CATALOG {CATALOG}")
+        op.execute(
+            f"CREATE FULLTEXT INDEX ON ideas (title, description, actual_situation) "
+            f"KEY INDEX [{key_index}] ON {CATALOG} WITH CHANGE_TRACKING AUTO"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'mssql':
+        return
+    with op.get_context().autocommit_block():
+        op.execute("DROP FULLTEXT INDEX ON ideas")
+        op.execute(f"DROP FULLTEXT CATALOG {CATALOG}")
@@ -0,0 +1,27 @@
+"""add users token version
+
+Revision ID: 8d3b6f0a2e74
+Revises: 5c2a7f9e1b63
+Create Date: 2026-10-18 14:12:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3b6f0a2e74'
+down_revision: Union[str, None] = '5c2a7f9e1b63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Tokens issued before carry no version and are taken as version 0
+    op.add_column('users', sa.Column('token_version', sa.Integer(), nullable=False, server_default=sa.text('0')))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version', mssql_drop_default=True)
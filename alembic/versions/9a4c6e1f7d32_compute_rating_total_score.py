@@ -0,0 +1,31 @@
+"""compute rating total score
+
+Revision ID: 9a4c6e1f7d32
+Revises: 3e5d8f2b9c41
+Create Date: 2026-10-18 09:41:03.226719
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4c6e1f7d32'
+down_revision: Union[str, None] = '3e5d8f2b9c41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Scores were sent by the clients: recompute them from the criteria
+    op.execute(
+        "UPDATE rating_matrices SET total_score = quality + cost_reduction + time_savings + ehs"
+        " + initiative + creativity + transversalization + effectiveness"
+    )
+    op.create_index('ix_rating_matrices_total_score_id', 'rating_matrices', ['total_score', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_rating_matrices_total_score_id', table_name='rating_matrices')
@@ -1 +1 @@
-from .base_router import BaseRouter
\ No newline at end of file
+from .base_router import BaseRouter, REFERENCE_CACHE_CONTROL
\ No newline at end of file
@@ -1,16 +1,40 @@
-from typing import Type, Generic, Dict, List, Annotated
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from datetime import datetime
+from typing import Type, Generic, Dict, List, Annotated, Optional, Set, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response as HTTPResponse
+from fastapi.responses import StreamingResponse
 from pydantic import ValidationError
-from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError, OperationalError
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
-from app.db.dependencies import SessionDep
+from app.core.config import get_settings
+from app.db.base import open_streaming_session
+from app.db.dependencies import DBSessionDep, ReadSessionDep
+from app.db.replicas import written_since, observe_versions
+from app.db.invalidation import table_versions, versions_cover_workers
 from app.db.crud_repository import CRUDBaseRepository
-from app.schemas import Response, ResponseWithPagination
+from app.db.async_crud_repository import AsyncCRUDBaseRepository
+from app.schemas import Response, ResponseWithPagination, ItemEnvelope, PageEnvelope
 from app.api.base_router.shared import ModelType, RequestType, ResponseType
-from app.schemas import PatchDeleteReq
+from app.schemas import PatchDeleteReq, BatchResult, BatchConflict
 from app.utils.exceptions import CustomHTTPException
 from app.utils.exceptions.db import transaction_failed
-from app.utils.database import parse_filters
+from app.utils.database import parse_filters, encode_cursor, decode_cursor, split_fieldset, build_view_model, build_read_tables, filter_tables
+from app.utils.conditional_requests import make_etag, etag_matches, http_date, not_modified_since
+from app.utils.responses import envelope_adapter, render_envelope
+from app.utils.exports import EXPORT_MEDIA_TYPES, ndjson_chunks, csv_chunks
+
+
+# Query parameters consumed by the list endpoints, never treated as filters
+RESERVED_PARAMS = ('page', 'items_per_page', 'after', 'before', 'fields', 'expand', 'include_total', 'format')
+
+# Read responses carry an ETag, clients revalidate them before reuse
+DEFAULT_CACHE_CONTROL = 'no-cache'
+# Reference lists (roles, BUs, plants) can be reused for a minute without asking
+REFERENCE_CACHE_CONTROL = 'private, max-age=60'
+
+FieldsQuery = Annotated[Optional[str], Query(description="Comma separated fields to return, e.g. `id,title,status`")]
+ExpandQuery = Annotated[Optional[str], Query(description="Comma separated relationships to include, e.g. `submitter,comments`")]
 
 
 async def validate_request_type(request_type, data: Dict) -> RequestType:
@@ -29,13 +53,20 @@ class BaseRouter(Generic[ModelType, ResponseType]):
         self,
         request_type: Type[RequestType],
         response_type: Type[ResponseType],
-        repository: CRUDBaseRepository[ModelType, ResponseType]
+        repository: CRUDBaseRepository[ModelType, ResponseType],
+        cache_control: str = DEFAULT_CACHE_CONTROL
     ):
         self.repository = repository
+        self.cache_control = cache_control
+        self.async_repository = AsyncCRUDBaseRepository(repository)
         self.model_name = repository.model.__name__
 
         self.request_type = request_type
         self.response_type = response_type
+        # Serializers of the envelopes, compiled once instead of on every response
+        self.item_adapter = envelope_adapter(ItemEnvelope, response_type)
+        self.list_adapter = envelope_adapter(ItemEnvelope, List[response_type])
+        self.page_adapter = envelope_adapter(PageEnvelope, response_type)
         self.router = APIRouter()
 
         self.setup_routes()
@@ -50,6 +81,14 @@ class BaseRouter(Generic[ModelType, ResponseType]):
             name=f'Register a new {self.model_name}'
         )
 
+        self.router.add_api_route(
+            path="/batch",
+            endpoint=self.register_items,
+            methods=["POST"],
+            response_model=Response[BatchResult],
+            name=f'Register or upsert {self.model_name}s in batch'
+        )
+
         self.router.add_api_route(
             path="/all",
             endpoint=self.all_items,
@@ -57,6 +96,14 @@ class BaseRouter(Generic[ModelType, ResponseType]):
             response_model=Response[self.response_type],
             name=f'All {self.model_name}s'
         )
+
+        self.router.add_api_route(
+            path="/export",
+            endpoint=self.export_items,
+            methods=["GET"],
+            response_class=StreamingResponse,
+            name=f'Export {self.model_name}s'
+        )
         
         self.router.add_api_route(
             path="",
@@ -99,65 +146,290 @@ class BaseRouter(Generic[ModelType, ResponseType]):
         )
     
     
+    async def _run(self, db, method: str, **kwargs):
+        """
+        Call a repository method on the request session: awaited through the async
+        repository for an AsyncSession, run in the threadpool for a blocking Session.
+        Methods of specialized repositories run on the AsyncSession through `run_sync`.
+        """
+        if isinstance(db, AsyncSession):
+            if hasattr(self.async_repository, method):
+                return await getattr(self.async_repository, method)(db=db, **kwargs)
+            return await self.async_repository.run(db, getattr(self.repository, method), **kwargs)
+        return await run_in_threadpool(getattr(self.repository, method), db=db, **kwargs)
+
+
+    async def _read_session(self, db, replica, tables: Set[str]):
+        """
+        Session serving a read: the replica, unless none is configured, it can't be reached,
+        or one of the tables behind the response was written within the staleness window.
+        """
+        if replica is None:
+            return db
+        if written_since(tables, get_settings().DB.REPLICA_MAX_STALENESS):
+            return db
+        try:
+            await run_in_threadpool(replica.connection)
+        except OperationalError:
+            return db
+        return replica
+
+
+    def _read_tables(self, view=None, filters=None) -> Set[str]:
+        """
+        Tables behind a read response: those serialized by the (sparse) response model and those filtered on.
+        """
+        tables = set(build_read_tables(self.repository.model, view or self.response_type))
+        if filters:
+            tables |= filter_tables(self.repository.model, filters)
+        return tables
+
+
+    def _etag(self, tables: Set[str], *parts) -> Optional[str]:
+        """
+        ETag of a response built from `tables`, changing with the version of any of them
+        on the invalidation channel. None when the versions can't be known, or miss the
+        writes of other workers.
+        """
+        if not versions_cover_workers():
+            return None
+        versions = table_versions(tables)
+        if versions is None:
+            return None
+        observe_versions(versions[1])
+        return make_etag(self.repository.model.__tablename__, versions, *parts)
+
+
+    def _last_modified(self, item, tables: Set[str]) -> Optional[datetime]:
+        """
+        Last modification of an item whose response only comes from its own row.
+        """
+        if tables != {self.repository.model.__tablename__}:
+            return None
+        loaded = item.__dict__
+        return loaded.get('updated_at') or loaded.get('created_at')
+
+
+    def _cache_headers(self, etag: Optional[str], last_modified: Optional[datetime] = None) -> Dict[str, str]:
+        headers = {'Cache-Control': self.cache_control}
+        if etag:
+            headers['ETag'] = etag
+        if last_modified:
+            headers['Last-Modified'] = http_date(last_modified)
+        return headers
+
+
+    @staticmethod
+    async def _rollback(db) -> None:
+        if isinstance(db, AsyncSession):
+            await db.rollback()
+        else:
+            await run_in_threadpool(db.rollback)
+
+
     async def all_items(
         self,
-        db: SessionDep
+        db: DBSessionDep,
+        read_db: ReadSessionDep,
+        request: Request
     ):
-        items = self.repository.find_all(db=db)
+        tables = self._read_tables()
+        etag = self._etag(tables, 'all')
+        if etag and etag_matches(request.headers.get('if-none-match'), etag):
+            return HTTPResponse(status_code=304, headers=self._cache_headers(etag))
+        
+        items = await self._run(await self._read_session(db, read_db, tables), 'find_all')
         
         if not items:
             raise CustomHTTPException.no_items_found(self.model_name)
             
-        return Response[List[self.response_type]](
-            data=items
+        return render_envelope(self.list_adapter, headers=self._cache_headers(etag), data=items)
+
+
+
+    async def export_items(
+        self,
+        request: Request,
+        format: Annotated[Literal['ndjson', 'csv'], Query(description="`ndjson`: one JSON object per line, `csv`: header line then rows")]='ndjson'
+    ):
+        # Same filters as the paginated listing, validated before the response starts
+        query_params = dict(request.query_params)
+        for param in RESERVED_PARAMS:
+            query_params.pop(param, None)
+        filters = parse_filters(query_params, self.repository.model)
+        
+        # The body is sent after the request session is closed: it streams from its own session
+        columns = self.repository.export_columns
+        tables = {self.repository.model.__tablename__} | (filter_tables(self.repository.model, filters) if filters else set())
+        session = open_streaming_session(
+            use_replica=not written_since(tables, get_settings().DB.REPLICA_MAX_STALENESS)
+        )
+        
+        def body():
+            try:
+                batches = self.repository.stream_rows(db=session, columns=columns, filters=filters)
+                yield from (ndjson_chunks if format == 'ndjson' else csv_chunks)(columns, batches)
+            finally:
+                session.close()
+        
+        return StreamingResponse(
+            body(),
+            media_type=EXPORT_MEDIA_TYPES[format],
+            headers={'Content-Disposition': f'attachment; filename="{self.repository.model.__tablename__}.{format}"'}
         )
 
         
     async def all_items_with_pagination(
         self,
-        db: SessionDep,
+        db: DBSessionDep,
+        read_db: ReadSessionDep,
         request: Request,
         page: Annotated[int, Query(ge=1, description="Page number starting from 1")]=1,
         items_per_page: Annotated[int, Query(ge=1, description="Number of items per page")]=25,
+        after: Annotated[Optional[str], Query(description="Cursor of the last item seen, switches to keyset pagination")]=None,
+        before: Annotated[Optional[str], Query(description="Cursor of the first item seen, switches to keyset pagination")]=None,
+        fields: FieldsQuery=None,
+        expand: ExpandQuery=None,
+        include_total: Annotated[bool, Query(
+            description="Set to false to skip counting the matching items (pages reached through a cursor are never counted)"
+        )]=True,
     ):
-        offset = (page - 1) * items_per_page
+        view = self._resolve_view(fields, expand)
+        options = self.repository.view_options(view) if view else None
         
-        # Extract all query parameters except `page` and `items_per_page`
+        # Extract all query parameters except the reserved ones
         query_params = dict(request.query_params)
-        query_params.pop("page", None)
-        query_params.pop("items_per_page", None)
+        for param in RESERVED_PARAMS:
+            query_params.pop(param, None)
         
         # Apply filters if any query parameters are provided
-        filters = parse_filters(query_params)
-        if filters:
-            total_items = self.repository.count_with_filters(db=db, filters=filters)
-            items = self.repository.find_paginated_with_filters(db, offset=offset, limit=items_per_page, filters=filters)
+        filters = parse_filters(query_params, self.repository.model)
+        
+        # Unchanged tables give an unchanged page: answer without querying
+        tables = self._read_tables(view, filters)
+        etag = self._etag(tables, sorted(request.query_params.multi_items()))
+        if etag and etag_matches(request.headers.get('if-none-match'), etag):
+            return HTTPResponse(status_code=304, headers=self._cache_headers(etag))
+        db = await self._read_session(db, read_db, tables)
+
+        total_items = None
+        next_cursor = previous_cursor = None
+        if after is not None or before is not None:
+            after_id = self._decode_cursor('after', after)
+            before_id = self._decode_cursor('before', before)
+            
+            # Fetch one extra row to know whether there is another page in that direction
+            items = await self._run(
+                db, 'find_keyset', limit=items_per_page + 1, filters=filters, after=after_id, before=before_id, options=options
+            )
+            has_more = len(items) > items_per_page
+            if before_id is not None:
+                items = items[-items_per_page:]
+                if items:
+                    next_cursor = encode_cursor([items[-1].id])
+                    previous_cursor = encode_cursor([items[0].id]) if has_more else None
+            else:
+                items = items[:items_per_page]
+                if items:
+                    next_cursor = encode_cursor([items[-1].id]) if has_more else None
+                    previous_cursor = encode_cursor([items[0].id]) if after_id is not None else None
+            # No page number and no total: a client walking the cursors got the total with the first page,
+            # counting again on every page would cost as much as the offsets keyset pagination avoids
+            page = None
         else:
-            total_items = self.repository.count_all(db=db)
-            items = self.repository.find_paginated(db, offset=offset, limit=items_per_page)
+            offset = (page - 1) * items_per_page
+            if filters and include_total:
+                # The total comes back with the page, in the same statement
+                items, total_items = await self._run(
+                    db, 'find_paginated_with_total', offset=offset, limit=items_per_page, filters=filters, options=options
+                )
+            elif filters:
+                items = await self._run(db, 'find_paginated_with_filters', offset=offset, limit=items_per_page, filters=filters, options=options)
+            else:
+                items = await self._run(db, 'find_paginated', offset=offset, limit=items_per_page, options=options)
+                if include_total and items:
+                    total_items = await self._run(db, 'count_all_cached')
+            if items:
+                next_cursor = encode_cursor([items[-1].id]) if len(items) == items_per_page else None
+                previous_cursor = encode_cursor([items[0].id]) if page > 1 else None
             
         if not items:
             raise CustomHTTPException.no_items_found(self.model_name)
             
-        return ResponseWithPagination[self.response_type](
-            content=items if items else None,
+        return render_envelope(
+            envelope_adapter(PageEnvelope, view) if view else self.page_adapter,
+            headers=self._cache_headers(etag),
+            content=items,
             page=page,
-            total=total_items 
+            total=total_items,
+            next_cursor=next_cursor,
+            previous_cursor=previous_cursor
         )
 
 
-    async def read_item_by_id(self, resource_id: int, db: SessionDep):
-        item = self.repository.find_by_id(db=db, model_id=resource_id)
+    def _resolve_view(self, fields: Optional[str], expand: Optional[str]):
+        """
+        Build the sparse view of self.response_type requested through `fields`/`expand`.
+        Returns None when the full response model is requested.
+        """
+        if not fields and not expand:
+            return None
+        try:
+            return build_view_model(self.response_type, split_fieldset(fields), split_fieldset(expand))
+        except ValueError:
+            raise CustomHTTPException.invalid_query_parameter('fields' if fields else 'expand')
+
+
+    @staticmethod
+    def _decode_cursor(parameter: str, cursor: Optional[str]) -> Optional[int]:
+        """
+        Decode an `after`/`before` cursor into the primary key it points to.
+        """
+        if cursor is None:
+            return None
+        sort_key = decode_cursor(cursor)
+        if not sort_key or not isinstance(sort_key[0], int) or isinstance(sort_key[0], bool):
+            raise CustomHTTPException.invalid_query_parameter(parameter)
+        return sort_key[0]
+
+
+    async def read_item_by_id(
+        self,
+        resource_id: int,
+        db: DBSessionDep,
+        read_db: ReadSessionDep,
+        request: Request,
+        fields: FieldsQuery=None,
+        expand: ExpandQuery=None,
+    ):
+        view = self._resolve_view(fields, expand)
+        options = self.repository.view_options(view) if view else None
+        
+        tables = self._read_tables(view)
+        etag = self._etag(tables, resource_id, fields, expand)
+        if_none_match = request.headers.get('if-none-match')
+        if etag and etag_matches(if_none_match, etag):
+            return HTTPResponse(status_code=304, headers=self._cache_headers(etag))
+        db = await self._read_session(db, read_db, tables)
+        
+        item = await self._run(db, 'find_by_id', model_id=resource_id, options=options)
         if not item:
             raise CustomHTTPException.item_not_found(self.model_name)
-            
-        return Response[self.response_type](data=item)
+        
+        # If-Modified-Since is only evaluated without If-None-Match (RFC 9110)
+        last_modified = self._last_modified(item, tables)
+        headers = self._cache_headers(etag, last_modified)
+        if last_modified and not if_none_match and not_modified_since(request.headers.get('if-modified-since'), last_modified):
+            return HTTPResponse(status_code=304, headers=headers)
+        
+        adapter = envelope_adapter(ItemEnvelope, view) if view else self.item_adapter
+        return render_envelope(adapter, headers=headers, data=item)
     
     
     async def register_item(
         self,
         item_to_save: Dict,
-        db: SessionDep,
+        db: DBSessionDep,
         internal_kwargs: dict = Depends(lambda: {})
     ):
         # Validate the input against self.request_type
@@ -170,25 +442,71 @@ class BaseRouter(Generic[ModelType, ResponseType]):
             raise ValueError("Item to save cannot be empty")
 
         try:
-            db.begin()
-            saved_item = self.repository.insert_line(data=validated_item, db=db)
+            saved_item = await self._run(db, 'insert_line', data=validated_item)
         except IntegrityError:
-            db.rollback()
+            await self._rollback(db)
             raise CustomHTTPException.unique_constraint_violation(self.model_name)
 
         except SQLAlchemyError:
-            db.rollback()
+            await self._rollback(db)
             raise transaction_failed
         else:
-            db.commit()
-            return Response[self.response_type](data=saved_item)
+            return render_envelope(self.item_adapter, data=saved_item)
+    
+    
+    def _batch_request_type(self, upsert: bool) -> Type[RequestType]:
+        """
+        Model the rows of a batch are validated against.
+        """
+        return self.request_type
+    
+    async def _prepare_batch_items(self, items: List) -> List:
+        """
+        Turn the validated rows of a batch into the models written by the repository, in the same order.
+        """
+        return items
+    
+    async def register_items(
+        self,
+        items_to_save: List[Dict],
+        db: DBSessionDep,
+        upsert: Annotated[bool, Query(description="Update the rows matching the natural key instead of rejecting them")]=False
+    ):
+        if upsert and not self.repository.natural_key:
+            raise CustomHTTPException.operation_not_supported('upsert', self.model_name)
+        
+        # Validate every row, remembering its position in the body
+        request_type = self._batch_request_type(upsert)
+        positions, validated_items, conflicts = [], [], []
+        for index, data in enumerate(items_to_save):
+            try:
+                validated_items.append(request_type(**data))
+                positions.append(index)
+            except ValidationError as e:
+                conflicts.append(BatchConflict(index=index, detail=e.errors(include_url=False, include_context=False)))
+        validated_items = await self._prepare_batch_items(validated_items)
+        
+        try:
+            if upsert:
+                result = await self._run(db, 'upsert_many', data=validated_items)
+            else:
+                result = await self._run(db, 'insert_many', data=validated_items)
+        except SQLAlchemyError:
+            await self._rollback(db)
+            raise transaction_failed
+        
+        for conflict in result.conflicts:
+            conflict.index = positions[conflict.index]
+        result.conflicts = sorted(conflicts + result.conflicts, key=lambda conflict: conflict.index)
+        
+        return Response[BatchResult](data=result)
     
     
     async def update_item_by_id(
         self,
         resource_id: int,
         resource_to_update: Dict,
-        db: SessionDep,
+        db: DBSessionDep,
         internal_kwargs: dict = Depends(lambda: {})
     ):
         if not resource_to_update:
@@ -196,8 +514,9 @@ class BaseRouter(Generic[ModelType, ResponseType]):
 
         try:
             
-            updated_resource = self.repository.find_by_id_and_update(
-                db=db,
+            updated_resource = await self._run(
+                db,
+                'find_by_id_and_update',
                 model_id=resource_id,
                 data=resource_to_update,
             )
@@ -205,15 +524,14 @@ class BaseRouter(Generic[ModelType, ResponseType]):
                 raise CustomHTTPException.item_not_found(self.model_name)
                 
         except SQLAlchemyError as e:
-            db.rollback()
+            await self._rollback(db)
             raise transaction_failed
         else:
-            db.commit()
-            return Response[self.response_type](data=updated_resource)
+            return render_envelope(self.item_adapter, data=updated_resource)
     
     
-    async def delete_item_by_id(self, resource_id: int, db: SessionDep, internal_kwargs: dict = Depends(lambda: {})):
-        deleted_item = self.repository.delete_by_id(db=db, model_id=resource_id)
+    async def delete_item_by_id(self, resource_id: int, db: DBSessionDep, internal_kwargs: dict = Depends(lambda: {})):
+        deleted_item = await self._run(db, 'delete_by_id', model_id=resource_id)
         if not deleted_item:
             raise CustomHTTPException.item_not_found(self.model_name)
             
@@ -222,12 +540,12 @@ class BaseRouter(Generic[ModelType, ResponseType]):
         )
 
 
-    async def delete_items_by_ids(self, patch_delete_Req: PatchDeleteReq, db: SessionDep):
+    async def delete_items_by_ids(self, patch_delete_Req: PatchDeleteReq, db: DBSessionDep):
         if patch_delete_Req is None:
             raise CustomHTTPException.item_not_found(self.model_name)
 
-        deleted_items = self.repository.delete_by_ids(db=db, ids=patch_delete_Req.ids)
-        if not deleted_items:
+        deleted_ids = await self._run(db, 'delete_by_ids', ids=patch_delete_Req.ids)
+        if not deleted_ids:
             raise CustomHTTPException.item_not_found(self.model_name)
 
-        return Response(message='Deleted successfully')
\ No newline at end of file
+        return Response(message='Deleted successfully', data=deleted_ids)
\ No newline at end of file
@@ -0,0 +1,36 @@
+import os
+from typing import List
+from fastapi import APIRouter
+
+from app.core.dpendencies import CurrentUserDep
+from app.db.base import engine, async_engine
+from app.db.pool import pool_status
+from app.db.reference_cache import reference_cache
+from app.schemas import Response, PoolStatus, ReferenceCacheStatus
+
+router = APIRouter()
+
+
+@router.get('/pool', response_model=Response[List[PoolStatus]])
+async def read_pool_status(current_user: CurrentUserDep):
+    """
+    Connection pool occupancy and checkout wait times of the worker serving the request.
+    """
+    engines = {'sync': engine, 'async': async_engine.sync_engine if async_engine else None}
+    pools = [
+        PoolStatus(engine=name, pid=os.getpid(), **pool_status(pool_engine.pool))
+        for name, pool_engine in engines.items() if pool_engine is not None
+    ]
+    return Response[List[PoolStatus]](data=pools)
+
+
+@router.get('/reference-cache', response_model=Response[List[ReferenceCacheStatus]])
+async def read_reference_cache_status(current_user: CurrentUserDep):
+    """
+    Hit/miss counters and snapshot sizes of the reference table cache of the worker serving the request.
+    """
+    tables = [
+        ReferenceCacheStatus(table=table, pid=os.getpid(), **statistics)
+        for table, statistics in reference_cache.statistics().items()
+    ]
+    return Response[List[ReferenceCacheStatus]](data=tables)
\ No newline at end of file
@@ -56,7 +56,7 @@ class AssignmentRouter(BaseRouter[AssignmentModel, Assignment]):
                 for user in users:
                     assignment.assignees.append(user)
 
-                db.commit()
+                db.flush()
                 
                 return Response[self.response_type](data=assignment)
             
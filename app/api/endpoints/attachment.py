@@ -4,9 +4,10 @@ from fastapi import Depends
 from app.db.models import AttachmentModel, Attachment, AttachmentCreate
 from app.api.base_router import BaseRouter
 from app.db.dependencies import SessionDep
+from app.db.unit_of_work import after_commit
 from app.db.repositories import AttachmentRepository
 from app.utils.upload_strategies import LocalDiskUploadStrategy, UploadStrategy
-from app.schemas import Response
+from app.schemas import Response, PatchDeleteReq
 from app.utils.exceptions import CustomHTTPException
 from app.utils.exceptions.db import transaction_failed
 
@@ -31,11 +32,32 @@ class AttachmentRouter(BaseRouter[AttachmentModel, Attachment]):
         deleted_item = self.repository.delete_by_id(db=db, model_id=resource_id)
         if not deleted_item:
             raise CustomHTTPException.item_not_found(self.model_name)
-        upload_strategy.delete(file_path=deleted_item.file_path)
+        after_commit(db, lambda: upload_strategy.delete(file_path=deleted_item.file_path))
             
         return Response(
             message='Deleted successfully.',
         )
+    
+    async def delete_items_by_ids(self, patch_delete_Req: PatchDeleteReq, db: SessionDep, upload_strategy: UploadStrategyDep):
+        if patch_delete_Req is None:
+            raise CustomHTTPException.item_not_found(self.model_name)
+        
+        # Collect the paths before the rows are gone
+        file_paths = self.repository.find_file_paths_by_ids(db=db, ids=patch_delete_Req.ids)
+        
+        deleted_ids = self.repository.delete_by_ids(db=db, ids=patch_delete_Req.ids)
+        if not deleted_ids:
+            raise CustomHTTPException.item_not_found(self.model_name)
+        
+        def delete_files():
+            for file_path in file_paths:
+                upload_strategy.delete(file_path=file_path)
+        after_commit(db, delete_files)
+            
+        return Response(
+            message='Deleted successfully.',
+            data=deleted_ids
+        )
         
 
 router = AttachmentRouter().router
\ No newline at end of file
@@ -9,7 +9,7 @@ from app.db.dependencies import SessionDep
 from app.dependencies.user import UserToSaveDep
 from app.db.repositories import UserRepositoryDep, RoleRepositoryDep
 from app.core.config import SettingsDep
-from app.core.dpendencies import AuthenticatedUserDep
+from app.core.dpendencies import AuthenticatedUserDep, PrincipalDep
 from app.schemas import Response
 from app.db.models import User, UserWithToken, Role, RoleEnum
 from app.utils.validation import is_submitter
@@ -46,7 +46,7 @@ async def register(
         if parsed_user and role and role.name not in [role['name'] for role in parsed_user.roles]:
             saved_user.roles.append(role)
         
-        db.commit()
+        db.flush()
         
         # Generate tokens
         access_token, _ = generate_tokens(user=parsed_user, settings=settings.JWT)
@@ -56,7 +56,6 @@ async def register(
         db.rollback()
         raise transaction_failed
     else:
-        db.commit()
         return Response[UserWithToken](
             data=user_with_token
         )
@@ -83,6 +82,16 @@ async def login_for_tokens(
     )
 
 
+# Logout: revoke every token of the user
+@router.post(path="/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    principal: PrincipalDep,
+    user_repository: UserRepositoryDep,
+    db: SessionDep
+):
+    user_repository.revoke_tokens(db=db, user_id=principal.id)
+
+
 # @router.get(path="/refresh-token", status_code=status.HTTP_200_OK, response_model=Response)
 # async def refresh_access_token(
 #         token: str,
@@ -1,5 +1,5 @@
 from app.db.models import BUModel, BU, BUCreate
-from app.api.base_router import BaseRouter
+from app.api.base_router import BaseRouter, REFERENCE_CACHE_CONTROL
 from app.db.repositories import BURepository
 
 
@@ -8,7 +8,8 @@ class BURouter(BaseRouter[BUModel, BU]):
         super().__init__(
             repository=BURepository(),
             request_type=BUCreate,
-            response_type=BU
+            response_type=BU,
+            cache_control=REFERENCE_CACHE_CONTROL
         )
 
 router = BURouter().router
\ No newline at end of file
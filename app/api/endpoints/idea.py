@@ -1,15 +1,22 @@
 import os
-from typing import Annotated
-from fastapi import UploadFile, File, Depends, HTTPException, status, Form
+from typing import Annotated, List, Optional
+from fastapi import UploadFile, File, Depends, HTTPException, status, Form, Query, Request, Response as HTTPResponse
 import logging
 
-from app.db.models import IdeaModel, Idea, IdeaCreate, AttachmentCreate
-from app.schemas import Response
+from app.db.models import IdeaModel, Idea, IdeaCreate, IdeaSearchHit, IdeaStats, AttachmentCreate
+from app.schemas import Response, ResponseWithPagination, ItemEnvelope, PageEnvelope, PatchDeleteReq
 from app.api.base_router import BaseRouter
+from app.api.base_router.base_router import RESERVED_PARAMS
 from app.db.repositories import IdeaRepository, IdeaRepositoryDep, AttachmentRepositoryDep
-from app.db.dependencies import SessionDep
+from app.db.repositories.idea import SEARCH_WEIGHTS
+from app.db.dependencies import SessionDep, DBSessionDep, ReadSessionDep
+from app.db.unit_of_work import after_commit
 from app.utils.exceptions import CustomHTTPException
 from app.utils.upload_strategies import LocalDiskUploadStrategy, UploadStrategy
+from app.utils.database import parse_filters
+from app.utils.conditional_requests import etag_matches
+from app.utils.responses import envelope_adapter, render_envelope
+from app.utils.search import parse_search_terms, highlight
 from ...config import IDEA_ATTACHMENTS_DIR
 
 
@@ -19,6 +26,15 @@ def get_upload_strategy():
 
 UploadStrategyDep = Annotated[UploadStrategy, Depends(get_upload_strategy)]
 
+
+def delete_attachment_files(upload_strategy: UploadStrategy, file_paths: List[str]) -> None:
+    for file_path in file_paths:
+        try:
+            upload_strategy.delete(file_path=file_path)
+        except Exception as e:
+            # Log the error and continue deleting other files
+            logging.error(f"Failed to delete file {file_path}: {e}")
+
 class IdeaRouter(BaseRouter[IdeaModel, Idea]):
     def __init__(self):
         super().__init__(
@@ -62,10 +78,8 @@ class IdeaRouter(BaseRouter[IdeaModel, Idea]):
                     file_path=file_path                    
                 )
                 
-                saved_attachment = attachmentRepository.insert_line(data=insert_data, db=db)
-                db.commit()
-                db.refresh(saved_attachment)
-                db.refresh(idea)
+                attachmentRepository.insert_line(data=insert_data, db=db)
+                db.refresh(idea, ['attachments'])
                 return Response[Idea](
                     data=idea
                 )
@@ -75,6 +89,93 @@ class IdeaRouter(BaseRouter[IdeaModel, Idea]):
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail='Something went wrong.'
                 )
+    
+    def setup_routes(self):
+        # Registered first, so '/search' is not taken for an idea id
+        self.router.add_api_route(
+            path='/search',
+            endpoint=self.search_ideas,
+            methods=['GET'],
+            response_model=ResponseWithPagination[IdeaSearchHit],
+            name='Search ideas'
+        )
+        self.router.add_api_route(
+            path='/stats',
+            endpoint=self.idea_stats,
+            methods=['GET'],
+            response_model=Response[IdeaStats],
+            name='Idea counts by status, plant, BU and month'
+        )
+        super().setup_routes()
+    
+    async def search_ideas(
+        self,
+        request: Request,
+        db: DBSessionDep,
+        read_db: ReadSessionDep,
+        q: Annotated[str, Query(min_length=1, description="Words to find in the title, description or actual situation")],
+        page: Annotated[int, Query(ge=1, description="Page number starting from 1")]=1,
+        items_per_page: Annotated[int, Query(ge=1, description="Number of items per page")]=25
+    ):
+        terms = parse_search_terms(q)
+        if not terms:
+            raise CustomHTTPException.invalid_query_parameter('q')
+        
+        # Other query parameters filter the matches like on the listing, e.g. status=approved&submitter__plant_id=2
+        query_params = dict(request.query_params)
+        for param in RESERVED_PARAMS + ('q',):
+            query_params.pop(param, None)
+        filters = parse_filters(query_params, self.repository.model)
+        
+        tables = self._read_tables(filters=filters)
+        etag = self._etag(tables, 'search', sorted(request.query_params.multi_items()))
+        if etag and etag_matches(request.headers.get('if-none-match'), etag):
+            return HTTPResponse(status_code=304, headers=self._cache_headers(etag))
+        db = await self._read_session(db, read_db, tables)
+        
+        matches, total = await self._run(
+            db, 'search', terms=terms, offset=(page - 1) * items_per_page, limit=items_per_page, filters=filters
+        )
+        if not matches:
+            raise CustomHTTPException.no_items_found(self.model_name)
+        
+        hits = [
+            {
+                'idea': idea,
+                'rank': rank,
+                'highlights': {
+                    field: fragment
+                    for field in SEARCH_WEIGHTS
+                    if (fragment := highlight(getattr(idea, field), terms))
+                }
+            }
+            for idea, rank in matches
+        ]
+        return render_envelope(
+            envelope_adapter(PageEnvelope, IdeaSearchHit),
+            headers=self._cache_headers(etag),
+            content=hits,
+            page=page,
+            total=total
+        )
+        
+    async def idea_stats(
+        self,
+        request: Request,
+        db: DBSessionDep,
+        read_db: ReadSessionDep,
+        plant_id: Annotated[Optional[int], Query(description="Only count the ideas of the submitters of this plant")]=None,
+        bu_id: Annotated[Optional[int], Query(description="Only count the ideas of the submitters of this BU")]=None
+    ):
+        # Served from the idea_stats summary, whose size doesn't grow with the number of ideas
+        tables = {self.repository.stats.model.__tablename__}
+        etag = self._etag(tables, 'stats', plant_id, bu_id)
+        if etag and etag_matches(request.headers.get('if-none-match'), etag):
+            return HTTPResponse(status_code=304, headers=self._cache_headers(etag))
+        db = await self._read_session(db, read_db, tables)
+        
+        stats = await self._run(db, 'stats_summary', plant_id=plant_id, bu_id=bu_id)
+        return render_envelope(envelope_adapter(ItemEnvelope, IdeaStats), headers=self._cache_headers(etag), data=stats)
         
     async def delete_item_by_id(
         self,
@@ -89,16 +190,35 @@ class IdeaRouter(BaseRouter[IdeaModel, Idea]):
         
         attachments_paths = [attachment.file_path for attachment in deleted_item.attachments]
         
-        # Delete each attachment file from the filesystem
-        for file_path in attachments_paths:
-            try:
-                upload_strategy.delete(file_path=file_path)
-            except Exception as e:
-                # Log the error and continue deleting other files
-                logging.error(f"Failed to delete file {file_path}: {e}")
+        # Delete each attachment file from the filesystem once the rows are gone for good
+        after_commit(db, lambda: delete_attachment_files(upload_strategy, attachments_paths))
+            
+        return Response(
+            message='Deleted successfully.',
+        )
+        
+    async def delete_items_by_ids(
+        self,
+        patch_delete_Req: PatchDeleteReq,
+        db: SessionDep,
+        attachmentRepository: AttachmentRepositoryDep,
+        upload_strategy: UploadStrategyDep
+    ):
+        if patch_delete_Req is None:
+            raise CustomHTTPException.item_not_found(self.model_name)
+        
+        # Collect the attachments paths before the rows are gone
+        attachments_paths = attachmentRepository.find_file_paths_by_idea_ids(db=db, idea_ids=patch_delete_Req.ids)
+        
+        deleted_ids = self.repository.delete_by_ids(db=db, ids=patch_delete_Req.ids)
+        if not deleted_ids:
+            raise CustomHTTPException.item_not_found(self.model_name)
+        
+        after_commit(db, lambda: delete_attachment_files(upload_strategy, attachments_paths))
             
         return Response(
             message='Deleted successfully.',
+            data=deleted_ids
         )
 
 router = IdeaRouter().router
\ No newline at end of file
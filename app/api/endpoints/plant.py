@@ -1,5 +1,5 @@
 from app.db.models import PlantModel, Plant, PlantCreate
-from app.api.base_router import BaseRouter
+from app.api.base_router import BaseRouter, REFERENCE_CACHE_CONTROL
 from app.db.repositories import PlantRepository
 
 
@@ -8,7 +8,8 @@ class PlantRouter(BaseRouter[PlantModel, Plant]):
         super().__init__(
             repository=PlantRepository(),
             request_type=PlantCreate,
-            response_type=Plant
+            response_type=Plant,
+            cache_control=REFERENCE_CACHE_CONTROL
         )
 
 router = PlantRouter().router
\ No newline at end of file
@@ -1,6 +1,16 @@
-from app.db.models import RatingMatrixModel, RatingMatrix, RatingMatrixCreate
+from typing import Annotated, Optional
+from fastapi import Query, Request, Response as HTTPResponse
+
+from app.db.models import RatingMatrixModel, RatingMatrix, RatingMatrixCreate, LeaderboardEntry, IdeaModel, UserModel
+from app.db.models.idea import IdeaStatus
 from app.api.base_router import BaseRouter
+from app.db.dependencies import DBSessionDep, ReadSessionDep
 from app.db.repositories import RatingMatrixRepository
+from app.schemas import ResponseWithPagination, PageEnvelope
+from app.utils.exceptions import CustomHTTPException
+from app.utils.database import encode_cursor, decode_cursor
+from app.utils.conditional_requests import etag_matches
+from app.utils.responses import envelope_adapter, render_envelope
 
 
 class RatingMatrixRouter(BaseRouter[RatingMatrixModel, RatingMatrix]):
@@ -11,4 +21,57 @@ class RatingMatrixRouter(BaseRouter[RatingMatrixModel, RatingMatrix]):
             response_type=RatingMatrix
         )
 
+    def setup_routes(self):
+        # Registered first, so '/leaderboard' is not taken for a rating id
+        self.router.add_api_route(
+            path='/leaderboard',
+            endpoint=self.leaderboard,
+            methods=['GET'],
+            response_model=ResponseWithPagination[LeaderboardEntry],
+            name='Best rated ideas'
+        )
+        super().setup_routes()
+
+    async def leaderboard(
+        self,
+        request: Request,
+        db: DBSessionDep,
+        read_db: ReadSessionDep,
+        items_per_page: Annotated[int, Query(ge=1, le=100, description="Number of entries per page (top N)")]=10,
+        after: Annotated[Optional[str], Query(description="Cursor of the last entry seen")]=None,
+        plant_id: Annotated[Optional[int], Query(description="Only rank the ideas of the submitters of this plant")]=None,
+        bu_id: Annotated[Optional[int], Query(description="Only rank the ideas of the submitters of this BU")]=None,
+        status: Annotated[Optional[IdeaStatus], Query(description="Only rank the ideas with this status")]=None
+    ):
+        after_key = None
+        if after is not None:
+            sort_key = decode_cursor(after)
+            if not sort_key or len(sort_key) != 2 or not isinstance(sort_key[0], (int, float)) or not isinstance(sort_key[1], int):
+                raise CustomHTTPException.invalid_query_parameter('after')
+            after_key = (float(sort_key[0]), sort_key[1])
+
+        tables = {RatingMatrixModel.__tablename__, IdeaModel.__tablename__, UserModel.__tablename__}
+        etag = self._etag(tables, 'leaderboard', sorted(request.query_params.multi_items()))
+        if etag and etag_matches(request.headers.get('if-none-match'), etag):
+            return HTTPResponse(status_code=304, headers=self._cache_headers(etag))
+        db = await self._read_session(db, read_db, tables)
+
+        # One extra entry tells whether there is a next page
+        entries = await self._run(
+            db, 'leaderboard', limit=items_per_page + 1, after=after_key, plant_id=plant_id, bu_id=bu_id, status=status
+        )
+        has_more = len(entries) > items_per_page
+        entries = entries[:items_per_page]
+        if not entries:
+            raise CustomHTTPException.no_items_found(self.model_name)
+
+        last = entries[-1]
+        return render_envelope(
+            envelope_adapter(PageEnvelope, LeaderboardEntry),
+            headers=self._cache_headers(etag),
+            content=entries,
+            total=None,
+            next_cursor=encode_cursor([last['total_score'], last['rating_matrix_id']]) if has_more else None
+        )
+
 router = RatingMatrixRouter().router
\ No newline at end of file
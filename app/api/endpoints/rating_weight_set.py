@@ -0,0 +1,51 @@
+from fastapi import BackgroundTasks, status
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.db.base import engine
+from app.db.dependencies import DBSessionDep, SessionDep
+from app.db.models import RatingWeightSetModel, RatingWeightSet, RatingWeightSetCreate
+from app.db.scoring import start_rescore_job, rescore_job_status
+from app.api.base_router import BaseRouter
+from app.db.repositories import RatingWeightSetRepository
+from app.schemas import Response, RescoreJobStatus
+from app.utils.exceptions import CustomHTTPException
+
+
+def open_job_session() -> Session:
+    return Session(engine, expire_on_commit=False)
+
+
+class RatingWeightSetRouter(BaseRouter[RatingWeightSetModel, RatingWeightSet]):
+    def __init__(self):
+        super().__init__(
+            repository=RatingWeightSetRepository(),
+            request_type=RatingWeightSetCreate,
+            response_type=RatingWeightSet
+        )
+        
+        @self.router.post(
+            '/{weight_set_id}/activate',
+            response_model=Response[RescoreJobStatus],
+            status_code=status.HTTP_202_ACCEPTED,
+            description="Make the weight set the active one and rescore every rating with it in the background. "
+                        "Editing the weights of the active set only applies to existing ratings once it is activated again."
+        )
+        async def activate_weight_set(weight_set_id: int, db: DBSessionDep, background_tasks: BackgroundTasks):
+            if not await self._run(db, 'find_by_id', model_id=weight_set_id):
+                raise CustomHTTPException.item_not_found(self.model_name)
+            job = await run_in_threadpool(start_rescore_job, open_job_session, weight_set_id)
+            if job is None:
+                raise CustomHTTPException.operation_in_progress('rescore')
+            background_tasks.add_task(job.run)
+            return Response[RescoreJobStatus](data=job.snapshot())
+        
+        # Recorded in the database: served by any worker, whichever one runs the job
+        @self.router.get('/rescore-jobs/{job_id}', response_model=Response[RescoreJobStatus])
+        def get_rescore_job_status(job_id: str, db: SessionDep):
+            job = rescore_job_status(db, job_id)
+            if job is None:
+                raise CustomHTTPException.item_not_found('rescore job')
+            return Response[RescoreJobStatus](data=job)
+
+router = RatingWeightSetRouter().router
\ No newline at end of file
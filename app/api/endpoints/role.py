@@ -1,6 +1,6 @@
 from app.db.models import RoleModel, Role
 from app.db.models.role import RoleCreate
-from app.api.base_router import BaseRouter
+from app.api.base_router import BaseRouter, REFERENCE_CACHE_CONTROL
 from app.db.repositories import RoleRepository
 
 
@@ -9,7 +9,8 @@ class RoleRouter(BaseRouter[RoleModel, Role]):
         super().__init__(
             repository=RoleRepository(),
             request_type=RoleCreate,
-            response_type=Role
+            response_type=Role,
+            cache_control=REFERENCE_CACHE_CONTROL
         )
         
         
@@ -1,8 +1,8 @@
-from typing import Dict
+from typing import Dict, List
 
 from app.schemas.response import Response
-from app.db.models import UserModel, UserBase, User, UserWithToken
-from app.core.security import generate_tokens
+from app.db.models import UserModel, UserBase, User, UserWithToken, UserBatchCreate, UserBatchUpsert, UserBatchRow
+from app.core.security import generate_tokens, get_password_hasher, get_password_hashes
 from app.core.config import SettingsDep
 from app.db.dependencies import SessionDep
 from app.utils.exceptions import CustomHTTPException
@@ -31,6 +31,23 @@ class UserRouter(BaseRouter[UserModel, User]):
                 data=user_with_token
             )
     
+    def _batch_request_type(self, upsert: bool):
+        # New users need a password, the ones matched by an upsert keep theirs when none is sent
+        # (an upserted user not found without a password is reported as a conflict)
+        return UserBatchUpsert if upsert else UserBatchCreate
+    
+    async def _prepare_batch_items(self, items: List) -> List[UserBatchRow]:
+        passwords = [item.password for item in items if item.password is not None]
+        hashes = iter(await get_password_hashes(passwords, get_password_hasher()))
+        rows = []
+        for item in items:
+            # Only the fields sent, an upsert updates nothing else
+            values = item.model_dump(exclude_unset=True, exclude={'password'})
+            if item.password is not None:
+                values['hashed_password'] = next(hashes)
+            rows.append(UserBatchRow(**values))
+        return rows
+    
     async def update_item_by_id(
         self,
         resource_id: int,
@@ -57,7 +74,9 @@ class UserRouter(BaseRouter[UserModel, User]):
                 user = user_repository.find_by_id(db=db, model_id=resource_id)
                 user.roles.clear()
                 user.roles.append(role)
-                db.commit()
+                # The tokens issued so far carry the previous roles
+                user.token_version += 1
+                db.flush()
                 
                 return Response[self.response_type](data=user)
                 
@@ -1,8 +1,8 @@
 from fastapi import APIRouter
 from .endpoints import (
     auth, user, bu, role, plant, idea, image,
-    attachment, comment, rating_matrix, assignment,
-    assignment_comment, teoa_review, teoa_comment
+    attachment, comment, rating_matrix, rating_weight_set, assignment,
+    assignment_comment, teoa_review, teoa_comment, admin
 )
 
 api_router = APIRouter()
@@ -17,7 +17,9 @@ api_router.include_router(image.router, prefix="/images", tags=["Images"])
 api_router.include_router(attachment.router, prefix="/attachments", tags=["Attachments"])
 api_router.include_router(comment.router, prefix="/comments", tags=["Comments"])
 api_router.include_router(rating_matrix.router, prefix="/rating-matrices", tags=["Rating Matrices"])
+api_router.include_router(rating_weight_set.router, prefix="/rating-weight-sets", tags=["Rating Weight Sets"])
 api_router.include_router(assignment.router, prefix="/assignments", tags=["Ideas Assignments"])
 api_router.include_router(assignment_comment.router, prefix="/assignments-comments", tags=["Assignments Comments"])
 api_router.include_router(teoa_review.router, prefix="/teoa-reviews", tags=["Teoa Reviews"])
-api_router.include_router(teoa_comment.router, prefix="/teoa-comments", tags=["Teoa Comments"])
\ No newline at end of file
+api_router.include_router(teoa_comment.router, prefix="/teoa-comments", tags=["Teoa Comments"])
+api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
\ No newline at end of file
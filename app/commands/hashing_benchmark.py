@@ -0,0 +1,58 @@
+"""
+Password hashing benchmark.
+
+Measures the logins per second one core sustains at a bcrypt cost, then the throughput
+of the hashing pool with the configured number of processes, to size HASH_ROUNDS and HASH_WORKERS.
+
+Usage:
+    python -m app.commands.hashing_benchmark [--rounds 12] [--workers 2] [--logins 64]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from app.core.hashing import PasswordHasher, hash_password, verify_password
+
+PASSWORD = 'correct horse battery staple'
+
+
+def single_core(hashed: str, logins: int) -> float:
+    started = time.perf_counter()
+    for _ in range(logins):
+        verify_password(PASSWORD, hashed)
+    return logins / (time.perf_counter() - started)
+
+
+async def pool(hashed: str, logins: int, rounds: int, workers: int) -> float:
+    hasher = PasswordHasher(rounds=rounds, workers=workers, max_pending=logins)
+    try:
+        # Start the processes before timing
+        await asyncio.gather(*(hasher.verify(PASSWORD, hashed) for _ in range(workers)))
+        started = time.perf_counter()
+        await asyncio.gather(*(hasher.verify(PASSWORD, hashed) for _ in range(logins)))
+        return logins / (time.perf_counter() - started)
+    finally:
+        hasher.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=12, help="bcrypt cost")
+    parser.add_argument('--workers', type=int, default=2, help="Processes of the hashing pool")
+    parser.add_argument('--logins', type=int, default=64, help="Password verifications per measure")
+    args = parser.parse_args()
+
+    hashed = hash_password(PASSWORD, args.rounds)
+    per_core = single_core(hashed, max(args.logins // 8, 1))
+    print(f"Cost {args.rounds}: {per_core:.1f} logins/s per core ({1000 / per_core:.0f} ms per login)")
+
+    throughput = asyncio.run(pool(hashed, args.logins, args.rounds, args.workers))
+    print(
+        f"Pool of {args.workers} processes ({os.cpu_count()} cores): {throughput:.1f} logins/s, "
+        f"{throughput / args.workers:.1f} per process"
+    )
+
+
+if __name__ == '__main__':
+    main()
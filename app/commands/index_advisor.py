@@ -0,0 +1,164 @@
+"""
+Index advisor.
+
+Recommends secondary indexes from the SQLModel metadata (foreign keys not covered
+by an index) and from the filters recorded by `apply_filters` (see DB_FILTER_USAGE_LOG),
+then writes them as an Alembic revision.
+
+Usage:
+    python -m app.commands.index_advisor [--usage filter_usage.jsonl] [--min-count 10] [--dry-run]
+"""
+import argparse
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from alembic.autogenerate import render_python_code
+from alembic.config import Config
+from alembic.operations import ops
+from alembic.script import ScriptDirectory
+from alembic.util import rev_id
+from sqlalchemy import Table, UniqueConstraint
+from sqlmodel import SQLModel
+
+from app.db.models import *  # noqa: F401,F403 - register every table in the metadata
+from app.utils.database import load_filter_usage
+from app.utils.database.crud_util import PATTERN_OPERATORS, resolve_target_model
+
+
+EQUALITY_OPERATORS = {'eq', 'in'}
+
+Recommendation = Tuple[str, Tuple[str, ...]]
+
+
+def existing_prefixes(table: Table) -> List[Tuple[str, ...]]:
+    """Column tuples already served by the primary key, unique constraints and indexes."""
+    prefixes = [tuple(column.name for column in table.primary_key.columns)]
+    prefixes.extend(tuple(column.name for column in index.columns) for index in table.indexes)
+    prefixes.extend(
+        tuple(column.name for column in constraint.columns)
+        for constraint in table.constraints
+        if isinstance(constraint, UniqueConstraint)
+    )
+    prefixes.extend((column.name,) for column in table.columns if column.unique)
+    return prefixes
+
+
+def is_covered(table: Table, columns: Tuple[str, ...]) -> bool:
+    """Whether an existing index starts with the given columns."""
+    return any(prefix[:len(columns)] == columns for prefix in existing_prefixes(table))
+
+
+def foreign_key_recommendations(metadata) -> Counter:
+    """Every foreign key column that isn't the leading column of an index."""
+    recommendations = Counter()
+    for table in metadata.sorted_tables:
+        for foreign_key in table.foreign_keys:
+            columns = (foreign_key.parent.name,)
+            if not is_covered(table, columns):
+                recommendations.setdefault((table.name, columns), 0)
+    return recommendations
+
+
+def models_by_table() -> Dict[str, type]:
+    return {
+        mapper.class_.__tablename__: mapper.class_
+        for mapper in SQLModel._sa_registry.mappers
+    }
+
+
+def filter_recommendations(usage: Counter, min_count: int) -> Counter:
+    """
+    Turn recorded filter sets into index candidates weighted by use.
+    Filters on the listed table become one composite index: equality columns first,
+    then a single range column. Filters reached through relationships index the
+    target column on its own table, the join columns being foreign keys.
+    """
+    models = models_by_table()
+    recommendations = Counter()
+    for (table_name, signature), count in usage.items():
+        model = models.get(table_name)
+        if model is None or count < min_count:
+            continue
+        equality, ranges = [], []
+        for field_path, operator in signature:
+            if operator in PATTERN_OPERATORS:
+                continue  # LIKE '%term%' can't seek an index
+            parts = field_path.split('__')
+            target_model = resolve_target_model(model, parts)
+            if target_model is None:
+                continue
+            if target_model is not model:
+                recommendations[(target_model.__tablename__, (parts[-1],))] += count
+            elif operator in EQUALITY_OPERATORS:
+                equality.append(parts[-1])
+            else:
+                ranges.append(parts[-1])
+        columns = tuple(sorted(set(equality))) + tuple(sorted(set(ranges) - set(equality)))[:1]
+        if columns:
+            recommendations[(table_name, columns)] += count
+    return recommendations
+
+
+def prune(metadata, recommendations: Counter) -> List[Recommendation]:
+    """Drop candidates already covered by an existing or another recommended index."""
+    kept = []
+    candidates = sorted(recommendations, key=lambda item: (-len(item[1]), -recommendations[item], item))
+    for table_name, columns in candidates:
+        table = metadata.tables[table_name]
+        if columns[0] == 'id' or is_covered(table, columns):
+            continue
+        if any(name == table_name and other[:len(columns)] == columns for name, other in kept):
+            continue
+        kept.append((table_name, columns))
+    return sorted(kept)
+
+
+def index_name(table_name: str, columns: Tuple[str, ...]) -> str:
+    return f"ix_{table_name}_{'_'.join(columns)}"
+
+
+def write_revision(recommendations: List[Recommendation], message: str, config_path: str) -> Optional[str]:
+    """Write the recommended indexes as a new Alembic revision on top of the current head."""
+    upgrade_ops = ops.UpgradeOps([
+        ops.CreateIndexOp(index_name(table_name, columns), table_name, list(columns))
+        for table_name, columns in recommendations
+    ])
+    script_directory = ScriptDirectory.from_config(Config(config_path))
+    script = script_directory.generate_revision(
+        revid=rev_id(),
+        message=message,
+        head='head',
+        upgrades=render_python_code(upgrade_ops),
+        downgrades=render_python_code(upgrade_ops.reverse()),
+    )
+    return script.path if script else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recommend indexes and write them as an Alembic revision.")
+    parser.add_argument('--usage', help="Filter usage log written through DB_FILTER_USAGE_LOG")
+    parser.add_argument('--min-count', type=int, default=1, help="Ignore filter sets used fewer times")
+    parser.add_argument('--message', default='add recommended indexes')
+    parser.add_argument('--config', default='alembic.ini')
+    parser.add_argument('--dry-run', action='store_true', help="Print the recommendations only")
+    args = parser.parse_args()
+
+    metadata = SQLModel.metadata
+    recommendations = foreign_key_recommendations(metadata)
+    if args.usage:
+        recommendations.update(filter_recommendations(load_filter_usage(args.usage), args.min_count))
+    indexes = prune(metadata, recommendations)
+
+    for table_name, columns in indexes:
+        count = recommendations[(table_name, columns)]
+        reason = f"filtered {count} times" if count else "foreign key"
+        print(f"{index_name(table_name, columns)}: {table_name}({', '.join(columns)}), {reason}")
+    if not indexes:
+        print("No missing indexes.")
+        return
+    if not args.dry_run:
+        print(f"Revision written to {write_revision(indexes, args.message, args.config)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""
+Idea stats rebuild.
+
+Recomputes the idea_stats summary served by GET /ideas/stats from the ideas table.
+The summary is maintained on every idea write, run this to repair it, e.g. after
+ideas were changed outside the API. Ideas stay counted under the plant and BU their
+submitter belonged to when they were submitted.
+
+Usage:
+    python -m app.commands.rebuild_idea_stats
+"""
+from sqlmodel import Session
+
+from app.core.config import get_settings
+from app.db.base import engine
+from app.db.invalidation import channel_is_shared
+from app.db.models import *  # noqa: F401,F403 - register every table in the metadata
+from app.db.repositories.idea_stats import IdeaStatsRepository
+
+
+def main() -> None:
+    with Session(engine) as session:
+        rows = IdeaStatsRepository().rebuild(session)
+        # The commit publishes the write on the configured invalidation channel
+        session.commit()
+    print(f"Rebuilt idea_stats: {rows} rows.")
+    max_age = get_settings().DB.INVALIDATION_LOCAL_MAX_AGE
+    if not channel_is_shared():
+        print(
+            "The invalidation channel is local: running workers keep serving their ETags of the stats "
+            + (f"for up to {max_age} seconds." if max_age else "until they restart.")
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Rating rescore.
+
+Activates a rating weight set and recomputes the total score of every rating with it,
+the same job as POST /rating-weight-sets/{id}/activate, with the progress printed.
+It is recorded in the rescore_jobs table like the jobs of the API, and refused while one of them runs.
+The running workers learn about the new set through a shared invalidation channel: with the local one
+they would score new ratings with the previous weights (until ACTIVE_WEIGHTS_TTL runs out), so the
+command refuses to run unless --force is given.
+
+Usage:
+    python -m app.commands.rescore_ratings WEIGHT_SET_ID [--chunk-size 5000] [--force]
+"""
+import argparse
+import sys
+import time
+
+from sqlmodel import Session
+
+from app.db.base import engine
+from app.db.invalidation import channel_is_shared
+from app.db.models import *  # noqa: F401,F403 - register every table in the metadata
+from app.db.scoring import ACTIVE_WEIGHTS_TTL, RESCORE_CHUNK_SIZE, start_rescore_job
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('weight_set_id', type=int)
+    parser.add_argument('--chunk-size', type=int, default=RESCORE_CHUNK_SIZE, help="Ratings read and updated per round trip")
+    parser.add_argument('--force', action='store_true', help="Run even though the invalidation channel is local")
+    args = parser.parse_args()
+
+    if not channel_is_shared() and not args.force:
+        print(
+            "The invalidation channel is local: running workers would keep scoring new ratings with the "
+            f"previous weights for up to {ACTIVE_WEIGHTS_TTL} seconds. Activate the set through "
+            "POST /rating-weight-sets/{id}/activate, configure a shared channel, or pass --force."
+        )
+        sys.exit(1)
+
+    started = time.monotonic()
+
+    def report(processed: int, total: int) -> None:
+        rate = processed / max(time.monotonic() - started, 1e-9)
+        print(f"\r{processed}/{total} ratings rescored ({rate:.0f}/s)", end='', flush=True)
+
+    job = start_rescore_job(lambda: Session(engine), args.weight_set_id)
+    if job is None:
+        print("Another rescore is pending or running, started through the API or another run of the command.")
+        sys.exit(1)
+    job.on_progress = report
+    job.run(chunk_size=args.chunk_size)
+    print()
+    if job.status == 'failed':
+        print(f"Rescore failed: {job.error}")
+        sys.exit(1)
+    print(f"Done in {job.finished_at - job.started_at:.2f}s.")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -1,5 +1,6 @@
-from typing import Annotated
+from typing import Annotated, List, Optional
 from fastapi import Depends
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 from dotenv import load_dotenv
@@ -16,6 +17,9 @@ class JWTSettings(BaseSettings):
     REFRESH_TOKEN_EXPIRE_MINUTES: int
     FORGET_PWD_EXPIRE_MINUTES: int
     ALGORITHM: str
+    # Users kept in memory per worker to authenticate the tokens, and seconds before one is read again
+    USER_CACHE_SIZE: int = 1024
+    USER_CACHE_TTL: float = 60
     
 class DatabaseSettings(BaseSettings):
     HOST: str
@@ -23,6 +27,46 @@ class DatabaseSettings(BaseSettings):
     PASSWORD: str
     NAME: str
     URL: str
+    # Async driver URL of the same database (e.g. mssql+aioodbc://...), enables the AsyncSession path
+    ASYNC_URL: Optional[str] = None
+    # Connection pool, per worker process
+    POOL_SIZE: int = 5
+    MAX_OVERFLOW: int = 10
+    POOL_TIMEOUT: float = 30
+    # Seconds after which a connection is replaced, and liveness check on checkout (stale connections after failovers)
+    POOL_RECYCLE: int = 1800
+    POOL_PRE_PING: bool = True
+    # Send executemany batches in one round trip (mssql+pyodbc only)
+    FAST_EXECUTEMANY: bool = False
+    # Comma separated URLs of readable secondaries, used by the GET routes
+    REPLICA_URLS: List[str] = []
+    # Seconds after a write during which reads of the written tables stay on the primary
+    REPLICA_MAX_STALENESS: float = 5
+    # Channel sharing the table versions between workers: local (single worker), shared-memory or redis
+    INVALIDATION_CHANNEL: str = 'local'
+    # File path (shared-memory, e.g. /dev/shm/e-suggestion-versions) or redis URL
+    INVALIDATION_URL: Optional[str] = None
+    # Seconds between two reads of the redis versions
+    INVALIDATION_POLL_INTERVAL: float = 1.0
+    # Seconds after which the ETags of the local channel expire, since it can't see the writes of the commands
+    INVALIDATION_LOCAL_MAX_AGE: Optional[float] = 60
+    # JSON lines file recording the filters received by list endpoints, read by the index advisor
+    FILTER_USAGE_LOG: Optional[str] = None
+
+    @field_validator('REPLICA_URLS', mode='before')
+    @classmethod
+    def split_replica_urls(cls, value):
+        if isinstance(value, str):
+            return [url.strip() for url in value.split(',') if url.strip()]
+        return value
+
+class HashingSettings(BaseSettings):
+    # bcrypt cost of new hashes, stored hashes of another cost are rehashed at login
+    ROUNDS: int = 12
+    # Processes of the hashing pool, per worker process
+    WORKERS: int = 2
+    # Hashes waiting or running in the pool beyond which logins and registrations get a 503
+    MAX_PENDING: int = 32
 
 class Settings(BaseSettings):
     PROJECT_TITLE: str
@@ -33,16 +77,19 @@ class Settings(BaseSettings):
     APP_WORKERS: int
     DB: DatabaseSettings
     JWT: JWTSettings
+    HASH: HashingSettings
 
 @lru_cache
 def get_settings() -> Settings:
-    # Extract JWT and DB settings from the environment variables
+    # Extract JWT, DB and hashing settings from the environment variables
     jwt_env_values = {k[len('JWT_'):]: v for k, v in os.environ.items() if k.startswith('JWT_')}
     db_env_values = {k[len('DB_'):]: v for k, v in os.environ.items() if k.startswith('DB_')}
+    hash_env_values = {k[len('HASH_'):]: v for k, v in os.environ.items() if k.startswith('HASH_')}
 
     # Create instances of the settings classes
     jwt_settings = JWTSettings(**jwt_env_values)
     db_settings = DatabaseSettings(**db_env_values)
+    hash_settings = HashingSettings(**hash_env_values)
 
     # Return the Settings instance
     settings = Settings(
@@ -53,7 +100,8 @@ def get_settings() -> Settings:
         APP_PROTOCOL=os.getenv('APP_PROTOCOL'),
         APP_WORKERS=int(os.getenv('APP_WORKERS')),
         DB=db_settings,
-        JWT=jwt_settings
+        JWT=jwt_settings,
+        HASH=hash_settings
     )
 
     print('Mode: ', settings.MODE)
@@ -2,9 +2,11 @@ from typing import Annotated
 from fastapi import Depends
 
 from app.core.config import get_settings, Settings
-from app.core.security import get_authenticated_user, get_current_user
+from app.core.security import get_authenticated_user, get_current_user, get_principal
 from app.db.models import User
+from app.schemas.auth import Principal
 
 
 AuthenticatedUserDep = Annotated[User, Depends(get_authenticated_user)]
-CurrentUserDep = Annotated[User, Depends(get_current_user)]
\ No newline at end of file
+CurrentUserDep = Annotated[User, Depends(get_current_user)]
+PrincipalDep = Annotated[Principal, Depends(get_principal)]
\ No newline at end of file
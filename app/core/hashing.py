@@ -0,0 +1,96 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+import bcrypt
+
+
+class HashingQueueFull(Exception):
+    """
+    Raised when the hashing pool already holds the maximum number of pending operations.
+    """
+
+
+def hash_password(plain_password: str, rounds: int) -> str:
+    return bcrypt.hashpw(plain_password.encode(), bcrypt.gensalt(rounds)).decode()
+
+
+def hash_rounds(hashed_password: str) -> Optional[int]:
+    """
+    Cost factor of a bcrypt hash (`$2b$12$...` -> 12), None when it isn't a bcrypt hash.
+    """
+    parts = hashed_password.split('$')
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def verify_password(plain_password: str, hashed_password: str, rounds: Optional[int] = None) -> Tuple[bool, Optional[str]]:
+    """
+    Check a password against its hash. With `rounds`, a valid password hashed with another
+    cost also comes back rehashed with `rounds`, for the caller to store.
+    """
+    try:
+        valid = bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+    except ValueError:
+        # Not a bcrypt hash
+        return False, None
+    if valid and rounds is not None and hash_rounds(hashed_password) != rounds:
+        return True, hash_password(plain_password, rounds)
+    return valid, None
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a dedicated pool of processes, so a burst of logins neither holds
+    the threadpool shared by the sync dependencies nor competes for the GIL.
+    At most `max_pending` operations wait or run in the pool, beyond that HashingQueueFull is raised
+    and the request can be rejected at once instead of queueing behind the burst.
+    """
+    def __init__(self, rounds: int = 12, workers: int = 2, max_pending: int = 64) -> None:
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        # Created on first use, in the worker process serving the requests.
+        # Spawned rather than forked: forking a process running threads is not safe.
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                    )
+        return self._executor
+
+    async def _submit(self, function, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                raise HashingQueueFull()
+            self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    async def hash(self, plain_password: str) -> str:
+        return await self._submit(hash_password, plain_password, self.rounds)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Returns whether the password is valid, and its new hash when the stored one
+        was made with another cost than the configured one.
+        """
+        return await self._submit(verify_password, plain_password, hashed_password, self.rounds)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
\ No newline at end of file
@@ -1,20 +1,25 @@
+import asyncio
 import jwt
 from datetime import datetime, timedelta, timezone
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from functools import lru_cache
 from jwt.exceptions import InvalidTokenError
-from passlib.context import CryptContext
 
-from typing import Annotated
+from sqlmodel import Session
+from typing import Annotated, Dict, List, Optional, Tuple
 
 from app.db.models import User
-from app.schemas.auth import TokenCreationSettings, TokenVerificationSettings
-from app.core.config import JWTSettings, SettingsDep
+from app.schemas.auth import Principal, TokenCreationSettings, TokenVerificationSettings
+from app.core.config import JWTSettings, Settings, SettingsDep, get_settings
+from app.core.hashing import HashingQueueFull, PasswordHasher
+from app.core.user_cache import user_cache, user_versions
 from app.db.dependencies import SessionDep
-from app.db.repositories import UserRepositoryDep
+from app.db.repositories import UserRepository, UserRepositoryDep
+from app.utils.exceptions.auth import hashing_busy
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
@@ -44,13 +49,20 @@ def create_reset_password_token(email: str, settings: JWTSettings):
     return create_token(sett=sett)
 
 
+def decode_token(sett: TokenVerificationSettings) -> Dict:
+    """
+    Claims of a token, InvalidTokenError when it is invalid or expired.
+    """
+    return jwt.decode(
+        sett.token,
+        key=sett.key,
+        algorithms=[sett.algorithm]
+    )
+
+
 async def verify_token(sett: TokenVerificationSettings):
     try:
-        payload = jwt.decode(
-            token=sett.token,
-            key=sett.key,
-            algorithms=[sett.algorithm]
-        )
+        payload = decode_token(sett)
 
         user_id = payload.get("sub")
         
@@ -64,10 +76,12 @@ def generate_tokens(user: User, settings: JWTSettings):
     access_token_expires = timedelta(minutes=int(settings.ACCESS_TOKEN_EXPIRE_MINUTES))
     refresh_token_expires = timedelta(minutes=int(settings.REFRESH_TOKEN_EXPIRE_MINUTES))
     
+    # JWT subjects are strings, 'ver' is checked against the user's token version
     to_encode = {
-        "sub": user.id,
+        "sub": str(user.id),
         'roles': [role.name for role in user.roles],
-        'email': user.email
+        'email': user.email,
+        'ver': user.token_version
     }
     
     access_token_sett = TokenCreationSettings(
@@ -91,12 +105,29 @@ def generate_tokens(user: User, settings: JWTSettings):
     return [access_token, refresh_token]
 
 
-async def get_current_user(
-    settings: SettingsDep,
-    db: SessionDep,
-    user_repository: UserRepositoryDep,
-    token: str = Depends(oauth2_scheme)
-):
+def load_user(db: Session, user_repository: UserRepository, user_id: int) -> Optional[User]:
+    """
+    Read the user from the database and cache its snapshot.
+    """
+    versions = user_versions(user_id)
+    found_user = user_repository.find_by_id(model_id=user_id, db=db)
+    if found_user is None:
+        return None
+    user = User.model_validate(found_user)
+    user_cache.put(user, versions)
+    return user
+
+
+async def authenticate_token(
+    token: str,
+    settings: Settings,
+    db: Session,
+    user_repository: UserRepository
+) -> Tuple[Principal, User]:
+    """
+    Principal of the access token and snapshot of its user.
+    The token is refused once the user's token version moved past the one it was issued with.
+    """
     sett = TokenVerificationSettings(
         token=token,
         key=settings.JWT.SECRET,
@@ -109,38 +140,95 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    user_id = await verify_token(sett)
-    if user_id is None:
+    try:
+        claims = decode_token(sett)
+        principal = Principal(
+            id=int(claims['sub']),
+            email=claims['email'],
+            roles=claims.get('roles', []),
+            token_version=claims.get('ver', 0)
+        )
+    except (InvalidTokenError, KeyError, TypeError, ValueError):
         raise credentials_exception
     
-    user = user_repository.find_by_id(model_id=user_id, db=db)
+    # Usually cached: the request then runs no query
+    user = user_cache.get(principal.id)
     if user is None:
+        user = await run_in_threadpool(load_user, db, user_repository, principal.id)
+    if user is None or user.token_version != principal.token_version:
         raise credentials_exception
     
+    return principal, user
+
+
+async def get_principal(
+    settings: SettingsDep,
+    db: SessionDep,
+    user_repository: UserRepositoryDep,
+    token: str = Depends(oauth2_scheme)
+) -> Principal:
+    principal, _ = await authenticate_token(token, settings, db, user_repository)
+    return principal
+
+
+async def get_current_user(
+    settings: SettingsDep,
+    db: SessionDep,
+    user_repository: UserRepositoryDep,
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    _, user = await authenticate_token(token, settings, db, user_repository)
     return user
 
-def get_authenticated_user(
+@lru_cache
+def get_password_hasher() -> PasswordHasher:
+    settings = get_settings().HASH
+    return PasswordHasher(rounds=settings.ROUNDS, workers=settings.WORKERS, max_pending=settings.MAX_PENDING)
+
+PasswordHasherDep = Annotated[PasswordHasher, Depends(get_password_hasher)]
+
+
+async def get_authenticated_user(
     login_req: Annotated[OAuth2PasswordRequestForm, Depends()],
     user_repository: UserRepositoryDep,
-    db: SessionDep
+    db: SessionDep,
+    hasher: PasswordHasherDep
 ):
-    found_user = user_repository.find_by_username_or_email(
+    found_user = await run_in_threadpool(
+        user_repository.find_by_username_or_email,
         email=login_req.username,
         db=db
     )
 
     if not found_user:
         return False
-    if not verify_password(login_req.password, found_user.hashed_password):
+    try:
+        valid, new_hash = await hasher.verify(login_req.password, found_user.hashed_password)
+    except HashingQueueFull:
+        raise hashing_busy
+    if not valid:
         return False
+    if new_hash:
+        # Hashed with another cost than the configured one, stored again with the request's commit
+        found_user.hashed_password = new_hash
+        await run_in_threadpool(db.flush)
     return User.model_validate(found_user)
 
 
-
-
-def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def get_password_hash(plain_password: str):
-    return pwd_context.hash(plain_password)
\ No newline at end of file
+async def get_password_hash(plain_password: str, hasher: PasswordHasher):
+    try:
+        return await hasher.hash(plain_password)
+    except HashingQueueFull:
+        raise hashing_busy
+
+
+async def get_password_hashes(plain_passwords: List[str], hasher: PasswordHasher) -> List[str]:
+    """
+    Hash many passwords (a batch of users), one per pool process at a time
+    so the logins keep room in the queue.
+    """
+    hashes = []
+    for start in range(0, len(plain_passwords), hasher.workers):
+        wave = plain_passwords[start:start + hasher.workers]
+        hashes.extend(await asyncio.gather(*(get_password_hash(password, hasher) for password in wave)))
+    return hashes
\ No newline at end of file
@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+
+from app.core.config import get_settings
+from app.db.invalidation import table_versions
+from app.db.models import User
+from app.db.repositories.user import user_key
+
+
+def user_versions(user_id: int) -> Optional[Tuple]:
+    """
+    Version of the user's own key on the invalidation channel, moved by every write to its row.
+    """
+    return table_versions([user_key(user_id)])
+
+
+class UserSnapshot(NamedTuple):
+    user: User
+    loaded_at: float
+    versions: Optional[Tuple]  # user_versions of the user when it was loaded
+
+
+class UserCache:
+    """
+    Process-wide LRU of the users authenticated by their tokens, so a request carrying
+    a valid token usually runs no authentication query.
+    A snapshot is ignored once its user's row was written (a revocation bumps the token version,
+    see `user_key`) or it is older than the TTL. The TTL bounds the staleness of what is read from
+    other tables (roles, BU, plant) and of the writes the channel can't see (other workers on a local one).
+    """
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._snapshots: 'OrderedDict[int, UserSnapshot]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[User]:
+        with self._lock:
+            snapshot = self._snapshots.get(user_id)
+            if snapshot is None:
+                return None
+            if (
+                time.monotonic() - snapshot.loaded_at > self.ttl
+                or snapshot.versions is None
+                or snapshot.versions != user_versions(user_id)
+            ):
+                del self._snapshots[user_id]
+                return None
+            self._snapshots.move_to_end(user_id)
+            return snapshot.user
+
+    def put(self, user: User, versions: Optional[Tuple]) -> None:
+        """
+        Store the user, `versions` being the table versions read before the user was.
+        """
+        if versions is None:
+            return
+        with self._lock:
+            self._snapshots[user.id] = UserSnapshot(user=user, loaded_at=time.monotonic(), versions=versions)
+            self._snapshots.move_to_end(user.id)
+            while len(self._snapshots) > self.max_size:
+                self._snapshots.popitem(last=False)
+
+
+user_cache = UserCache(max_size=get_settings().JWT.USER_CACHE_SIZE, ttl=get_settings().JWT.USER_CACHE_TTL)
@@ -0,0 +1,106 @@
+from typing import Dict, Generic, List, Optional, Any, Tuple, Callable
+from functools import partial
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.crud_repository import CRUDBaseRepository, ModelType, ResponseType
+from app.schemas.batch import BatchResult
+
+
+class AsyncCRUDBaseRepository(Generic[ModelType, ResponseType]):
+    """
+    Async counterpart of CRUDBaseRepository, working on an AsyncSession.
+    The statements are the ones of the wrapped repository, run through `AsyncSession.run_sync`:
+    the queries go through the async driver and the event loop is free while they wait.
+    """
+    def __init__(self, repository: CRUDBaseRepository[ModelType, ResponseType]) -> None:
+        self.repository = repository
+        self.model = repository.model
+        self.response_type = repository.response_type
+        self.natural_key = repository.natural_key
+
+    async def run(self, db: AsyncSession, method: Callable, **kwargs) -> Any:
+        """
+        Run a method taking a blocking Session (e.g. a custom repository method) on the AsyncSession.
+        """
+        return await db.run_sync(partial(method, **kwargs))
+
+    def _with_relationships(self, method: Callable) -> Callable:
+        """
+        Wrap a write method so the returned record comes back with the relationships
+        serialized by `response_type` loaded: lazy loads are not possible on an AsyncSession.
+        """
+        def _write(session: Session, **kwargs):
+            record = method(session, **kwargs)
+            if record is None:
+                return None
+            return self.repository.find_by_id(db=session, model_id=record.id)
+        return _write
+
+    async def insert_line(self, db: AsyncSession, data) -> ModelType:
+        return await self.run(db, self._with_relationships(self.repository.insert_line), data=data)
+
+    async def insert_many(self, db: AsyncSession, data: List) -> BatchResult:
+        return await self.run(db, self.repository.insert_many, data=data)
+
+    async def upsert_many(self, db: AsyncSession, data: List) -> BatchResult:
+        return await self.run(db, self.repository.upsert_many, data=data)
+
+    async def delete_by_ids(self, db: AsyncSession, ids: List[int]) -> Optional[List[int]]:
+        return await self.run(db, self.repository.delete_by_ids, ids=ids)
+
+    async def count_all(self, db: AsyncSession) -> int:
+        return await self.run(db, self.repository.count_all)
+
+    async def count_all_cached(self, db: AsyncSession) -> int:
+        return await self.run(db, self.repository.count_all_cached)
+
+    async def count_with_filters(self, db: AsyncSession, filters: Dict[str, Dict[str, Any]]) -> int:
+        return await self.run(db, self.repository.count_with_filters, filters=filters)
+
+    async def find_paginated(self, db: AsyncSession, offset: int, limit: int, options: Optional[tuple] = None) -> List[ModelType]:
+        return await self.run(db, self.repository.find_paginated, offset=offset, limit=limit, options=options)
+
+    async def find_paginated_with_filters(
+        self, db: AsyncSession, offset: int, limit: int, filters: Dict[str, Dict[str, Any]], options: Optional[tuple] = None
+    ) -> List[ModelType]:
+        return await self.run(
+            db, self.repository.find_paginated_with_filters, offset=offset, limit=limit, filters=filters, options=options
+        )
+
+    async def find_paginated_with_total(
+        self, db: AsyncSession, offset: int, limit: int, filters: Dict[str, Dict[str, Any]], options: Optional[tuple] = None
+    ) -> Tuple[List[ModelType], int]:
+        return await self.run(
+            db, self.repository.find_paginated_with_total, offset=offset, limit=limit, filters=filters, options=options
+        )
+
+    async def find_keyset(
+        self,
+        db: AsyncSession,
+        limit: int,
+        filters: Optional[Dict[str, Dict[str, Any]]] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+        options: Optional[tuple] = None
+    ) -> List[ModelType]:
+        return await self.run(
+            db, self.repository.find_keyset, limit=limit, filters=filters, after=after, before=before, options=options
+        )
+
+    async def find_by_ids(self, db: AsyncSession, ids: List[int]) -> List[ModelType]:
+        return await self.run(db, self.repository.find_by_ids, ids=ids)
+
+    async def find_by_id(self, db: AsyncSession, model_id: int, options: Optional[tuple] = None) -> Optional[ModelType]:
+        return await self.run(db, self.repository.find_by_id, model_id=model_id, options=options)
+
+    async def find_parsed_by_id(self, db: AsyncSession, model_id: int):
+        return await self.run(db, self.repository.find_parsed_by_id, model_id=model_id)
+
+    async def find_all(self, db: AsyncSession) -> List[ModelType]:
+        return await self.run(db, self.repository.find_all)
+
+    async def find_by_id_and_update(self, db: AsyncSession, model_id: int, data: Dict) -> Optional[ModelType]:
+        return await self.run(db, self._with_relationships(self.repository.find_by_id_and_update), model_id=model_id, data=data)
+
+    async def delete_by_id(self, db: AsyncSession, model_id: int) -> Optional[ModelType]:
+        return await self.run(db, self.repository.delete_by_id, model_id=model_id)
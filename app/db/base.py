@@ -1,14 +1,42 @@
 from sqlmodel import SQLModel, create_engine, MetaData, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.concurrency import run_in_threadpool
 from app.core.config import get_settings
+from app.utils.database import configure_filter_usage_log
+from app.db.pool import engine_options
+from app.db.replicas import ReplicaSet
+from app.db.invalidation import configure_invalidation_channel, create_invalidation_channel
 
 # Get the database URL from settings
 DATABASE_URL = get_settings().DB.URL
 
+# Record the filters used by list endpoints for the index advisor
+if get_settings().DB.FILTER_USAGE_LOG:
+    configure_filter_usage_log(get_settings().DB.FILTER_USAGE_LOG)
+
+# Share the table versions invalidating the in-process caches between the workers
+configure_invalidation_channel(create_invalidation_channel(
+    get_settings().DB.INVALIDATION_CHANNEL,
+    get_settings().DB.INVALIDATION_URL,
+    get_settings().DB.INVALIDATION_POLL_INTERVAL,
+    get_settings().DB.INVALIDATION_LOCAL_MAX_AGE
+), workers=get_settings().APP_WORKERS)
+
 # Create a metadata instance
 metadata = MetaData()
 
 # Create the database engine
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL, get_settings().DB))
+
+# Async engine on the same database, used by the generic routes when an async driver URL is configured
+ASYNC_DATABASE_URL = get_settings().DB.ASYNC_URL
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, get_settings().DB, is_async=True)
+) if ASYNC_DATABASE_URL else None
+
+# Readable secondaries serving the GET routes
+replicas = ReplicaSet([create_engine(url, **engine_options(url, get_settings().DB)) for url in get_settings().DB.REPLICA_URLS])
 
 # Base class for SQLModel models
 Base = SQLModel
@@ -16,5 +44,69 @@ Base.metadata = metadata
 
 
 def get_session():
-    with Session(engine) as session:
+    """
+    Request-scoped unit of work: repositories flush into the session and the
+    request commits once, after the handler, or rolls back if it raised.
+    Loaded records stay usable after the commit (no expiry, no reload).
+    """
+    with Session(engine, expire_on_commit=False) as session:
+        try:
+            yield session
+        except Exception:
+            session.rollback()
+            raise
+        else:
+            session.commit()
+
+
+async def get_db_session():
+    """
+    Unit of work of the generic routes (see get_session): an AsyncSession when DB_ASYNC_URL
+    is set, a blocking Session otherwise (its calls are then run in the threadpool).
+    """
+    if async_engine is not None:
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            try:
+                yield session
+            except Exception:
+                await session.rollback()
+                raise
+            else:
+                await session.commit()
+    else:
+        session = Session(engine, expire_on_commit=False)
+        try:
+            yield session
+        except Exception:
+            await run_in_threadpool(session.rollback)
+            raise
+        else:
+            await run_in_threadpool(session.commit)
+        finally:
+            await run_in_threadpool(session.close)
+
+
+async def get_read_session():
+    """
+    Session on the next read replica, None when no replica is configured.
+    Nothing is checked out until the session runs its first query, so routes
+    falling back to the primary session don't hold a replica connection.
+    """
+    replica = replicas.next_engine()
+    if replica is None:
+        yield None
+        return
+    session = Session(replica)
+    try:
         yield session
+    finally:
+        await run_in_threadpool(session.close)
+
+def open_streaming_session(use_replica: bool = True) -> Session:
+    """
+    Session of a streamed response body, which outlives the request dependencies:
+    on the next read replica when allowed and configured, on the primary otherwise.
+    The caller closes it once the body is sent.
+    """
+    replica = replicas.next_engine() if use_replica else None
+    return Session(replica or engine)
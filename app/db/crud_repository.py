@@ -1,11 +1,34 @@
-from typing import Dict, Generic, TypeVar, List, Optional, Any, Type
-from sqlmodel import SQLModel, Session, select, func, and_
+from typing import Dict, Generic, TypeVar, List, Optional, Any, Type, Tuple, Iterator
+import time
+from sqlmodel import SQLModel, Session, select, func
 from datetime import datetime
 from sqlmodel import Session
 from app.db.dependencies import SessionDep
-from app.utils.database import is_relationship, apply_filters
+from app.utils.database import apply_filters, build_loader_options, build_view_options
+from app.schemas.batch import BatchResult, BatchConflict
+from sqlalchemy import Insert, delete, insert, update, inspect as sa_inspect, UniqueConstraint
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import ONETOMANY, make_transient_to_detached
+from app.db.reference_cache import reference_cache, TableSnapshot
+from app.db.unit_of_work import written_tables
+from app.db.invalidation import table_version
 
 
+# SQL Server accepts at most 2100 parameters per statement
+BULK_CHUNK_SIZE = 1000
+
+# Approximate totals of unfiltered tables, served to paginated listings.
+# Dropped whenever a repository writes to the table or its version moves on
+# the invalidation channel, expired after the TTL as a safety net.
+APPROXIMATE_TOTAL_TTL = 60
+_approximate_totals: Dict[str, Tuple[int, float, Optional[int]]] = {}
+
+# Lifetime of the snapshots of cached reference tables (roles, BUs, plants)
+REFERENCE_CACHE_TTL = 300
+
+# Rows fetched per round trip by the server-side cursor of exports
+EXPORT_BATCH_SIZE = 1000
+
 ModelType = TypeVar("ModelType", bound=SQLModel)
 ResponseType = TypeVar("ResponseType", bound=SQLModel)
 
@@ -14,9 +37,35 @@ class CRUDBaseRepository(Generic[ModelType, ResponseType]):
     """
     Generic class for CRUD repository
     """
-    def __init__(self, model: ModelType, response_type: Type[ResponseType]) -> None:
+    def __init__(
+        self,
+        model: ModelType,
+        response_type: Type[ResponseType],
+        natural_key: Optional[str] = None,
+        cache_ttl: Optional[float] = None
+    ) -> None:
         self.model = model
         self.response_type = response_type
+        # Unique business column used to match rows on upserts (e.g. `te_id`, `name`)
+        self.natural_key = natural_key
+        # Serve find_all/find_by_id from an in-process snapshot of the table, reloaded after `cache_ttl` seconds.
+        # Meant for small tables that rarely change.
+        self.cache_ttl = cache_ttl
+
+    @property
+    def loader_options(self) -> tuple:
+        """
+        Eager-loading plan covering every relationship serialized by `response_type`,
+        so reading a record costs a fixed number of queries whatever the page size.
+        """
+        return build_loader_options(self.model, self.response_type)
+
+    def view_options(self, view: Type[SQLModel]) -> tuple:
+        """
+        Loader options for a sparse view of `response_type` (see `build_view_model`):
+        only the selected columns are fetched and only the expanded relationships loaded.
+        """
+        return build_view_options(self.model, view)
 
     def insert_line(self, db: Session, data: SQLModel):
         """
@@ -24,24 +73,210 @@ class CRUDBaseRepository(Generic[ModelType, ResponseType]):
         """
         record = self.model(**data.model_dump())  # Convert Pydantic/SQLModel model to dict
         db.add(record)
-        db.commit()
-        db.refresh(record)
+        db.flush()
+        self._invalidate_total()
         
         return record
 
-    def delete_by_ids(self, db: Session, ids: List[int]):
+    def insert_many(self, db: Session, data: List[SQLModel]) -> BatchResult:
+        """
+        Insert many records in one transaction with a single executemany INSERT.
+        Rows clashing with a unique column, in the table or earlier in the batch,
+        are reported as conflicts instead of aborting the whole batch.
+        """
+        result = BatchResult()
+        rows = [(index, self._to_row(db, item)) for index, item in enumerate(data)]
+        rows = self._reject_invalid_rows(db, data, rows, result)
+        rows = self._reject_unique_conflicts(db, rows, result)
+        
+        statement = insert(self.model).returning(self.model.id)
+        result.created = self._execute_batch(db, statement, rows, result)
+        self._invalidate_total()
+        return result
+    
+    def upsert_many(self, db: Session, data: List[SQLModel]) -> BatchResult:
+        """
+        Insert or update many records in one transaction, matching existing rows
+        on the repository's natural key (e.g. `te_id` or `name`).
+        Updates only touch the fields explicitly provided for each row.
+        """
+        if not self.natural_key:
+            raise ValueError(f"'{self.model.__name__}' has no natural key to upsert on.")
+        
+        result = BatchResult()
+        key_column = getattr(self.model, self.natural_key)
+        rows = [(index, self._to_row(db, item)) for index, item in enumerate(data)]
+        rows = self._reject_invalid_rows(db, data, rows, result)
+        
+        existing_ids = {}
+        keys = [row[self.natural_key] for _, row in rows]
+        for chunk in self._chunks(keys):
+            existing_ids.update(db.exec(select(key_column, self.model.id).where(key_column.in_(chunk))).all())
+        
+        seen, inserts, updates = set(), [], []
+        columns = self.model.__table__.columns.keys()
+        for index, row in rows:
+            key = row[self.natural_key]
+            if key in seen:
+                result.conflicts.append(BatchConflict(index=index, detail=f"Duplicate '{self.natural_key}' in batch"))
+                continue
+            seen.add(key)
+            if key in existing_ids:
+                values = {
+                    field: value
+                    for field, value in data[index].model_dump(exclude_unset=True).items()
+                    if field in columns and field not in ('id', self.natural_key)
+                }
+                if 'updated_at' in columns:
+                    values['updated_at'] = datetime.now()
+                updates.append((index, {'id': existing_ids[key], **values}))
+            else:
+                inserts.append((index, row))
+        
+        inserts = self._reject_unique_conflicts(db, inserts, result)
+        result.updated = self._execute_batch(db, update(self.model), updates, result)
+        statement = insert(self.model).returning(self.model.id)
+        result.created = self._execute_batch(db, statement, inserts, result)
+        self._invalidate_total()
+        return result
+    
+    def _to_row(self, db: Session, data: SQLModel) -> Dict[str, Any]:
+        """
+        Convert a request model into the column values of a new record,
+        applying the model defaults the same way `insert_line` does.
+        """
+        record = self.model(**data.model_dump())
+        return {
+            column: getattr(record, column)
+            for column in self.model.__table__.columns.keys()
+            if column != 'id' or record.id is not None
+        }
+    
+    def _unique_columns(self) -> List[str]:
+        """List the single-column unique constraints of the model's table."""
+        table = self.model.__table__
+        columns = [column.key for column in table.columns if column.unique]
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint) and len(constraint.columns) == 1:
+                columns.extend(column.key for column in constraint.columns)
+        return list(dict.fromkeys(columns))
+    
+    def _reject_invalid_rows(self, db: Session, data: List[SQLModel], rows: List[tuple], result: BatchResult) -> List[tuple]:
+        """
+        Hook for the repositories checking the rows of a batch against other tables:
+        drop the invalid rows and record them as conflicts. Accepts every row by default.
+        """
+        return rows
+    
+    def _reject_unique_conflicts(self, db: Session, rows: List[tuple], result: BatchResult) -> List[tuple]:
+        """
+        Drop the rows whose unique values already exist, either in the table
+        or earlier in the batch, and record them as conflicts.
         """
-        Delete multiple records by their IDs.
+        for column in self._unique_columns():
+            values = [row[column] for _, row in rows if row.get(column) is not None]
+            existing = set()
+            for chunk in self._chunks(values):
+                existing.update(db.exec(select(getattr(self.model, column)).where(getattr(self.model, column).in_(chunk))).all())
+            
+            accepted = []
+            for index, row in rows:
+                value = row.get(column)
+                if value is not None and value in existing:
+                    result.conflicts.append(BatchConflict(index=index, detail=f"'{column}' already exists"))
+                    continue
+                existing.add(value)
+                accepted.append((index, row))
+            rows = accepted
+        return rows
+    
+    def _execute_batch(self, db: Session, statement, rows: List[tuple], result: BatchResult) -> List[int]:
         """
-        items = []
-        for id in ids:
-            deleted_item = self.delete_by_id(db=db, model_id=id)
-            if deleted_item:
-                items.append(deleted_item)
+        Run `statement` once for all the rows (executemany). If the batch still violates
+        a constraint, replay it row by row in savepoints to isolate the offending rows.
+        Returns the IDs of the written records.
+        """
+        if not rows:
+            return []
+        try:
+            with db.begin_nested():
+                return self._execute_rows(db, statement, [row for _, row in rows])
+        except IntegrityError:
+            written = []
+            for index, row in rows:
+                try:
+                    with db.begin_nested():
+                        written.extend(self._execute_rows(db, statement, [row]))
+                except IntegrityError as e:
+                    result.conflicts.append(BatchConflict(index=index, detail=str(e.orig)))
+            return written
+    
+    @staticmethod
+    def _execute_rows(db: Session, statement, rows: List[Dict[str, Any]]) -> List[int]:
+        """Execute a bulk INSERT ... RETURNING id or a bulk UPDATE by primary key."""
+        if isinstance(statement, Insert):
+            return list(db.scalars(statement, rows).all())
+        db.execute(statement, rows)
+        return [row['id'] for row in rows]
 
-        if len(items) != len(ids):
+    def delete_by_ids(self, db: Session, ids: List[int]) -> Optional[List[int]]:
+        """
+        Delete multiple records by their IDs in a single transaction,
+        using set-based DELETE statements instead of one round trip per record.
+        Nothing is deleted if some of the IDs do not exist.
+        """
+        ids = list(dict.fromkeys(ids))
+        if not ids or len(self._existing_ids(db, self.model, ids)) != len(ids):
             return None
-        return items
+
+        self._bulk_delete(db, self.model, ids)
+        self._invalidate_total()
+        return ids
+    
+    @staticmethod
+    def _chunks(ids: List[int]):
+        """Split ids so every statement stays under the SQL Server parameter limit."""
+        for start in range(0, len(ids), BULK_CHUNK_SIZE):
+            yield ids[start:start + BULK_CHUNK_SIZE]
+
+    def _existing_ids(self, db: Session, model, ids: List[int]) -> List[int]:
+        """
+        Return the subset of the given IDs that exist in the model's table.
+        """
+        existing = []
+        for chunk in self._chunks(ids):
+            existing.extend(db.exec(select(model.id).where(model.id.in_(chunk))).all())
+        return existing
+
+    def _bulk_delete(self, db: Session, model, ids: List[int]) -> None:
+        """
+        Delete the given records with `DELETE ... WHERE id IN (...)` statements.
+        Mirrors the ORM cascades: association rows and children of relationships
+        configured with a delete cascade are removed first, one statement per table,
+        and the other children are kept with their foreign key set to NULL.
+        """
+        for relationship in sa_inspect(model).relationships:
+            if relationship.secondary is not None:
+                for _, link_column in relationship.synchronize_pairs:
+                    for chunk in self._chunks(ids):
+                        db.execute(delete(relationship.secondary).where(link_column.in_(chunk)))
+            elif relationship.direction is ONETOMANY and relationship.cascade.delete:
+                child_model = relationship.mapper.class_
+                for _, foreign_key in relationship.synchronize_pairs:
+                    child_ids = []
+                    for chunk in self._chunks(ids):
+                        child_ids.extend(db.exec(select(child_model.id).where(foreign_key.in_(chunk))).all())
+                    if child_ids:
+                        self._bulk_delete(db, child_model, child_ids)
+            elif relationship.direction is ONETOMANY and not relationship.passive_deletes:
+                # What the ORM does to the children it doesn't delete (e.g. the comments and uploads of a user),
+                # rather than leave them to an ON DELETE CASCADE of the database
+                for _, foreign_key in relationship.synchronize_pairs:
+                    for chunk in self._chunks(ids):
+                        db.execute(update(foreign_key.table).where(foreign_key.in_(chunk)).values({foreign_key.name: None}))
+
+        for chunk in self._chunks(ids):
+            db.execute(delete(model).where(model.id.in_(chunk)))
     
     def count_all(self, db: Session) -> int:
         """
@@ -51,6 +286,23 @@ class CRUDBaseRepository(Generic[ModelType, ResponseType]):
         result = db.exec(statement).first()
         return result
     
+    def count_all_cached(self, db: Session) -> int:
+        """
+        Count all records, serving a cached approximate total when available.
+        """
+        table = self.model.__tablename__
+        version = table_version(table)
+        cached = _approximate_totals.get(table)
+        if cached and time.monotonic() - cached[1] < APPROXIMATE_TOTAL_TTL and version is not None and cached[2] == version:
+            return cached[0]
+        total = self.count_all(db=db)
+        _approximate_totals[table] = (total, time.monotonic(), version)
+        return total
+    
+    def _invalidate_total(self) -> None:
+        """Drop the cached total of the table after a write."""
+        _approximate_totals.pop(self.model.__tablename__, None)
+    
     def count_with_filters(self, db: Session, filters: Dict[str, Dict[str, Any]]) -> int:
         """
         Count records in the table that match the given filters.
@@ -60,12 +312,14 @@ class CRUDBaseRepository(Generic[ModelType, ResponseType]):
         result = db.exec(statement).first()
         return result
     
-    def find_paginated(self, db: Session, offset: int, limit: int) -> List[ModelType]:
+    def find_paginated(self, db: Session, offset: int, limit: int, options: Optional[tuple] = None) -> List[ModelType]:
         """
         Fetch paginated records from the table.
+        `options` overrides the default loader options (see `view_options`).
         """
         statement = (
             select(self.model)
+            .options(*(self.loader_options if options is None else options))
             .order_by(self.model.id)  # Order by a unique column (e.g., primary key)
             .offset(offset)
             .limit(limit)
@@ -74,91 +328,76 @@ class CRUDBaseRepository(Generic[ModelType, ResponseType]):
     
     
     def find_paginated_with_filters(
-        self, db: Session, offset: int, limit: int, filters: Dict[str, Dict[str, Any]]
+        self, db: Session, offset: int, limit: int, filters: Dict[str, Dict[str, Any]], options: Optional[tuple] = None
     ) -> List[ModelType]:
         """
         Fetch paginated records from the table that match the given filters.
         """
-        statement = select(self.model).order_by(self.model.id)
+        statement = select(self.model).options(*(self.loader_options if options is None else options)).order_by(self.model.id)
         statement = apply_filters(self.model, statement, filters)
         statement = statement.offset(offset).limit(limit)
         
         return db.exec(statement).all()    
     
     
-    def _apply_filters(self, statement, filters: Dict[str, Dict[str, Any]]):
+    def find_paginated_with_total(
+        self,
+        db: Session,
+        offset: int,
+        limit: int,
+        filters: Optional[Dict[str, Dict[str, Any]]] = None,
+        options: Optional[tuple] = None,
+    ) -> Tuple[List[ModelType], int]:
         """
-        Apply filters to the SQL statement.
-        Supports both direct field filters and relationship field filters.
+        Fetch a page of records together with the number of records matching the filters,
+        computed in the same statement with COUNT(*) OVER() instead of a second query.
+        An empty page carries no window count: the total then comes from a COUNT
+        (0 without one on the first page), so a page past the end still reports it.
         """
-        filter_conditions = []
-        for field, filter_info in filters.items():
-            operator = filter_info["operator"]
-            value = filter_info["value"]
-            
-            if "__" in field:
-                # Relationship field filter: relationship__field
-                relationship_name, related_field = field.split("__", 1)
-                
-                # Get the relationship attribute
-                try:
-                    relationship = getattr(self.model, relationship_name)
-                except AttributeError:
-                    continue
-                
-                if is_relationship(relationship):
-                    # Get the related model class
-                    related_model_class = relationship.property.entity.class_
-                    
-                    # Join the related table
-                    statement = statement.join(related_model_class)
-                    
-                    # Get the related field column
-                    try:
-                        related_field_column = getattr(related_model_class, related_field)
-                    except AttributeError:
-                        continue
-                
-                    # Apply the filter condition on the related field
-                    if operator == "eq":
-                        filter_conditions.append(related_field_column == value)
-                    elif operator == "in":
-                        filter_conditions.append(related_field_column.in_(value.split(",")))
-                    elif operator == "contains":
-                        filter_conditions.append(related_field_column.contains(value))
-                    # Add more operators as needed
-                else:
-                    raise ValueError(f"'{relationship_name}' is not a relationship.")
-            else:
-                # Direct field filter
-                if not hasattr(self.model, field):
-                    continue
-                
-                field_column = getattr(self.model, field)
-                if isinstance(field_column.type, datetime):
-                    value = datetime.fromisoformat(value)  # Convert string to datetime
-                
-                if operator == "eq":
-                    filter_conditions.append(field_column == value)
-                elif operator == "gt":
-                    filter_conditions.append(field_column > value)
-                elif operator == "lt":
-                    filter_conditions.append(field_column < value)
-                elif operator == "gte":
-                    filter_conditions.append(field_column >= value)
-                elif operator == "lte":
-                    filter_conditions.append(field_column <= value)
-                elif operator == "contains":
-                    filter_conditions.append(field_column.contains(value))
-                elif operator == "in":
-                    filter_conditions.append(field_column.in_(value.split(",")))
-                # Add more operators as needed
-        
-        if filter_conditions:
-            statement = statement.where(and_(*filter_conditions))
-        return statement
+        statement = (
+            select(self.model, func.count().over().label('total'))
+            .options(*(self.loader_options if options is None else options))
+            .order_by(self.model.id)
+        )
+        if filters:
+            statement = apply_filters(self.model, statement, filters)
+        rows = db.exec(statement.offset(offset).limit(limit)).all()
+        if not rows:
+            if offset == 0:
+                return [], 0
+            return [], self.count_with_filters(db, filters) if filters else self.count_all(db)
+        return [row[0] for row in rows], rows[0][1]
+    
+    
+    def find_keyset(
+        self,
+        db: Session,
+        limit: int,
+        filters: Optional[Dict[str, Dict[str, Any]]] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+        options: Optional[tuple] = None,
+    ) -> List[ModelType]:
+        """
+        Fetch a page of records using keyset (cursor) pagination on the primary key.
+        Unlike OFFSET pagination, the cost of a page does not depend on its depth.
+        `after` returns the records following the given id, `before` the ones preceding it.
+        """
+        statement = select(self.model).options(*(self.loader_options if options is None else options))
+        if filters:
+            statement = apply_filters(self.model, statement, filters)
 
+        if before is not None:
+            # Walk backwards from the cursor, then restore the ascending order
+            statement = statement.where(self.model.id < before).order_by(self.model.id.desc()).limit(limit)
+            return list(reversed(db.exec(statement).all()))
 
+        if after is not None:
+            statement = statement.where(self.model.id > after)
+        statement = statement.order_by(self.model.id).limit(limit)
+        return db.exec(statement).all()
+    
+    
     def find_by_ids(self, db: Session, ids: List[int]) -> List[ModelType]:
         """
         Find multiple records by their IDs.
@@ -167,11 +406,39 @@ class CRUDBaseRepository(Generic[ModelType, ResponseType]):
         results = db.exec(statement).all()
         return results
 
-    def find_by_id(self, db: Session, model_id: int) -> Optional[ModelType]:
+    def _cached_snapshot(self, db: Session) -> Optional[TableSnapshot]:
+        """
+        Snapshot of the table for cached repositories. None when caching is off,
+        or when the session has uncommitted writes to the table.
+        """
+        if self.cache_ttl is None or self.model.__tablename__ in written_tables(db):
+            return None
+        table = self.model.__table__
+        snapshot = reference_cache.get(table.name, self.cache_ttl)
+        if snapshot is None:
+            version = table_version(table.name)
+            rows = db.exec(table.select().order_by(table.c.id)).all()
+            snapshot = reference_cache.put(table.name, tuple(table.columns.keys()), tuple(tuple(row) for row in rows), version)
+        return snapshot
+
+    def _from_snapshot(self, db: Session, snapshot: TableSnapshot, row: Tuple) -> ModelType:
+        """
+        Attach a snapshot row to the session as a persistent record, without querying it.
+        """
+        record = self.model(**dict(zip(snapshot.columns, row)))
+        make_transient_to_detached(record)
+        return db.merge(record, load=False)
+
+    def find_by_id(self, db: Session, model_id: int, options: Optional[tuple] = None) -> Optional[ModelType]:
         """
         Find a single record by its ID.
         """
-        statement = select(self.model).where(self.model.id == model_id)
+        snapshot = self._cached_snapshot(db) if options is None else None
+        if snapshot is not None:
+            position = snapshot.positions.get(model_id)
+            return None if position is None else self._from_snapshot(db, snapshot, snapshot.rows[position])
+        
+        statement = select(self.model).options(*(self.loader_options if options is None else options)).where(self.model.id == model_id)
         result = db.exec(statement).first()
         return result
     
@@ -179,7 +446,7 @@ class CRUDBaseRepository(Generic[ModelType, ResponseType]):
         """
         Find a single record by its ID.
         """
-        statement = select(self.model).where(self.model.id == model_id)
+        statement = select(self.model).options(*self.loader_options).where(self.model.id == model_id)
         result = db.exec(statement).first()
         if not result: return
         return self.response_type.model_validate(result)
@@ -188,10 +455,45 @@ class CRUDBaseRepository(Generic[ModelType, ResponseType]):
         """
         Find all records of the model.
         """
-        statement = select(self.model)
+        snapshot = self._cached_snapshot(db)
+        if snapshot is not None:
+            return [self._from_snapshot(db, snapshot, row) for row in snapshot.rows]
+        
+        statement = select(self.model).options(*self.loader_options)
         results = db.exec(statement).all()
         return results
 
+    @property
+    def export_columns(self) -> List[str]:
+        """
+        Columns of the table serialized by `response_type` (secrets such as password hashes are never exported,
+        nor fields excluded from its serialization such as the users' token version).
+        """
+        columns = self.model.__table__.columns
+        return [
+            name for name, field in self.response_type.model_fields.items()
+            if name in columns and not field.exclude
+        ]
+
+    def stream_rows(
+        self,
+        db: Session,
+        columns: List[str],
+        filters: Optional[Dict[str, Dict[str, Any]]] = None,
+        batch_size: int = EXPORT_BATCH_SIZE
+    ) -> Iterator[List[Tuple]]:
+        """
+        Stream the matching rows, ordered by id, as batches of plain tuples.
+        Rows are read through a server-side cursor `batch_size` at a time and no ORM object
+        is built, so memory stays flat whatever the size of the table.
+        """
+        statement = select(*(getattr(self.model, name) for name in columns)).order_by(self.model.id)
+        if filters:
+            statement = apply_filters(self.model, statement, filters)
+        result = db.exec(statement.execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            yield partition
+
     def find_by_id_and_update(self, db: Session, model_id: int, data: Dict):
         """
         Find a record by its ID and update it with the provided data.
@@ -210,8 +512,7 @@ class CRUDBaseRepository(Generic[ModelType, ResponseType]):
         for field, value in direct_attributes.items():
             setattr(model, field, value)
         db.add(model)
-        db.commit()
-        db.refresh(model)
+        db.flush()
         return model
 
     @staticmethod
@@ -220,7 +521,7 @@ class CRUDBaseRepository(Generic[ModelType, ResponseType]):
         Delete a single record from the database.
         """
         db.delete(model)
-        db.commit()
+        db.flush()
 
     def delete_by_id(self, db: Session, model_id: int):
         """
@@ -229,6 +530,7 @@ class CRUDBaseRepository(Generic[ModelType, ResponseType]):
         model = self.find_by_id(db, model_id)
         if model:
             self._delete(db=db, model=model)
+            self._invalidate_total()
             return model
         return None
     
@@ -1,10 +1,13 @@
 from fastapi import Depends
-from typing import Annotated, Type, TYPE_CHECKING
+from typing import Annotated, Optional, Type, TYPE_CHECKING, Union
 from sqlmodel import Session
-from app.db.base import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.base import get_session, get_db_session, get_read_session
 
 
 SessionDep = Annotated[Session, Depends(get_session)]
+DBSessionDep = Annotated[Union[AsyncSession, Session], Depends(get_db_session)]
+ReadSessionDep = Annotated[Optional[Session], Depends(get_read_session)]
 
 if TYPE_CHECKING:
     from app.db.crud_repository import CRUDBaseRepository
@@ -0,0 +1,251 @@
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import uuid
+import zlib
+from typing import Dict, Iterable, Optional, Tuple
+from app.db.unit_of_work import on_tables_committed
+
+
+class InvalidationChannel:
+    """
+    Per-table version counters shared by the workers of a deployment.
+    A transaction writing to a table bumps its version when it commits, and the
+    in-process caches compare the version they were filled at with the current one.
+    """
+    # Whether other processes (workers, commands) see the bumps
+    shared = True
+
+    def bump(self, tables: Iterable[str]) -> None:
+        raise NotImplementedError
+
+    def version(self, table: str) -> Optional[int]:
+        """
+        Current version of the table, None when it can't be known (caches must then be bypassed).
+        """
+        raise NotImplementedError
+
+    def epoch(self) -> Optional[str]:
+        """
+        Identifier of the version counters: it changes whenever they may have been reset,
+        so versions read under different epochs are never taken as equal.
+        """
+        raise NotImplementedError
+
+
+class LocalChannel(InvalidationChannel):
+    """
+    Versions kept in the process, enough for a single worker.
+    Writes of other processes (e.g. the commands) are never seen: with `max_age`, the epoch
+    changes every `max_age` seconds so the validators built on it (ETags) expire anyway.
+    """
+    shared = False
+
+    def __init__(self, max_age: Optional[float] = None) -> None:
+        self.max_age = max_age
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._epoch = uuid.uuid4().hex
+
+    def bump(self, tables: Iterable[str]) -> None:
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def version(self, table: str) -> Optional[int]:
+        return self._versions.get(table, 0)
+
+    def epoch(self) -> Optional[str]:
+        if self.max_age:
+            return f"{self._epoch}:{int(time.monotonic() // self.max_age)}"
+        return self._epoch
+
+
+class SharedMemoryChannel(InvalidationChannel):
+    """
+    Versions stored in a memory-mapped file shared by the workers of a host (e.g. under /dev/shm).
+    Tables are hashed into a fixed number of 64-bit slots: a collision only causes an extra invalidation.
+    The first slot holds a random epoch written when the file is created.
+    Reads are plain memory reads, bumps take an exclusive lock on the file.
+    """
+    SLOT = struct.Struct('<Q')
+
+    def __init__(self, path: str, slots: int = 1024) -> None:
+        self.slots = slots
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = slots * self.SLOT.size
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+            self._memory = mmap.mmap(self._fd, size)
+            if not self.SLOT.unpack_from(self._memory, 0)[0]:
+                self.SLOT.pack_into(self._memory, 0, uuid.uuid4().int & (2 ** 64 - 1) or 1)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _offset(self, table: str) -> int:
+        return (1 + zlib.crc32(table.encode()) % (self.slots - 1)) * self.SLOT.size
+
+    def bump(self, tables: Iterable[str]) -> None:
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            for offset in {self._offset(table) for table in tables}:
+                value, = self.SLOT.unpack_from(self._memory, offset)
+                self.SLOT.pack_into(self._memory, offset, value + 1)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def version(self, table: str) -> Optional[int]:
+        return self.SLOT.unpack_from(self._memory, self._offset(table))[0]
+
+    def epoch(self) -> Optional[str]:
+        return str(self.SLOT.unpack_from(self._memory, 0)[0])
+
+
+class RedisChannel(InvalidationChannel):
+    """
+    Versions stored in a Redis hash, shared by the workers of every host.
+    `client` is any object with the `hincrby`/`hgetall`/`hsetnx` methods of redis-py (a local
+    stand-in works as well). The hash is read at most once per `poll_interval` seconds, so a cache hit
+    stays a memory read, and versions are unknown while Redis can't be reached.
+    """
+    EPOCH_FIELD = '__epoch__'
+
+    def __init__(self, client, key: str = 'e-suggestion:table-versions', poll_interval: float = 1.0) -> None:
+        self.client = client
+        self.key = key
+        self.poll_interval = poll_interval
+        self._versions: Optional[Dict[str, int]] = None
+        self._epoch: Optional[str] = None
+        self._polled_at = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> 'RedisChannel':
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The redis package is required by the redis invalidation channel")
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def bump(self, tables: Iterable[str]) -> None:
+        try:
+            bumped = {table: int(self.client.hincrby(self.key, table, 1)) for table in tables}
+        except Exception as e:
+            logging.error(f"Failed to publish table versions: {e}")
+            self._versions = None
+            return
+        with self._lock:
+            if self._versions is not None:
+                self._versions.update(bumped)
+
+    def _poll(self) -> None:
+        try:
+            versions = self._decode(self.client.hgetall(self.key))
+            if self.EPOCH_FIELD not in versions:
+                # New or flushed hash: start a new epoch
+                self.client.hsetnx(self.key, self.EPOCH_FIELD, uuid.uuid4().hex)
+                versions = self._decode(self.client.hgetall(self.key))
+        except Exception as e:
+            logging.error(f"Failed to read table versions: {e}")
+            self._versions, self._epoch = None, None
+        else:
+            self._epoch = versions.pop(self.EPOCH_FIELD, None)
+            self._versions = {table: int(version) for table, version in versions.items()}
+        self._polled_at = time.monotonic()
+
+    @staticmethod
+    def _decode(values: Dict) -> Dict[str, str]:
+        return {
+            (key.decode() if isinstance(key, bytes) else key): (value.decode() if isinstance(value, bytes) else value)
+            for key, value in values.items()
+        }
+
+    def _refresh(self) -> None:
+        if time.monotonic() - self._polled_at > self.poll_interval:
+            with self._lock:
+                if time.monotonic() - self._polled_at > self.poll_interval:
+                    self._poll()
+
+    def version(self, table: str) -> Optional[int]:
+        self._refresh()
+        versions = self._versions
+        return None if versions is None else versions.get(table, 0)
+
+    def epoch(self) -> Optional[str]:
+        self._refresh()
+        return self._epoch
+
+
+_channel: InvalidationChannel = LocalChannel()
+# Whether the versions see the writes of every worker serving the API
+_covers_workers = True
+
+
+def configure_invalidation_channel(channel: InvalidationChannel, workers: int = 1) -> None:
+    global _channel, _covers_workers
+    _channel = channel
+    _covers_workers = channel.shared or workers <= 1
+    if not _covers_workers:
+        logging.warning(
+            f"The local invalidation channel can't see the writes of the other workers (APP_WORKERS={workers}): "
+            "ETags are disabled, configure a shared-memory or redis channel to enable them"
+        )
+
+
+def create_invalidation_channel(
+    kind: str, url: Optional[str] = None, poll_interval: float = 1.0, local_max_age: Optional[float] = None
+) -> InvalidationChannel:
+    """
+    Build the channel named in the settings: `local`, `shared-memory` (url: file path) or `redis` (url: redis URL).
+    """
+    if kind == 'local':
+        return LocalChannel(max_age=local_max_age)
+    if not url:
+        raise ValueError(f"The '{kind}' invalidation channel requires an URL")
+    if kind == 'shared-memory':
+        return SharedMemoryChannel(url)
+    if kind == 'redis':
+        return RedisChannel.from_url(url, poll_interval=poll_interval)
+    raise ValueError(f"Unknown invalidation channel '{kind}'")
+
+
+def channel_is_shared() -> bool:
+    """
+    Whether writes committed by other processes (e.g. the commands) reach the workers.
+    """
+    return _channel.shared
+
+
+def versions_cover_workers() -> bool:
+    """
+    Whether the versions see the writes of every worker, required by the validators
+    kept by the clients: a stale one would get 304 answers with no time limit.
+    """
+    return _covers_workers
+
+
+def table_version(table: str) -> Optional[int]:
+    return _channel.version(table)
+
+
+def table_versions(tables: Iterable[str]) -> Optional[Tuple]:
+    """
+    Epoch and versions of the tables (sorted by name), None when one of them can't be known.
+    Two equal results mean none of the tables was written in between.
+    """
+    epoch = _channel.epoch()
+    versions = tuple((table, _channel.version(table)) for table in sorted(tables))
+    if epoch is None or any(version is None for _, version in versions):
+        return None
+    return (epoch, versions)
+
+
+@on_tables_committed
+def _publish_committed_writes(tables) -> None:
+    _channel.bump(tables)
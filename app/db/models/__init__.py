@@ -1,11 +1,14 @@
-from .user import UserModel, UserBase, User, UserWithToken, UserCreate, UserInDb
+from .user import UserModel, UserBase, User, UserWithToken, UserCreate, UserInDb, UserBatchCreate, UserBatchUpsert, UserBatchRow
 from .role import RoleModel, Role, RoleEnum, RoleCreate
 from .bu import BUModel, BU, BUCreate
 from .plant import PlantModel, Plant, PlantCreate
-from .idea import IdeaModel, Idea, IdeaCreate
+from .idea import IdeaModel, Idea, IdeaCreate, IdeaSearchHit, LeaderboardEntry
+from .idea_stats import IdeaStatsModel, IdeaStats
 from .attachment import AttachmentModel, Attachment, AttachmentCreate
 from .comment import CommentModel, Comment, CommentCreate
-from .rating_matrix import RatingMatrixModel, RatingMatrix, RatingMatrixCreate
+from .rating_matrix import RatingMatrixModel, RatingMatrix, RatingMatrixCreate, RATING_CRITERIA, compute_total_score
+from .rating_weight_set import RatingWeightSetModel, RatingWeightSet, RatingWeightSetCreate
+from .rescore_job import RescoreJobModel
 from .assignment import AssignmentModel, Assignment, AssignmentCreate
 from .assignment_comment import AssignmentCommentModel, AssignmentComment, AssignmentCommentCreate
 from .teoa_review import TeoaReviewModel, TeoaReview, TeoaReviewCreate
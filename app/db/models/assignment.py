@@ -15,7 +15,7 @@ class AssignmentBase(SQLModel):
     due_date: Optional[datetime] = Field(default=None)
 
 class AssignmentMixin(SQLModel):
-    idea_id: Optional[int] = Field(default=None, foreign_key="ideas.id", ondelete='CASCADE')
+    idea_id: Optional[int] = Field(default=None, foreign_key="ideas.id", ondelete='CASCADE', index=True)
 
 
 class AssignmentCreate(AssignmentBase, AssignmentMixin):
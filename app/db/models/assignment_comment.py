@@ -15,8 +15,8 @@ class AssignmentCommentBase(SQLModel):
     
     
 class AssignmentCommentMixin(SQLModel):
-    commenter_id: Optional[int] = Field(default=None, foreign_key='users.id', ondelete='CASCADE')
-    assignment_id: Optional[int] = Field(default=None, foreign_key='assignments.id', ondelete='CASCADE')
+    commenter_id: Optional[int] = Field(default=None, foreign_key='users.id', ondelete='CASCADE', index=True)
+    assignment_id: Optional[int] = Field(default=None, foreign_key='assignments.id', ondelete='CASCADE', index=True)
 
 
 class AssignmentCommentCreate(AssignmentCommentBase, AssignmentCommentMixin):
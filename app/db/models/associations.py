@@ -12,7 +12,8 @@ class UserRoleLink(SQLModel, table=True):
     user_id: Optional[int] = Field(
         default=None, 
         foreign_key="users.id", 
-        primary_key=True
+        primary_key=True,
+        index=True
     )
     
 class UserAssignmentLink(SQLModel, table=True):
@@ -26,5 +27,6 @@ class UserAssignmentLink(SQLModel, table=True):
     user_id: Optional[int] = Field(
         default=None, 
         foreign_key="users.id", 
-        primary_key=True
+        primary_key=True,
+        index=True
     )
\ No newline at end of file
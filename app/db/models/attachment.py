@@ -15,8 +15,8 @@ class AttachmentBase(SQLModel):
     
     
 class AttachmentMixin(SQLModel):
-    idea_id: Optional[int] = Field(default=None, foreign_key='ideas.id', ondelete='CASCADE')
-    uploaded_by: Optional[int] = Field(default=None, foreign_key='users.id', ondelete='CASCADE')
+    idea_id: Optional[int] = Field(default=None, foreign_key='ideas.id', ondelete='CASCADE', index=True)
+    uploaded_by: Optional[int] = Field(default=None, foreign_key='users.id', ondelete='CASCADE', index=True)
 
 
 class AttachmentCreate(AttachmentBase, AttachmentMixin):
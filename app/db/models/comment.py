@@ -17,8 +17,8 @@ class CommentBase(SQLModel):
     
     
 class CommentMixin(SQLModel):
-    commenter_id: Optional[int] = Field(default=None, foreign_key='users.id', ondelete='CASCADE')
-    idea_id: Optional[int] = Field(default=None, foreign_key='ideas.id', ondelete='CASCADE')
+    commenter_id: Optional[int] = Field(default=None, foreign_key='users.id', ondelete='CASCADE', index=True)
+    idea_id: Optional[int] = Field(default=None, foreign_key='ideas.id', ondelete='CASCADE', index=True)
 
 
 class CommentCreate(CommentBase, CommentMixin):
@@ -1,8 +1,8 @@
 # from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional, TYPE_CHECKING
-from sqlmodel import SQLModel, Field, Relationship, Enum, Column
+from typing import Dict, Optional, TYPE_CHECKING
+from sqlmodel import SQLModel, Field, Relationship, Enum, Column, Index
 from datetime import datetime
 import enum
 from typing import Optional
@@ -48,18 +48,26 @@ class IdeaBase(SQLModel):
         sa_column=Column(IdeaStatus.as_enum_type(), default=IdeaStatus.CREATED),
         default=IdeaStatus.CREATED
     )
-    created_at: datetime = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=datetime.now, index=True)
     updated_at: Optional[datetime] = Field(default=None)
     
     
 class IdeaMixin(SQLModel):
-    submitter_id: Optional[int] = Field(default=None, foreign_key="users.id")
+    submitter_id: Optional[int] = Field(default=None, foreign_key="users.id", index=True)
         
     
 class IdeaModel(IdeaBase, IdeaMixin, table=True):
     __tablename__ = 'ideas'
+    __table_args__ = (
+        Index('ix_ideas_status_created_at', 'status', 'created_at'),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
-    
+
+    # Plant and BU of the submitter when the idea was counted in idea_stats, so the idea is
+    # removed from the row it was added to even after its submitter moved (no foreign keys, as in idea_stats)
+    stats_plant_id: Optional[int] = Field(default=None)
+    stats_bu_id: Optional[int] = Field(default=None)
+
     submitter: Optional["UserModel"] = Relationship()
     
     attachments: list['AttachmentModel'] = Relationship(back_populates='idea', cascade_delete=True)
@@ -87,4 +95,25 @@ class Idea(IdeaBase):
     teoa_review: Optional[TeoaReview]=None
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class IdeaSearchHit(SQLModel):
+    idea: Idea
+    # Relevance of the idea for the query, higher first
+    rank: float
+    # Matched fields with the terms wrapped in <mark>
+    highlights: Dict[str, str] = {}
+
+
+class LeaderboardEntry(SQLModel):
+    """
+    Rated idea, as listed by the rating leaderboard.
+    """
+    idea_id: int
+    title: str
+    status: IdeaStatus
+    total_score: float
+    rating_matrix_id: int
+    plant_id: Optional[int] = None
+    bu_id: Optional[int] = None
\ No newline at end of file
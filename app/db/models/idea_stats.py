@@ -0,0 +1,50 @@
+from datetime import date
+from typing import List, Optional
+from sqlmodel import SQLModel, Field, Column, UniqueConstraint
+from .idea import IdeaStatus
+
+
+class IdeaStatsModel(SQLModel, table=True):
+    """
+    Number of ideas per month of creation, status and plant/BU of the submitter when the idea
+    was submitted (see IdeaModel.stats_plant_id), kept current by IdeaRepository on every idea write.
+    """
+    __tablename__ = 'idea_stats'
+    __table_args__ = (
+        UniqueConstraint('month', 'status', 'plant_id', 'bu_id', name='uq_idea_stats_month_status_plant_bu'),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    month: date = Field()
+    status: IdeaStatus = Field(sa_column=Column(IdeaStatus.as_enum_type(), nullable=False))
+    # No foreign keys: the summary must not hold back the deletion of a plant or BU
+    plant_id: Optional[int] = Field(default=None)
+    bu_id: Optional[int] = Field(default=None)
+    idea_count: int = Field(default=0)
+
+
+class StatusCount(SQLModel):
+    status: IdeaStatus
+    count: int
+
+
+class PlantCount(SQLModel):
+    plant_id: Optional[int]
+    count: int
+
+
+class BUCount(SQLModel):
+    bu_id: Optional[int]
+    count: int
+
+
+class MonthCount(SQLModel):
+    month: date
+    count: int
+
+
+class IdeaStats(SQLModel):
+    total: int
+    by_status: List[StatusCount]
+    by_plant: List[PlantCount]
+    by_bu: List[BUCount]
+    by_month: List[MonthCount]
@@ -1,11 +1,31 @@
-from typing import Optional, TYPE_CHECKING
-from sqlmodel import SQLModel, Field, Relationship
+from typing import Any, Mapping, Optional, TYPE_CHECKING, Union
+from sqlalchemy import event
+from sqlmodel import SQLModel, Field, Relationship, Index
 
 
 if TYPE_CHECKING:
     from app.db.models import IdeaModel
 
 
+# Criteria summed into the total score of a rating
+RATING_CRITERIA = (
+    'quality', 'cost_reduction', 'time_savings', 'ehs',
+    'initiative', 'creativity', 'transversalization', 'effectiveness',
+)
+
+
+def compute_total_score(rating: Union[Mapping[str, Any], SQLModel], weights: Optional[Mapping[str, float]] = None) -> float:
+    """
+    Total score of a rating matrix (record or column values): the weighted sum of its criteria,
+    a plain sum without weights.
+    """
+    get = rating.get if isinstance(rating, Mapping) else lambda name, default: getattr(rating, name, default)
+    return float(sum(
+        (get(criterion, 0) or 0) * (weights[criterion] if weights else 1)
+        for criterion in RATING_CRITERIA
+    ))
+
+
 class RatingMatrixBase(SQLModel):
     comments: Optional[str] = None
     quality: int = 0
@@ -16,10 +36,9 @@ class RatingMatrixBase(SQLModel):
     creativity: int = 0
     transversalization: int = 0
     effectiveness: int = 0
-    total_score: float = 0
 
 class RatingMatrixMixin(SQLModel):
-    idea_id: Optional[int] = Field(default=None, foreign_key="ideas.id", ondelete='CASCADE')
+    idea_id: Optional[int] = Field(default=None, foreign_key="ideas.id", ondelete='CASCADE', index=True)
 
 
 class RatingMatrixCreate(RatingMatrixBase, RatingMatrixMixin):
@@ -27,13 +46,27 @@ class RatingMatrixCreate(RatingMatrixBase, RatingMatrixMixin):
 
 class RatingMatrixModel(RatingMatrixBase, RatingMatrixMixin, table=True):
     __tablename__ = "rating_matrices"
+    __table_args__ = (
+        # Leaderboard order, read from the top
+        Index('ix_rating_matrices_total_score_id', 'total_score', 'id'),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
+    # Computed from the criteria on every write, never taken from the client
+    total_score: float = 0
     
     idea: Optional['IdeaModel'] = Relationship(back_populates='rating_matrix')
 
+
+@event.listens_for(RatingMatrixModel, 'before_insert')
+@event.listens_for(RatingMatrixModel, 'before_update')
+def _score_rating_matrix(mapper, connection, target: RatingMatrixModel) -> None:
+    from app.db.scoring import active_weights
+    target.total_score = compute_total_score(target, active_weights(connection))
+
     
 class RatingMatrix(RatingMatrixBase):
     id: int
+    total_score: float
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
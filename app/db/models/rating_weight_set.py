@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import Optional
+from sqlmodel import SQLModel, Field
+
+
+class RatingWeightSetBase(SQLModel):
+    name: str = Field(unique=True, max_length=255)
+    # Weight of each rating criterion in the total score
+    quality: float = 1
+    cost_reduction: float = 1
+    time_savings: float = 1
+    ehs: float = 1
+    initiative: float = 1
+    creativity: float = 1
+    transversalization: float = 1
+    effectiveness: float = 1
+
+class RatingWeightSetCreate(RatingWeightSetBase):
+    pass
+
+
+class RatingWeightSetModel(RatingWeightSetBase, table=True):
+    __tablename__ = "rating_weight_sets"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # Only changed by the activation job, which rescores every rating with the set
+    is_active: bool = Field(default=False)
+    activated_at: Optional[datetime] = Field(default=None)
+    created_at: datetime = Field(default_factory=datetime.now)
+    
+    
+class RatingWeightSet(RatingWeightSetBase):
+    id: int
+    is_active: bool
+    activated_at: Optional[datetime] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
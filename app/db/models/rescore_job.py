@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import text
+from sqlmodel import SQLModel, Field, Index
+
+
+class RescoreJobModel(SQLModel, table=True):
+    """
+    Activation of a rating weight set, run by one worker (or the rescore command)
+    and polled through any of them.
+    """
+    __tablename__ = 'rescore_jobs'
+    __table_args__ = (
+        # At most one pending or running job, whichever process started it
+        Index(
+            'ux_rescore_jobs_active', 'is_active', unique=True,
+            mssql_where=text('is_active = 1'), sqlite_where=text('is_active = 1')
+        ),
+    )
+    id: str = Field(primary_key=True, max_length=32)
+    # No foreign key: the history of the jobs must not hold back the deletion of a weight set
+    weight_set_id: int = Field()
+    # pending, running, done or failed
+    status: str = Field(max_length=16)
+    is_active: bool = Field(default=True)
+    processed: int = Field(default=0)
+    total: Optional[int] = Field(default=None)
+    error: Optional[str] = Field(default=None)
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: Optional[datetime] = Field(default=None)
+    finished_at: Optional[datetime] = Field(default=None)
+    # Moved on by the progress of the job: an active job left behind by a crashed process is abandoned after a while
+    heartbeat_at: datetime = Field(default_factory=datetime.now)
@@ -15,8 +15,8 @@ class TeoaCommentBase(SQLModel):
     
     
 class TeoaCommentMixin(SQLModel):
-    commenter_id: Optional[int] = Field(default=None, foreign_key='users.id', ondelete='CASCADE')
-    teoa_review_id: Optional[int] = Field(default=None, foreign_key='teoa_reviews.id', ondelete='CASCADE')
+    commenter_id: Optional[int] = Field(default=None, foreign_key='users.id', ondelete='CASCADE', index=True)
+    teoa_review_id: Optional[int] = Field(default=None, foreign_key='teoa_reviews.id', ondelete='CASCADE', index=True)
 
 
 class TeoaCommentCreate(TeoaCommentBase, TeoaCommentMixin):
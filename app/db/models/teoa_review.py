@@ -11,7 +11,7 @@ class TeoaReviewBase(SQLModel):
     ...
 
 class TeoaReviewMixin(SQLModel):
-    idea_id: Optional[int] = Field(default=None, foreign_key="ideas.id", ondelete='CASCADE')
+    idea_id: Optional[int] = Field(default=None, foreign_key="ideas.id", ondelete='CASCADE', index=True)
 
 
 class TeoaReviewCreate(TeoaReviewBase, TeoaReviewMixin):
@@ -32,8 +32,8 @@ class UserBase(SQLModel):
     
 
 class UserLocationMixin(SQLModel):
-    bu_id: Optional[int] = Field(default=None, foreign_key="bus.id", ondelete='SET NULL')
-    plant_id: Optional[int] = Field(default=None, foreign_key="plants.id", ondelete='SET NULL')
+    bu_id: Optional[int] = Field(default=None, foreign_key="bus.id", ondelete='SET NULL', index=True)
+    plant_id: Optional[int] = Field(default=None, foreign_key="plants.id", ondelete='SET NULL', index=True)
 
 
 class UserModel(UserBase, UserLocationMixin, table=True):
@@ -41,6 +41,8 @@ class UserModel(UserBase, UserLocationMixin, table=True):
     
     id: Optional[int] = Field(default=None, primary_key=True)
     hashed_password: str = Field()
+    # Carried by the tokens as the 'ver' claim: incrementing it revokes every token issued before
+    token_version: int = Field(default=0)
     
     bu: Optional['BUModel'] = Relationship(back_populates='user')
     
@@ -75,11 +77,30 @@ class UserInDb(UserBase, UserLocationMixin):
     role_id: int = Field(default=0)
 
 
+class UserBatchRoleMixin(SQLModel):
+    # Role of the user, replacing the roles of an existing one; an unknown role is reported as a conflict
+    role_id: Optional[int] = Field(default=None)
+
+
+class UserBatchCreate(UserBase, UserLocationMixin, UserBatchRoleMixin):
+    password: str = Field()
+
+
+class UserBatchUpsert(UserBase, UserLocationMixin, UserBatchRoleMixin):
+    # Existing users keep their password when none is sent
+    password: Optional[str] = Field(default=None)
+
+
+class UserBatchRow(UserBase, UserLocationMixin, UserBatchRoleMixin):
+    hashed_password: Optional[str] = Field(default=None)
+
+
 class User(UserBase):
     id: int
     roles: List[Role] = []
     bu: BU
     plant: Plant
+    token_version: int = Field(default=0, exclude=True)
     class Config:
         from_attributes = True
 
@@ -0,0 +1,97 @@
+import threading
+import time
+from typing import Dict, Any
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+
+class PoolStatistics:
+    """
+    Checkout counters of an instrumented pool, shared by the threads of the worker.
+    """
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, elapsed: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.total_wait += elapsed
+            self.max_wait = max(self.max_wait, elapsed)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'average_wait_ms': round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 3),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool measuring how long each checkout waits for a connection,
+    including the time spent opening a new one when the pool is not full yet.
+    """
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.statistics = PoolStatistics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.statistics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.statistics.record(time.perf_counter() - started)
+        return connection
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """
+    InstrumentedQueuePool for async engines.
+    """
+
+
+def engine_options(url: str, settings, is_async: bool = False) -> Dict[str, Any]:
+    """
+    Keyword arguments of create_engine/create_async_engine built from the DatabaseSettings.
+    """
+    options = {
+        'poolclass': InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool,
+        'pool_size': settings.POOL_SIZE,
+        'max_overflow': settings.MAX_OVERFLOW,
+        'pool_timeout': settings.POOL_TIMEOUT,
+        'pool_recycle': settings.POOL_RECYCLE,
+        'pool_pre_ping': settings.POOL_PRE_PING,
+    }
+    # Only pyodbc sends executemany batches as a single round trip
+    if settings.FAST_EXECUTEMANY and make_url(url).get_driver_name() == 'pyodbc':
+        options['fast_executemany'] = True
+    return options
+
+
+def pool_status(pool) -> Dict[str, Any]:
+    """
+    Current occupancy of a pool, plus the checkout statistics of instrumented pools.
+    """
+    status = {'pool_class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        status.update(pool.statistics.snapshot())
+    return status
\ No newline at end of file
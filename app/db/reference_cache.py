@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, NamedTuple, Optional, Set, Tuple
+from app.db.unit_of_work import on_tables_committed
+from app.db.invalidation import table_version
+
+
+class TableSnapshot(NamedTuple):
+    """
+    Immutable copy of a small table: its column names and one tuple of values per row.
+    """
+    columns: Tuple[str, ...]
+    rows: Tuple[Tuple[Any, ...], ...]
+    positions: Dict[Any, int]  # primary key -> index in rows
+    loaded_at: float
+    version: Optional[int]  # version of the table on the invalidation channel when it was loaded
+
+
+class ReferenceCache:
+    """
+    Process-wide snapshots of the tables of cached repositories (see `CRUDBaseRepository.cache_ttl`).
+    A snapshot is dropped when a transaction of the process writing to its table commits,
+    and ignored once the table version on the invalidation channel moved (a write in another
+    worker) or the snapshot is older than the TTL.
+    """
+    def __init__(self) -> None:
+        self._snapshots: Dict[str, TableSnapshot] = {}
+        self._lock = threading.Lock()
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    def get(self, table: str, ttl: float) -> Optional[TableSnapshot]:
+        snapshot = self._snapshots.get(table)
+        if (
+            snapshot is None
+            or time.monotonic() - snapshot.loaded_at > ttl
+            or snapshot.version is None
+            or snapshot.version != table_version(table)
+        ):
+            self.misses[table] += 1
+            return None
+        self.hits[table] += 1
+        return snapshot
+
+    def put(
+        self, table: str, columns: Tuple[str, ...], rows: Tuple[Tuple[Any, ...], ...], version: Optional[int]
+    ) -> TableSnapshot:
+        """
+        Store the rows of the table, `version` being its version read before the rows were.
+        """
+        key_position = columns.index('id')
+        snapshot = TableSnapshot(
+            columns=columns,
+            rows=rows,
+            positions={row[key_position]: index for index, row in enumerate(rows)},
+            loaded_at=time.monotonic(),
+            version=version,
+        )
+        with self._lock:
+            self._snapshots[table] = snapshot
+        return snapshot
+
+    def invalidate(self, tables: Set[str]) -> None:
+        with self._lock:
+            for table in tables:
+                self._snapshots.pop(table, None)
+
+    def statistics(self) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic()
+        snapshots = dict(self._snapshots)
+        tables = set(self.hits) | set(self.misses) | set(snapshots)
+        return {
+            table: {
+                'hits': self.hits[table],
+                'misses': self.misses[table],
+                'rows': len(snapshots[table].rows) if table in snapshots else 0,
+                'age_seconds': round(now - snapshots[table].loaded_at, 3) if table in snapshots else None,
+            }
+            for table in sorted(tables)
+        }
+
+
+reference_cache = ReferenceCache()
+
+on_tables_committed(reference_cache.invalidate)
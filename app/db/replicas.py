@@ -0,0 +1,63 @@
+import itertools
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy.engine import Engine
+from app.db.unit_of_work import on_tables_committed
+
+
+# Monotonic time of the last committed write per table, in this process
+_last_writes: Dict[str, float] = {}
+_last_writes_lock = threading.Lock()
+# Last version of each table read from the invalidation channel
+_seen_versions: Dict[str, int] = {}
+
+
+def written_since(tables: Iterable[str], seconds: float) -> bool:
+    """
+    Whether one of the tables was written by this process less than `seconds` ago,
+    in which case a replica may not have replayed the write yet.
+    """
+    threshold = time.monotonic() - seconds
+    return any(_last_writes.get(table, 0) > threshold for table in tables)
+
+
+def observe_versions(versions: Iterable[Tuple[str, int]]) -> None:
+    """
+    Take a table version moved on the invalidation channel (a write committed by another worker)
+    as a write seen now, so the staleness window covers the writes of every worker.
+    """
+    now = time.monotonic()
+    for table, version in versions:
+        seen = _seen_versions.get(table)
+        if seen is not None and seen != version:
+            with _last_writes_lock:
+                _last_writes[table] = max(_last_writes.get(table, 0), now)
+        _seen_versions[table] = version
+
+
+@on_tables_committed
+def _record_committed_writes(tables: Set[str]) -> None:
+    now = time.monotonic()
+    with _last_writes_lock:
+        for table in tables:
+            _last_writes[table] = now
+
+
+class ReplicaSet:
+    """
+    Round robin over the read replica engines.
+    """
+    def __init__(self, engines: List[Engine]) -> None:
+        self.engines = engines
+        self._cycle = itertools.cycle(engines) if engines else None
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def next_engine(self) -> Optional[Engine]:
+        if self._cycle is None:
+            return None
+        with self._lock:
+            return next(self._cycle)
@@ -3,9 +3,11 @@ from .bu import BURepository, BURepositoryDep
 from .role import RoleRepository, RoleRepositoryDep
 from .plant import PlantRepository, PlantRepositoryDep
 from .idea import IdeaRepository, IdeaRepositoryDep
+from .idea_stats import IdeaStatsRepository, IdeaStatsRepositoryDep
 from .attachment import AttachmentRepository, AttachmentRepositoryDep
 from .comment import CommentRepository, CommentRepositoryDep
 from .rating_matrix import RatingMatrixRepository, RatingMatrixRepositoryDep
+from .rating_weight_set import RatingWeightSetRepository, RatingWeightSetRepositoryDep
 from .assignment import AssignmentRepository, AssignmentRepositoryDep
 from .assignment_comment import AssignmentCommentRepository, AssignmentCommentRepositoryDep
 from .teoa_comment import TeoaCommentRepository, TeoaCommentRepositoryDep
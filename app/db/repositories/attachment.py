@@ -1,5 +1,6 @@
-from typing import Annotated
+from typing import Annotated, List
 from fastapi import Depends
+from sqlmodel import Session, select
 
 from app.db.crud_repository import CRUDBaseRepository
 from app.db.dependencies import get_repository
@@ -9,5 +10,23 @@ class AttachmentRepository(CRUDBaseRepository):
     def __init__(self) -> None:
         super().__init__(AttachmentModel, Attachment)
         
+    def find_file_paths_by_ids(self, db: Session, ids: List[int]) -> List[str]:
+        """
+        Fetch the file paths of the given attachments without loading the rows.
+        """
+        paths = []
+        for chunk in self._chunks(ids):
+            paths.extend(db.exec(select(self.model.file_path).where(self.model.id.in_(chunk))).all())
+        return paths
+    
+    def find_file_paths_by_idea_ids(self, db: Session, idea_ids: List[int]) -> List[str]:
+        """
+        Fetch the file paths of every attachment belonging to the given ideas.
+        """
+        paths = []
+        for chunk in self._chunks(idea_ids):
+            paths.extend(db.exec(select(self.model.file_path).where(self.model.idea_id.in_(chunk))).all())
+        return paths
+        
 
 AttachmentRepositoryDep = Annotated[AttachmentRepository, Depends(get_repository(AttachmentRepository))]
\ No newline at end of file
@@ -1,13 +1,13 @@
 from typing import Annotated
 from fastapi import Depends
 
-from app.db.crud_repository import CRUDBaseRepository
+from app.db.crud_repository import CRUDBaseRepository, REFERENCE_CACHE_TTL
 from app.db.dependencies import get_repository
 from app.db.models import BUModel, BU
 
 class BURepository(CRUDBaseRepository):
     def __init__(self) -> None:
-        super().__init__(BUModel, BU)
+        super().__init__(BUModel, BU, natural_key='name', cache_ttl=REFERENCE_CACHE_TTL)
         
 
 BURepositoryDep = Annotated[BURepository, Depends(get_repository(BURepository))]
\ No newline at end of file
@@ -1,14 +1,146 @@
-from typing import Annotated, Optional
+from collections import Counter
+from typing import Annotated, Any, Dict, List, Optional, Tuple
 from fastapi import Depends
+from sqlalchemy import Integer, and_, case, func, or_, text, update
 from sqlmodel import Session, select
 
 from app.db.crud_repository import CRUDBaseRepository
 from app.db.dependencies import get_repository
-from app.db.models import IdeaModel, Idea
+from app.db.models import IdeaModel, Idea, IdeaStats, UserModel
+from app.db.repositories.idea_stats import IdeaStatsRepository, StatsKey, stats_key
+from app.schemas.batch import BatchResult
+from app.utils.database import apply_filters
+from app.utils.search import fulltext_condition
+
+# Columns covered by the search, with their weight in the ranking of the LIKE fallback
+SEARCH_WEIGHTS = {'title': 3, 'description': 1, 'actual_situation': 1}
 
 class IdeaRepository(CRUDBaseRepository):
     def __init__(self) -> None:
         super().__init__(IdeaModel, Idea)
-        
+        self.stats = IdeaStatsRepository()
+
+    def _stats_keys(self, db: Session, ids: List[int]) -> Dict[int, StatsKey]:
+        """
+        Row of the idea_stats summary each idea counts in.
+        """
+        keys = {}
+        for chunk in self._chunks(ids):
+            statement = (
+                select(
+                    self.model.id, self.model.created_at, self.model.status,
+                    self.model.stats_plant_id, self.model.stats_bu_id
+                )
+                .where(self.model.id.in_(chunk))
+            )
+            for idea_id, *key in db.exec(statement):
+                keys[idea_id] = stats_key(*key)
+        return keys
+
+    def _locate(self, db: Session, ids: List[int]) -> None:
+        """
+        Store on the ideas the current plant and BU of their submitter, the summary row they count in from now on.
+        """
+        def submitter(column):
+            return select(column).where(UserModel.id == self.model.submitter_id).scalar_subquery()
+
+        for chunk in self._chunks(ids):
+            db.execute(
+                update(self.model)
+                .where(self.model.id.in_(chunk))
+                .values(stats_plant_id=submitter(UserModel.plant_id), stats_bu_id=submitter(UserModel.bu_id))
+                .execution_options(synchronize_session='fetch')
+            )
+
+    def _count(self, db: Session, added: Dict[int, StatsKey], removed: Dict[int, StatsKey]) -> None:
+        deltas = Counter(added.values())
+        deltas.subtract(removed.values())
+        self.stats.apply_deltas(db, deltas)
+
+    # Every write keeps the idea_stats summary current, in the same transaction
+
+    def insert_line(self, db: Session, data):
+        record = super().insert_line(db, data)
+        self._locate(db, [record.id])
+        self._count(db, added=self._stats_keys(db, [record.id]), removed={})
+        return record
+
+    def insert_many(self, db: Session, data: List) -> BatchResult:
+        result = super().insert_many(db, data)
+        self._locate(db, result.created)
+        self._count(db, added=self._stats_keys(db, result.created), removed={})
+        return result
+
+    def find_by_id_and_update(self, db: Session, model_id: int, data: Dict):
+        before = self._stats_keys(db, [model_id])
+        record = super().find_by_id_and_update(db, model_id, data)
+        if record is not None:
+            if 'submitter_id' in data:
+                self._locate(db, [model_id])
+            self._count(db, added=self._stats_keys(db, [model_id]), removed=before)
+        return record
+
+    def delete_by_id(self, db: Session, model_id: int):
+        before = self._stats_keys(db, [model_id])
+        record = super().delete_by_id(db, model_id)
+        if record is not None:
+            self._count(db, added={}, removed=before)
+        return record
+
+    def delete_by_ids(self, db: Session, ids: List[int]) -> Optional[List[int]]:
+        before = self._stats_keys(db, ids)
+        deleted_ids = super().delete_by_ids(db, ids)
+        if deleted_ids:
+            self._count(db, added={}, removed=before)
+        return deleted_ids
+
+    def stats_summary(self, db: Session, plant_id: Optional[int] = None, bu_id: Optional[int] = None) -> IdeaStats:
+        return self.stats.summary(db, plant_id=plant_id, bu_id=bu_id)
+
+    def search(
+        self,
+        db: Session,
+        terms: List[str],
+        offset: int,
+        limit: int,
+        filters: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Tuple[List[Tuple[IdeaModel, float]], Optional[int]]:
+        """
+        Page of the ideas matching every term, best ranked first, with the number of matches
+        (None when the page is empty).
+        On SQL Server the full-text index ranks the matches (CONTAINSTABLE), elsewhere (SQLite in tests)
+        a LIKE scan weighs the columns the terms occur in.
+        """
+        if db.get_bind().dialect.name == 'mssql':
+            matches = (
+                text(
+                    "SELECT [KEY] AS idea_id, [RANK] AS rank "
+                    "FROM CONTAINSTABLE(ideas, (title, description, actual_situation), :condition)"
+                )
+                .bindparams(condition=fulltext_condition(terms))
+                .columns(idea_id=Integer, rank=Integer)
+                .subquery('matches')
+            )
+            rank = matches.c.rank
+            statement = select(self.model, rank, func.count().over()).join(matches, matches.c.idea_id == self.model.id)
+        else:
+            occurs = {
+                (term, field): func.lower(getattr(self.model, field)).contains(term, autoescape=True)
+                for term in terms for field in SEARCH_WEIGHTS
+            }
+            rank = sum(case((condition, SEARCH_WEIGHTS[field]), else_=0) for (_, field), condition in occurs.items())
+            statement = (
+                select(self.model, rank, func.count().over())
+                .where(and_(*(or_(*(occurs[term, field] for field in SEARCH_WEIGHTS)) for term in terms)))
+            )
+
+        statement = statement.options(*self.loader_options).order_by(rank.desc(), self.model.id)
+        if filters:
+            statement = apply_filters(self.model, statement, filters)
+        rows = db.exec(statement.offset(offset).limit(limit)).all()
+        if not rows:
+            return [], None
+        return [(row[0], float(row[1])) for row in rows], rows[0][2]
+
 
 IdeaRepositoryDep = Annotated[IdeaRepository, Depends(get_repository(IdeaRepository))]
\ No newline at end of file
@@ -0,0 +1,125 @@
+import logging
+from collections import Counter, defaultdict
+from datetime import date, datetime
+from typing import Annotated, Dict, Optional, Tuple
+from fastapi import Depends
+from sqlalchemy import delete, extract, func, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.db.crud_repository import CRUDBaseRepository
+from app.db.dependencies import get_repository
+from app.db.models import IdeaModel, IdeaStatsModel, IdeaStats
+from app.db.models.idea import IdeaStatus
+
+# (month, status, plant_id, bu_id): one row of the summary
+StatsKey = Tuple[date, IdeaStatus, Optional[int], Optional[int]]
+
+
+def stats_key(created_at: datetime, status, plant_id: Optional[int], bu_id: Optional[int]) -> StatsKey:
+    return (date(created_at.year, created_at.month, 1), IdeaStatus(status), plant_id, bu_id)
+
+
+class IdeaStatsRepository(CRUDBaseRepository):
+    def __init__(self) -> None:
+        super().__init__(IdeaStatsModel, IdeaStatsModel)
+
+    def _key_condition(self, key: StatsKey):
+        month, status, plant_id, bu_id = key
+        return (
+            (self.model.month == month)
+            & (self.model.status == status)
+            & (self.model.plant_id.is_(None) if plant_id is None else self.model.plant_id == plant_id)
+            & (self.model.bu_id.is_(None) if bu_id is None else self.model.bu_id == bu_id)
+        )
+
+    def _increment(self, db: Session, key: StatsKey, delta: int) -> int:
+        statement = (
+            update(self.model)
+            .where(self._key_condition(key))
+            .values(idea_count=self.model.idea_count + delta)
+            .execution_options(synchronize_session=False)
+        )
+        return db.execute(statement).rowcount
+
+    def apply_deltas(self, db: Session, deltas: Counter) -> None:
+        """
+        Add the count changes of an idea write to the summary, in the transaction of the write.
+        """
+        for key, delta in deltas.items():
+            if not delta or self._increment(db, key, delta):
+                continue
+            month, status, plant_id, bu_id = key
+            try:
+                # The row of a new combination, unless a concurrent transaction just created it
+                with db.begin_nested():
+                    db.execute(insert(self.model).values(
+                        month=month, status=status, plant_id=plant_id, bu_id=bu_id, idea_count=delta
+                    ))
+            except IntegrityError:
+                self._increment(db, key, delta)
+
+    def summary(self, db: Session, plant_id: Optional[int] = None, bu_id: Optional[int] = None) -> IdeaStats:
+        """
+        Idea counts by status, plant, BU and month, read from the summary rows only.
+        A negative count means the summary drifted from the ideas: it is served as is, and logged.
+        """
+        statement = select(self.model).where(self.model.idea_count != 0)
+        if plant_id is not None:
+            statement = statement.where(self.model.plant_id == plant_id)
+        if bu_id is not None:
+            statement = statement.where(self.model.bu_id == bu_id)
+
+        by_status, by_plant, by_bu, by_month = Counter(), Counter(), Counter(), Counter()
+        for row in db.exec(statement):
+            if row.idea_count < 0:
+                logging.warning(
+                    f"idea_stats row {row.id} counts {row.idea_count} ideas, "
+                    "repair the summary with `python -m app.commands.rebuild_idea_stats`"
+                )
+            by_status[row.status] += row.idea_count
+            by_plant[row.plant_id] += row.idea_count
+            by_bu[row.bu_id] += row.idea_count
+            by_month[row.month] += row.idea_count
+
+        return IdeaStats(
+            total=sum(by_status.values()),
+            by_status=[{'status': key, 'count': count} for key, count in sorted(by_status.items())],
+            by_plant=[{'plant_id': key, 'count': count} for key, count in sorted(by_plant.items(), key=_nulls_last)],
+            by_bu=[{'bu_id': key, 'count': count} for key, count in sorted(by_bu.items(), key=_nulls_last)],
+            by_month=[{'month': key, 'count': count} for key, count in sorted(by_month.items())],
+        )
+
+    def rebuild(self, db: Session) -> int:
+        """
+        Recompute the summary from the ideas table, e.g. after ideas were written outside the repositories.
+        Ideas count under the plant and BU stored on them when they were submitted.
+        Returns the number of summary rows.
+        """
+        year, month = extract('year', IdeaModel.created_at), extract('month', IdeaModel.created_at)
+        location = (IdeaModel.stats_plant_id, IdeaModel.stats_bu_id)
+        statement = (
+            select(year, month, IdeaModel.status, *location, func.count())
+            .group_by(year, month, IdeaModel.status, *location)
+        )
+        counts: Dict[StatsKey, int] = defaultdict(int)
+        for row_year, row_month, status, plant_id, bu_id, count in db.exec(statement):
+            counts[(date(int(row_year), int(row_month), 1), IdeaStatus(status), plant_id, bu_id)] += count
+
+        db.execute(delete(self.model))
+        rows = [
+            {'month': month, 'status': status, 'plant_id': plant_id, 'bu_id': bu_id, 'idea_count': count}
+            for (month, status, plant_id, bu_id), count in counts.items()
+        ]
+        if rows:
+            db.execute(insert(self.model), rows)
+        db.flush()
+        return len(rows)
+
+
+def _nulls_last(item):
+    key, _ = item
+    return (key is None, key or 0)
+
+
+IdeaStatsRepositoryDep = Annotated[IdeaStatsRepository, Depends(get_repository(IdeaStatsRepository))]
\ No newline at end of file
@@ -1,13 +1,13 @@
 from typing import Annotated
 from fastapi import Depends
 
-from app.db.crud_repository import CRUDBaseRepository
+from app.db.crud_repository import CRUDBaseRepository, REFERENCE_CACHE_TTL
 from app.db.dependencies import get_repository
 from app.db.models import PlantModel, Plant
 
 class PlantRepository(CRUDBaseRepository):
     def __init__(self) -> None:
-        super().__init__(PlantModel, Plant)
+        super().__init__(PlantModel, Plant, natural_key='name', cache_ttl=REFERENCE_CACHE_TTL)
         
 
 PlantRepositoryDep = Annotated[PlantRepository, Depends(get_repository(PlantRepository))]
\ No newline at end of file
@@ -1,13 +1,61 @@
-from typing import Annotated
+from typing import Annotated, Any, Dict, List, Optional, Tuple
 from fastapi import Depends
+from sqlalchemy import and_, or_
+from sqlmodel import Session, SQLModel, select
 
 from app.db.crud_repository import CRUDBaseRepository
 from app.db.dependencies import get_repository
-from app.db.models import RatingMatrixModel, RatingMatrix
+from app.db.models import RatingMatrixModel, RatingMatrix, IdeaModel, UserModel, compute_total_score
+from app.db.models.idea import IdeaStatus
+from app.db.scoring import active_weights
 
 class RatingMatrixRepository(CRUDBaseRepository):
     def __init__(self) -> None:
         super().__init__(RatingMatrixModel, RatingMatrix)
-        
+
+    def _to_row(self, db: Session, data: SQLModel) -> Dict[str, Any]:
+        # Bulk inserts skip the ORM events scoring single records
+        row = super()._to_row(db, data)
+        row['total_score'] = compute_total_score(row, active_weights(db.connection()))
+        return row
+
+    def leaderboard(
+        self,
+        db: Session,
+        limit: int,
+        after: Optional[Tuple[float, int]] = None,
+        plant_id: Optional[int] = None,
+        bu_id: Optional[int] = None,
+        status: Optional[IdeaStatus] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Rated ideas by decreasing total score (ties by decreasing rating id), read from the
+        (total_score, id) index. `after` is the (total_score, id) of the last entry of the previous page.
+        Plant and BU are the ones of the submitter.
+        """
+        statement = (
+            select(
+                IdeaModel.id.label('idea_id'), IdeaModel.title, IdeaModel.status, self.model.total_score,
+                self.model.id.label('rating_matrix_id'), UserModel.plant_id, UserModel.bu_id
+            )
+            .select_from(self.model)
+            .join(IdeaModel, IdeaModel.id == self.model.idea_id)
+            .outerjoin(UserModel, UserModel.id == IdeaModel.submitter_id)
+            .order_by(self.model.total_score.desc(), self.model.id.desc())
+        )
+        if after is not None:
+            score, rating_id = after
+            statement = statement.where(or_(
+                self.model.total_score < score,
+                and_(self.model.total_score == score, self.model.id < rating_id)
+            ))
+        if plant_id is not None:
+            statement = statement.where(UserModel.plant_id == plant_id)
+        if bu_id is not None:
+            statement = statement.where(UserModel.bu_id == bu_id)
+        if status is not None:
+            statement = statement.where(IdeaModel.status == status)
+        return [dict(row._mapping) for row in db.exec(statement.limit(limit))]
+
 
 RatingMatrixRepositoryDep = Annotated[RatingMatrixRepository, Depends(get_repository(RatingMatrixRepository))]
\ No newline at end of file
@@ -0,0 +1,21 @@
+from typing import Annotated, Dict
+from fastapi import Depends
+from sqlmodel import Session
+
+from app.db.crud_repository import CRUDBaseRepository
+from app.db.dependencies import get_repository
+from app.db.models import RatingWeightSetModel, RatingWeightSet
+
+# Columns only written by the activation job
+ACTIVATION_FIELDS = ('is_active', 'activated_at')
+
+class RatingWeightSetRepository(CRUDBaseRepository):
+    def __init__(self) -> None:
+        super().__init__(RatingWeightSetModel, RatingWeightSet, natural_key='name')
+
+    def find_by_id_and_update(self, db: Session, model_id: int, data: Dict):
+        data = {key: value for key, value in data.items() if key not in ACTIVATION_FIELDS}
+        return super().find_by_id_and_update(db, model_id, data)
+        
+
+RatingWeightSetRepositoryDep = Annotated[RatingWeightSetRepository, Depends(get_repository(RatingWeightSetRepository))]
\ No newline at end of file
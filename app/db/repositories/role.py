@@ -1,13 +1,13 @@
 from typing import Annotated
 from fastapi import Depends
 
-from app.db.crud_repository import CRUDBaseRepository
+from app.db.crud_repository import CRUDBaseRepository, REFERENCE_CACHE_TTL
 from app.db.dependencies import get_repository
 from app.db.models import RoleModel, Role
 
 class RoleRepository(CRUDBaseRepository):
     def __init__(self) -> None:
-        super().__init__(RoleModel, Role)
+        super().__init__(RoleModel, Role, natural_key='name', cache_ttl=REFERENCE_CACHE_TTL)
         
 
 RoleRepositoryDep = Annotated[RoleRepository, Depends(get_repository(RoleRepository))]
\ No newline at end of file
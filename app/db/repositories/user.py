@@ -1,21 +1,44 @@
-from typing import Annotated, Optional
+from collections import defaultdict
+from typing import Annotated, Dict, List, Optional
 from fastapi import Depends
+from sqlalchemy import delete, event, insert, update
+from sqlalchemy.orm import object_session
 from sqlmodel import Session, select
 
 from app.db.crud_repository import CRUDBaseRepository
 from app.db.dependencies import get_repository
-from app.db.models import UserModel, User
+from app.db.models import RoleModel, UserModel, User
+from app.db.models.associations import UserRoleLink
+from app.db.unit_of_work import record_writes
+from app.schemas.batch import BatchConflict, BatchResult
+
+
+def user_key(user_id: int) -> str:
+    """
+    Invalidation key of one user, published with the users table by every write to its row,
+    so the cache of authenticated users only drops the users written.
+    """
+    return f"users:{user_id}"
+
+
+@event.listens_for(UserModel, 'after_update')
+@event.listens_for(UserModel, 'after_delete')
+def _record_user_write(mapper, connection, target: UserModel) -> None:
+    session = object_session(target)
+    if session is not None:
+        record_writes(session, [user_key(target.id)])
+
 
 class UserRepository(CRUDBaseRepository):
     def __init__(self) -> None:
-        super().__init__(UserModel, User)
+        super().__init__(UserModel, User, natural_key='te_id')
         
     def find_by_username_or_email(
             self,
             db: Session,
             email: Optional[str] = None
     ) -> Optional[User]:
-        statement = select(self.model).where(
+        statement = select(self.model).options(*self.loader_options).where(
             self.model.email == email
         )
         result = db.exec(statement).first()
@@ -26,8 +49,92 @@ class UserRepository(CRUDBaseRepository):
         if not user:
             return None
         user.account_status = not user.account_status
-        db.commit()
-        db.refresh(user)
+        if not user.account_status:
+            user.token_version += 1
+        db.flush()
         return user
 
+    # Roles of the batches, linked in the transaction of the batch
+
+    def _reject_invalid_rows(self, db: Session, data: List, rows: List[tuple], result: BatchResult) -> List[tuple]:
+        role_ids = {data[index].role_id for index, _ in rows if getattr(data[index], 'role_id', None) is not None}
+        known = set(db.exec(select(RoleModel.id).where(RoleModel.id.in_(role_ids))).all()) if role_ids else set()
+        accepted = []
+        for index, row in rows:
+            role_id = getattr(data[index], 'role_id', None)
+            if role_id is not None and role_id not in known:
+                result.conflicts.append(BatchConflict(index=index, detail=f"Unknown role {role_id}"))
+                continue
+            accepted.append((index, row))
+        return accepted
+
+    def _assign_roles(self, db: Session, data: List, user_ids: List[int]) -> List[int]:
+        """
+        Give the written users the role sent with their row in place of their roles.
+        Returns the users whose roles changed.
+        """
+        roles: Dict[str, int] = {}
+        for item in data:
+            if getattr(item, 'role_id', None) is not None:
+                # A later row with the same te_id is a conflict, the first one was written
+                roles.setdefault(item.te_id, item.role_id)
+        if not roles:
+            return []
+
+        assigned: Dict[int, int] = {}
+        current = defaultdict(set)
+        for chunk in self._chunks(user_ids):
+            for user_id, te_id in db.exec(select(self.model.id, self.model.te_id).where(self.model.id.in_(chunk))):
+                if te_id in roles:
+                    assigned[user_id] = roles[te_id]
+            links = select(UserRoleLink.user_id, UserRoleLink.role_id).where(UserRoleLink.user_id.in_(chunk))
+            for user_id, role_id in db.exec(links):
+                current[user_id].add(role_id)
+
+        changed = [user_id for user_id, role_id in assigned.items() if current[user_id] != {role_id}]
+        for chunk in self._chunks(changed):
+            db.execute(delete(UserRoleLink).where(UserRoleLink.user_id.in_(chunk)))
+        if changed:
+            db.execute(insert(UserRoleLink), [{'user_id': user_id, 'role_id': assigned[user_id]} for user_id in changed])
+        return changed
+
+    def insert_many(self, db: Session, data: List) -> BatchResult:
+        result = super().insert_many(db, data)
+        self._assign_roles(db, data, result.created)
+        return result
+
+    # The bulk statements skip the ORM events recording the written users
+
+    def upsert_many(self, db: Session, data: List) -> BatchResult:
+        result = super().upsert_many(db, data)
+        self._assign_roles(db, data, result.created)
+        # The tokens issued so far carry the previous roles
+        changed = self._assign_roles(db, data, result.updated)
+        for chunk in self._chunks(changed):
+            db.execute(
+                update(self.model)
+                .where(self.model.id.in_(chunk))
+                .values(token_version=self.model.token_version + 1)
+            )
+        record_writes(db, [user_key(user_id) for user_id in result.updated])
+        return result
+
+    def delete_by_ids(self, db: Session, ids: List[int]) -> Optional[List[int]]:
+        deleted_ids = super().delete_by_ids(db, ids)
+        if deleted_ids:
+            record_writes(db, [user_key(user_id) for user_id in deleted_ids])
+        return deleted_ids
+
+    def revoke_tokens(self, db: Session, user_id: int) -> bool:
+        """
+        Invalidate every token issued to the user so far, False when the user doesn't exist.
+        """
+        result = db.execute(
+            update(self.model)
+            .where(self.model.id == user_id)
+            .values(token_version=self.model.token_version + 1)
+        )
+        record_writes(db, [user_key(user_id)])
+        return result.rowcount > 0
+
 UserRepositoryDep = Annotated[UserRepository, Depends(get_repository(UserRepository))]
\ No newline at end of file
@@ -0,0 +1,235 @@
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.db.invalidation import table_version
+from app.db.models import RatingMatrixModel, RatingWeightSetModel, RescoreJobModel, RATING_CRITERIA
+
+# Ratings read and written back per round trip by the rescore job
+RESCORE_CHUNK_SIZE = 5000
+
+# Seconds without progress after which a pending or running job is taken for abandoned by a process
+# that died, and no longer keeps another one from starting
+RESCORE_JOB_STALE_AFTER = 600
+
+# Seconds after which the active weights are read again even if their table version didn't move,
+# bounding how long a set activated by a process the channel can't see is ignored
+ACTIVE_WEIGHTS_TTL = 30
+
+# Weights of the active set with the table version and monotonic time they were read at
+_active_weights: Optional[Tuple[Optional[int], Optional[Dict[str, float]], float]] = None
+
+
+def active_weights(connection) -> Optional[Dict[str, float]]:
+    """
+    Criterion weights of the active weight set, None when no set is active (plain sum).
+    Read again once the rating_weight_sets version moved on the invalidation channel,
+    or after ACTIVE_WEIGHTS_TTL seconds.
+    """
+    global _active_weights
+    version = table_version(RatingWeightSetModel.__tablename__)
+    cached = _active_weights
+    if (
+        cached is not None
+        and version is not None
+        and cached[0] == version
+        and time.monotonic() - cached[2] < ACTIVE_WEIGHTS_TTL
+    ):
+        return cached[1]
+    table = RatingWeightSetModel.__table__
+    row = connection.execute(
+        select(*(table.c[criterion] for criterion in RATING_CRITERIA)).where(table.c.is_active == True)
+    ).first()
+    weights = dict(row._mapping) if row else None
+    _active_weights = (version, weights, time.monotonic())
+    return weights
+
+
+def activate_weight_set(db: Session, weight_set_id: int) -> Optional[Dict[str, float]]:
+    """
+    Make the weight set the active one, returning its weights (None when it doesn't exist).
+    """
+    weight_set = db.get(RatingWeightSetModel, weight_set_id)
+    if weight_set is None:
+        return None
+    db.execute(
+        update(RatingWeightSetModel)
+        .where(RatingWeightSetModel.is_active == True, RatingWeightSetModel.id != weight_set_id)
+        .values(is_active=False)
+        .execution_options(synchronize_session=False)
+    )
+    weight_set.is_active = True
+    weight_set.activated_at = datetime.now()
+    db.flush()
+    return {criterion: getattr(weight_set, criterion) for criterion in RATING_CRITERIA}
+
+
+def rescore_ratings(
+    db: Session,
+    weights: Dict[str, float],
+    chunk_size: int = RESCORE_CHUNK_SIZE,
+    on_progress: Optional[Callable[[int, int], None]] = None
+) -> int:
+    """
+    Recompute the total score of every rating with the given weights.
+    Ratings are read in chunks by primary key, scored as a matrix product with NumPy and written
+    back with one executemany UPDATE per chunk. Returns the number of ratings rescored.
+    """
+    table = RatingMatrixModel.__table__
+    vector = np.array([weights[criterion] for criterion in RATING_CRITERIA], dtype=np.float64)
+    columns = [table.c.id, *(table.c[criterion] for criterion in RATING_CRITERIA)]
+    total = db.exec(select(func.count()).select_from(table)).one()
+
+    processed, last_id = 0, None
+    while True:
+        statement = select(*columns).order_by(table.c.id).limit(chunk_size)
+        if last_id is not None:
+            statement = statement.where(table.c.id > last_id)
+        rows = db.exec(statement).all()
+        if not rows:
+            break
+
+        matrix = np.array(rows, dtype=np.float64)
+        ids = matrix[:, 0].astype(np.int64)
+        scores = matrix[:, 1:] @ vector
+        db.execute(
+            update(RatingMatrixModel),
+            [{'id': rating_id, 'total_score': score} for rating_id, score in zip(ids.tolist(), scores.tolist())]
+        )
+
+        processed += len(rows)
+        last_id = int(ids[-1])
+        if on_progress:
+            on_progress(processed, total)
+    return processed
+
+
+class RescoreJob:
+    """
+    Activation of a weight set, recorded in the rescore_jobs table: any worker can report
+    its progress and at most one job runs at a time, whichever worker or command started it.
+    """
+    def __init__(
+        self,
+        job_id: str,
+        weight_set_id: int,
+        session_factory: Callable[[], Session],
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> None:
+        self.id = job_id
+        self.weight_set_id = weight_set_id
+        self.session_factory = session_factory
+        self.status = 'pending'
+        self.processed = 0
+        self.total: Optional[int] = None
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.on_progress = on_progress
+        self.records_progress = False
+
+    def _record(self, **values) -> None:
+        """Write the state of the job to its row, in a transaction of its own."""
+        with self.session_factory() as session:
+            session.execute(update(RescoreJobModel).where(RescoreJobModel.id == self.id).values(**values))
+            session.commit()
+
+    def _progress(self, processed: int, total: int) -> None:
+        self.processed, self.total = processed, total
+        if self.records_progress:
+            self._record(processed=processed, total=total, heartbeat_at=datetime.now())
+        if self.on_progress:
+            self.on_progress(processed, total)
+
+    def run(self, chunk_size: int = RESCORE_CHUNK_SIZE) -> None:
+        """
+        Activate the weight set and rescore every rating in one transaction,
+        so the scores never mix two weight sets.
+        """
+        self.status, self.started_at = 'running', time.monotonic()
+        self._record(status='running', started_at=datetime.now(), heartbeat_at=datetime.now())
+        try:
+            with self.session_factory() as session:
+                # SQLite has a single writer, held by the rescore until it commits:
+                # the other workers then only see the job start and finish
+                self.records_progress = session.get_bind().dialect.name != 'sqlite'
+                weights = activate_weight_set(session, self.weight_set_id)
+                if weights is None:
+                    raise ValueError(f"Weight set {self.weight_set_id} not found")
+                rescore_ratings(session, weights, chunk_size=chunk_size, on_progress=self._progress)
+                session.commit()
+        except Exception as e:
+            logging.error(f"Rescore job {self.id} failed: {e}")
+            self.status, self.error = 'failed', str(e)
+        else:
+            self.status = 'done'
+        finally:
+            self.finished_at = time.monotonic()
+            self._record(
+                status=self.status, is_active=False, processed=self.processed, total=self.total,
+                error=self.error, finished_at=datetime.now()
+            )
+
+    def snapshot(self) -> Dict:
+        end = self.finished_at or time.monotonic()
+        return {
+            'id': self.id,
+            'weight_set_id': self.weight_set_id,
+            'status': self.status,
+            'processed': self.processed,
+            'total': self.total,
+            'elapsed_seconds': round(end - self.started_at, 3) if self.started_at else None,
+            'error': self.error,
+        }
+
+
+def start_rescore_job(session_factory: Callable[[], Session], weight_set_id: int) -> Optional[RescoreJob]:
+    """
+    Record a new pending job, None while another one is pending or running in any process.
+    An active job without progress for RESCORE_JOB_STALE_AFTER seconds was left behind by a process
+    that died and no longer blocks the new ones.
+    """
+    job_id = uuid.uuid4().hex
+    now = datetime.now()
+    with session_factory() as session:
+        session.execute(
+            update(RescoreJobModel)
+            .where(
+                RescoreJobModel.is_active == True,
+                RescoreJobModel.heartbeat_at < now - timedelta(seconds=RESCORE_JOB_STALE_AFTER)
+            )
+            .values(status='failed', is_active=False, error="Abandoned without progress", finished_at=now)
+        )
+        session.add(RescoreJobModel(id=job_id, weight_set_id=weight_set_id, status='pending', created_at=now, heartbeat_at=now))
+        try:
+            # The unique index on the active jobs rejects a concurrent start from another worker
+            session.commit()
+        except IntegrityError:
+            return None
+    return RescoreJob(job_id, weight_set_id, session_factory)
+
+
+def rescore_job_status(db: Session, job_id: str) -> Optional[Dict]:
+    """
+    State of a job as last recorded, None when it doesn't exist.
+    """
+    job = db.get(RescoreJobModel, job_id)
+    if job is None:
+        return None
+    end = job.finished_at or datetime.now()
+    return {
+        'id': job.id,
+        'weight_set_id': job.weight_set_id,
+        'status': job.status,
+        'processed': job.processed,
+        'total': job.total,
+        'elapsed_seconds': round((end - job.started_at).total_seconds(), 3) if job.started_at else None,
+        'error': job.error,
+    }
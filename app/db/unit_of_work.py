@@ -0,0 +1,148 @@
+import itertools
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Set
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session, SessionTransaction, ORMExecuteState
+
+
+PENDING_WORK_KEY = 'pending_work'
+# Key of the work of the outermost transaction, savepoints are keyed by their SessionTransaction
+ROOT_TRANSACTION = 'root'
+
+# Called with the names of the tables written by each committed transaction
+_commit_listeners: List[Callable[[Set[str]], None]] = []
+
+
+class PendingWork:
+    """
+    Tables written and callbacks queued by one transaction or savepoint, not committed yet.
+    """
+    def __init__(self) -> None:
+        self.tables: Set[str] = set()
+        self.callbacks: List[Callable[[], None]] = []
+        self.released = False
+
+    def merge(self, other: 'PendingWork') -> None:
+        self.tables |= other.tables
+        self.callbacks.extend(other.callbacks)
+
+
+def _pending_work(session: Session) -> Dict[Any, PendingWork]:
+    return session.info.setdefault(PENDING_WORK_KEY, {})
+
+
+def _current_work(session: Session) -> PendingWork:
+    """
+    Work of the innermost open savepoint, or of the transaction when there is none.
+    """
+    key = session.get_nested_transaction() or ROOT_TRANSACTION
+    return _pending_work(session).setdefault(key, PendingWork())
+
+
+def after_commit(session: Session, callback: Callable[[], None]) -> None:
+    """
+    Run `callback` once the request transaction is committed (e.g. removing the files
+    of deleted rows), and drop it if the transaction, or the savepoint it was queued in, is rolled back instead.
+    """
+    _current_work(session).callbacks.append(callback)
+
+
+def on_tables_committed(listener: Callable[[Set[str]], None]) -> Callable[[Set[str]], None]:
+    """
+    Register a listener receiving the tables written by every committed transaction of the process.
+    """
+    _commit_listeners.append(listener)
+    return listener
+
+
+def record_writes(session: Session, names: Iterable[str]) -> None:
+    """
+    Publish names finer than a table with the tables written by the transaction
+    (e.g. the key of one user), for the caches keyed by them.
+    """
+    _current_work(session).tables.update(names)
+
+
+def written_tables(session: Session) -> Set[str]:
+    """
+    Tables written by the current transaction of the session (savepoints included) and not committed yet.
+    """
+    return set().union(*(work.tables for work in _pending_work(session).values()))
+
+
+@event.listens_for(Session, 'before_flush')
+def _touch_updated_at(session: Session, flush_context, instances) -> None:
+    """
+    Maintain `updated_at` on every ORM write path (see `upsert_many` for the bulk one).
+    """
+    now = datetime.now()
+    for instance in session.dirty:
+        if 'updated_at' in type(instance).__mapper__.columns and session.is_modified(instance):
+            instance.updated_at = now
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_flushed_tables(session: Session, flush_context) -> None:
+    pending = _current_work(session).tables
+    for instance in itertools.chain(session.new, session.deleted):
+        mapper = type(instance).__mapper__
+        pending.update(table.name for table in mapper.tables)
+        pending.update(rel.secondary.name for rel in mapper.relationships if rel.secondary is not None)
+    for instance in session.dirty:
+        mapper = type(instance).__mapper__
+        # Dirty only through a collection (e.g. a backref append) leaves the row untouched
+        if session.is_modified(instance, include_collections=False):
+            pending.update(table.name for table in mapper.tables)
+        # Collection changes are written to the link tables
+        state = sa_inspect(instance)
+        pending.update(
+            rel.secondary.name for rel in mapper.relationships
+            if rel.secondary is not None and state.attrs[rel.key].history.has_changes()
+        )
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_executed_tables(state: ORMExecuteState) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        _current_work(state.session).tables.add(state.statement.table.name)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_committed_work(session: Session) -> None:
+    if session.in_nested_transaction():
+        # A released savepoint: its work joins the enclosing transaction when it ends (see below)
+        # and is only published if that one commits
+        _current_work(session).released = True
+        return
+    work = _pending_work(session).pop(ROOT_TRANSACTION, None)
+    if work is None:
+        return
+    if work.tables:
+        for listener in _commit_listeners:
+            listener(work.tables)
+    for callback in work.callbacks:
+        try:
+            callback()
+        except Exception as e:
+            # The transaction is already committed, don't fail the request
+            logging.error(f"After commit callback failed: {e}")
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _close_pending_work(session: Session, transaction: SessionTransaction) -> None:
+    """
+    Hand the work of a released savepoint to the enclosing transaction, and drop the work
+    of a rolled back savepoint or transaction (only what it wrote itself).
+    """
+    if transaction.nested:
+        work = _pending_work(session).pop(transaction, None)
+        if work is None or not work.released:
+            return
+        parent = transaction.parent
+        while parent is not None and not parent.nested:
+            parent = parent.parent
+        key = parent if parent is not None else ROOT_TRANSACTION
+        _pending_work(session).setdefault(key, PendingWork()).merge(work)
+    elif transaction.parent is None:
+        _pending_work(session).pop(ROOT_TRANSACTION, None)
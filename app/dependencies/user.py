@@ -1,18 +1,21 @@
 from fastapi import HTTPException, status, Depends
+from fastapi.concurrency import run_in_threadpool
 from typing import Annotated
 
 from app.db.repositories import UserRepositoryDep
 from app.db.dependencies import SessionDep
-from app.core.security import get_password_hash
+from app.core.security import PasswordHasherDep, get_password_hash
 from app.db.models import UserCreate, UserInDb
 
 
-def get_user_to_save(
+async def get_user_to_save(
     user: UserCreate,
     user_repository: UserRepositoryDep,
-    db: SessionDep
+    db: SessionDep,
+    hasher: PasswordHasherDep
 ):
-    found_user = user_repository.find_by_username_or_email(
+    found_user = await run_in_threadpool(
+        user_repository.find_by_username_or_email,
         email=user.email,
         db=db
     )
@@ -25,7 +28,7 @@ def get_user_to_save(
     user_data = user.model_dump()
     
     # Hash the password
-    user_data['hashed_password'] = get_password_hash(user.password)
+    user_data['hashed_password'] = await get_password_hash(user.password, hasher)
     return UserInDb(**user_data)
 
 UserToSaveDep = Annotated[UserCreate, Depends(get_user_to_save)]
\ No newline at end of file
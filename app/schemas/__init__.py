@@ -1,2 +1,5 @@
-from app.schemas.response import Response, ResponseWithPagination
-from app.schemas.request import PatchDeleteReq
\ No newline at end of file
+from app.schemas.response import Response, ResponseWithPagination, ItemEnvelope, PageEnvelope
+from app.schemas.request import PatchDeleteReq
+from app.schemas.batch import BatchResult, BatchConflict
+from app.schemas.admin import PoolStatus, ReferenceCacheStatus
+from app.schemas.jobs import RescoreJobStatus
\ No newline at end of file
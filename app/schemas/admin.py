@@ -0,0 +1,28 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class PoolStatus(BaseModel):
+    engine: str
+    pid: int
+    pool_class: str
+    size: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    # Connections opened beyond `size`, negative while the pool is still filling up
+    overflow: Optional[int] = None
+    max_overflow: Optional[int] = None
+    timeout: Optional[float] = None
+    checkouts: Optional[int] = None
+    timeouts: Optional[int] = None
+    average_wait_ms: Optional[float] = None
+    max_wait_ms: Optional[float] = None
+
+
+class ReferenceCacheStatus(BaseModel):
+    table: str
+    pid: int
+    hits: int
+    misses: int
+    rows: int
+    age_seconds: Optional[float] = None
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, List
 from pydantic import BaseModel
 from datetime import timedelta
 
@@ -26,6 +26,15 @@ class TokenVerificationSettings(BaseModel):
     key: str
     algorithm: str
 
+class Principal(BaseModel):
+    """
+    Identity of the caller, read from the claims of the access token.
+    """
+    id: int
+    email: str
+    roles: List[str] = []
+    token_version: int = 0
+
 class UserLoginRequest(BaseModel):
     email: str
     password: str
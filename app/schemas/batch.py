@@ -0,0 +1,12 @@
+from typing import Any, List
+from pydantic import BaseModel
+
+
+class BatchConflict(BaseModel):
+    index: int
+    detail: Any
+
+class BatchResult(BaseModel):
+    created: List[int] = []
+    updated: List[int] = []
+    conflicts: List[BatchConflict] = []
\ No newline at end of file
@@ -0,0 +1,13 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class RescoreJobStatus(BaseModel):
+    id: str
+    weight_set_id: int
+    # pending, running, done or failed
+    status: str
+    processed: int
+    total: Optional[int] = None
+    elapsed_seconds: Optional[float] = None
+    error: Optional[str] = None
\ No newline at end of file
@@ -15,8 +15,31 @@ class Response(BaseModel, Generic[DataT]):
 class ResponseWithPagination(BaseModel, Generic[DataT]):
     message: Optional[str] = None
     content: Union[List[DataT], DataT, None] = None
-    page: int = 0
-    total: int = 0
+    # None for the pages reached through a cursor
+    page: Optional[int] = 0
+    total: Optional[int] = 0
+    next_cursor: Optional[str] = None
+    previous_cursor: Optional[str] = None
 
     class Config:
-        arbitrary_types_allowed = True
\ No newline at end of file
+        arbitrary_types_allowed = True
+
+
+class ItemEnvelope(BaseModel, Generic[DataT]):
+    """
+    Serialization counterpart of `Response` with a single data type, see `envelope_adapter`.
+    """
+    message: Optional[str] = None
+    data: Optional[DataT] = None
+
+
+class PageEnvelope(BaseModel, Generic[DataT]):
+    """
+    Serialization counterpart of `ResponseWithPagination`, see `envelope_adapter`.
+    """
+    message: Optional[str] = None
+    content: Optional[List[DataT]] = None
+    page: Optional[int] = 0
+    total: Optional[int] = 0
+    next_cursor: Optional[str] = None
+    previous_cursor: Optional[str] = None
\ No newline at end of file
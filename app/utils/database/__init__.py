@@ -1 +1,5 @@
-from .crud_util import parse_filters, is_relationship, get_related_model_class, apply_filters
\ No newline at end of file
+from .crud_util import parse_filters, is_relationship, get_related_model_class, apply_filters, compile_filter_plan, filter_tables
+from .pagination import encode_cursor, decode_cursor
+from .eager_loading import build_loader_options, build_read_tables, unwrap_model
+from .fieldsets import split_fieldset, build_view_model, build_view_options
+from .filter_usage import configure_filter_usage_log, flush_filter_usage, load_filter_usage
\ No newline at end of file
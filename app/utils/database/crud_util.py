@@ -1,8 +1,21 @@
-from typing import Dict, Any
-from datetime import datetime
-from sqlalchemy.orm import RelationshipProperty
+from functools import lru_cache, partial
+from typing import Callable, Dict, Any, List, NamedTuple, Optional, Set, Tuple
+from datetime import date, datetime
+from sqlalchemy import types as sa_types
+from sqlalchemy.orm import ColumnProperty, RelationshipProperty, aliased
 from sqlmodel import and_, Column, SQLModel
 
+from app.utils.exceptions import CustomHTTPException
+from .filter_usage import record_filter_usage
+
+
+VALID_OPERATORS = {'eq', 'gt', 'lt', 'gte', 'lte', 'contains', 'startswith', 'endswith', 'in'}
+PATTERN_OPERATORS = {'contains', 'startswith', 'endswith'}
+
+# How filters through to-many relationships are compiled
+COLLECTION_MODE_EXISTS = 'exists'
+COLLECTION_MODE_JOIN = 'join'
+
 
 # def parse_filters(query_params: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
 #     """
@@ -141,80 +154,219 @@ from sqlmodel import and_, Column, SQLModel
 # ----------------------------------------------------------------------------------
 
 
-def parse_filters(query_params: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+def parse_filters(query_params: Dict[str, Any], model: Optional[SQLModel] = None) -> Dict[str, Dict[str, Any]]:
     """
     Parse query parameters into a filters dictionary, supporting nested relationships and operators.
+    When the model is given, values are coerced to the Python type of the filtered column
+    so they are bound with the column's type; values that can't be coerced raise a 422.
     """
-    valid_operators = {'eq', 'gt', 'lt', 'gte', 'lte', 'contains', 'startswith', 'endswith', 'in'}
     filters = {}
     for key, value in query_params.items():
         parts = key.split('__')
         operator = 'eq'  # default operator
         # Check if the last part is a valid operator
-        if len(parts) > 1 and parts[-1] in valid_operators:
+        if len(parts) > 1 and parts[-1] in VALID_OPERATORS:
             operator = parts.pop()  # Remove the operator part
             field_path = '__'.join(parts)
         else:
             field_path = key  # No operator in key, use entire key as field path
+        if model is not None:
+            value = coerce_filter_value(model, field_path, operator, value)
         filters[field_path] = {'operator': operator, 'value': value}
     return filters
 
 
-def apply_filters(model: SQLModel, statement, filters: Dict[str, Dict[str, Any]]):
+def coerce_filter_value(model: SQLModel, field_path: str, operator: str, value: Any) -> Any:
+    """
+    Coerce a raw query string value to the type of the column targeted by `field_path`.
+    `in` values are split and coerced one by one, pattern operators keep strings.
+    Unknown paths are left untouched, apply_filters skips them.
+    """
+    if not isinstance(value, str) or operator in PATTERN_OPERATORS:
+        return value
+    parts = field_path.split('__')
+    target_model = resolve_target_model(model, parts)
+    if target_model is None:
+        return value
+    coerce = get_column_coercers(target_model)[parts[-1]]
+    try:
+        if operator == 'in':
+            return [coerce(item) for item in value.split(',')]
+        return coerce(value)
+    except ValueError:
+        raise CustomHTTPException.invalid_filter_value(field_path)
+
+
+@lru_cache(maxsize=None)
+def get_column_coercers(model: SQLModel) -> Dict[str, Callable[[str], Any]]:
+    """Build, once per model, the string-to-Python coercer of every column."""
+    return {column.key: get_type_coercer(column.type) for column in model.__table__.columns}
+
+
+def get_type_coercer(column_type) -> Callable[[str], Any]:
+    """Pick the coercer matching a SQLAlchemy column type."""
+    if isinstance(column_type, sa_types.Enum):
+        return partial(coerce_enum, frozenset(column_type.enums))
+    if isinstance(column_type, sa_types.Boolean):
+        return coerce_bool
+    if isinstance(column_type, sa_types.Integer):
+        return int
+    if isinstance(column_type, sa_types.Numeric):
+        return float
+    if isinstance(column_type, sa_types.DateTime):
+        return datetime.fromisoformat
+    if isinstance(column_type, sa_types.Date):
+        return date.fromisoformat
+    return str
+
+
+def coerce_bool(value: str) -> bool:
+    lowered = value.strip().lower()
+    if lowered in ('true', '1', 'yes'):
+        return True
+    if lowered in ('false', '0', 'no'):
+        return False
+    raise ValueError(f"Invalid boolean: {value}")
+
+
+def coerce_enum(allowed: frozenset, value: str) -> str:
+    if value not in allowed:
+        raise ValueError(f"Invalid enum value: {value}")
+    return value
+
+
+class FilterNode:
+    """
+    Conditions evaluated against one entity of a filter plan. Children are the collection
+    hops (and the hops below them) compiled into correlated EXISTS subqueries.
+    """
+    def __init__(self):
+        self.conditions = []
+        self.children = {}
+
+
+class FilterPlan(NamedTuple):
+    """
+    Compiled form of a set of filters: the joins to add, deduplicated per relationship path,
+    and the tree of resolved columns and operators to turn into conditions.
+    """
+    joins: Tuple[Any, ...]
+    root: FilterNode
+
+
+@lru_cache(maxsize=1024)
+def compile_filter_plan(
+    model: SQLModel,
+    signature: Tuple[Tuple[str, str], ...],
+    collection_mode: str = COLLECTION_MODE_EXISTS
+) -> FilterPlan:
     """
-    Apply filters to the SQL statement, handling nested relationships by dynamically joining models.
+    Resolve the (field_path, operator) pairs of a filter set against the model, once per
+    distinct signature. Scalar hops are joined a single time per path, through an alias,
+    so filters sharing a path share the join and distinct paths to the same table don't clash.
+    In `exists` mode, a path going through a collection becomes a correlated EXISTS from the
+    first collection hop on, so matching several children never duplicates the parent row;
+    filters sharing that hop share the subquery. `join` mode joins collections as well.
+    Invalid paths and unsupported operators are skipped.
     """
-    filter_conditions = []
-    for field_path, filter_info in filters.items():
-        operator = filter_info["operator"]
-        value = filter_info["value"]
+    joins = []
+    aliases = {}
+    root = FilterNode()
+    for field_path, operator in signature:
+        if operator not in VALID_OPERATORS:
+            continue
         parts = field_path.split('__')
-        if len(parts) == 1:
-            # Direct field filter
-            field_name = parts[0]
-            if not hasattr(model, field_name):
-                continue
-            field_column = getattr(model, field_name)
-            # Handle datetime conversion
-            if isinstance(field_column.type, datetime):
-                value = datetime.fromisoformat(value)
-            # Create condition
-            try:
-                condition = create_condition(field_column, operator, value)
-                filter_conditions.append(condition)
-            except ValueError:
-                continue  # Skip invalid operator
-        else:
-            # Nested relationship filter
-            current_model = model
-            valid_relationship = True
-            for part in parts[:-1]:
-                if not hasattr(current_model, part):
-                    valid_relationship = False
-                    break
-                attr = getattr(current_model, part)
-                if not is_relationship(attr):
-                    valid_relationship = False
-                    break
-                # Join the relationship
-                statement = statement.join(attr)
-                current_model = get_related_model_class(attr)
-            if not valid_relationship:
-                continue  # Skip invalid path
-            # Check if the final model has the field
-            field_name = parts[-1]
-            if not hasattr(current_model, field_name):
-                continue
-            field_column = getattr(current_model, field_name)
-            # Handle datetime conversion
-            if isinstance(field_column.type, datetime):
-                value = datetime.fromisoformat(value)
-            # Create condition
-            try:
-                condition = create_condition(field_column, operator, value)
-                filter_conditions.append(condition)
-            except ValueError:
-                continue  # Skip invalid operator
+        if resolve_relationship_path(model, parts) is None:
+            continue  # Skip invalid path
+
+        current_model = model
+        node = root
+        path = ()
+        for part in parts[:-1]:
+            path += (part,)
+            attr = getattr(current_model, part)
+            if node is root and (collection_mode == COLLECTION_MODE_JOIN or not attr.property.uselist):
+                if path not in aliases:
+                    # Join the relationship once per path
+                    aliases[path] = aliased(get_related_model_class(attr))
+                    joins.append(attr.of_type(aliases[path]))
+                current_model = aliases[path]
+            else:
+                if path not in node.children:
+                    alias = aliased(get_related_model_class(attr))
+                    node.children[path] = (attr.of_type(alias), attr.property.uselist, FilterNode(), alias)
+                _, _, node, current_model = node.children[path]
+        node.conditions.append((field_path, getattr(current_model, parts[-1]), operator))
+    return FilterPlan(tuple(joins), root)
+
+
+def resolve_target_model(model: SQLModel, parts: List[str]) -> Optional[SQLModel]:
+    """Return the model owning the column named by a filter path, if the path is valid."""
+    relationships = resolve_relationship_path(model, parts)
+    if relationships is None:
+        return None
+    return get_related_model_class(relationships[-1]) if relationships else model
+
+
+def resolve_relationship_path(model: SQLModel, parts: List[str]) -> Optional[List[Any]]:
+    """
+    Resolve the relationships leading to the column named by the last part of a filter path.
+    Returns None when a part is not a relationship or the final attribute is not a column.
+    """
+    relationships = []
+    current_model = model
+    for part in parts[:-1]:
+        attr = getattr(current_model, part, None)
+        if attr is None or not is_relationship(attr):
+            return None
+        relationships.append(attr)
+        current_model = get_related_model_class(attr)
+    field_column = getattr(current_model, parts[-1], None)
+    if field_column is None or not is_column(field_column):
+        return None
+    return relationships
+
+
+def filter_tables(model: SQLModel, filters: Dict[str, Dict[str, Any]]) -> Set[str]:
+    """Names of the tables (and link tables) reached by the relationship paths of the filters."""
+    tables = set()
+    for field_path in filters:
+        for relationship in resolve_relationship_path(model, field_path.split('__')) or []:
+            tables.add(relationship.property.mapper.local_table.name)
+            if relationship.property.secondary is not None:
+                tables.add(relationship.property.secondary.name)
+    return tables
+
+
+def build_conditions(node: FilterNode, filters: Dict[str, Dict[str, Any]]) -> List[Any]:
+    """Turn a compiled filter node into SQL conditions bound to the filter values."""
+    conditions = [
+        create_condition(field_column, operator, filters[field_path]["value"])
+        for field_path, field_column, operator in node.conditions
+    ]
+    for attr, uselist, child, _ in node.children.values():
+        criteria = and_(*build_conditions(child, filters))
+        conditions.append(attr.any(criteria) if uselist else attr.has(criteria))
+    return conditions
+
+
+def apply_filters(
+    model: SQLModel,
+    statement,
+    filters: Dict[str, Dict[str, Any]],
+    collection_mode: str = COLLECTION_MODE_EXISTS
+):
+    """
+    Apply filters to the SQL statement, handling nested relationships by joining models.
+    The filter values end up as bound parameters, so statements built from the same
+    cached plan share SQLAlchemy's compiled cache and the database plan cache.
+    """
+    signature = tuple(sorted((field_path, info["operator"]) for field_path, info in filters.items()))
+    record_filter_usage(model.__tablename__, signature)
+    plan = compile_filter_plan(model, signature, collection_mode)
+    for join in plan.joins:
+        statement = statement.join(join)
+    filter_conditions = build_conditions(plan.root, filters)
     if filter_conditions:
         statement = statement.where(and_(*filter_conditions))
     return statement
@@ -225,6 +377,11 @@ def is_relationship(attribute) -> bool:
     return isinstance(attribute.property, RelationshipProperty)
 
 
+def is_column(attribute) -> bool:
+    """Check if an attribute is a mapped column."""
+    return isinstance(getattr(attribute, 'property', None), ColumnProperty)
+
+
 def get_related_model_class(relationship) -> SQLModel:
     """Get the related model class from a relationship property."""
     return relationship.property.entity.class_
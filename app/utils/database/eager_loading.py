@@ -0,0 +1,77 @@
+from functools import lru_cache
+from typing import Any, FrozenSet, List, Optional, Tuple, Type, get_args
+from pydantic import BaseModel
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import joinedload, selectinload
+from sqlmodel import SQLModel
+
+
+def unwrap_model(annotation: Any) -> Optional[Type[BaseModel]]:
+    """Return the pydantic model wrapped in an annotation such as Optional[X] or list[X]."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        model = unwrap_model(arg)
+        if model is not None:
+            return model
+    return None
+
+
+@lru_cache(maxsize=None)
+def build_loader_options(model: Type[SQLModel], response_type: Type[BaseModel]) -> Tuple:
+    """
+    Build the loader options needed to serialize `model` as `response_type` without lazy loads.
+    The response model is walked against the SQLModel relationships: collections are loaded
+    with `selectinload` (one extra query per level), scalar relationships with `joinedload`.
+    The result is cached, so the plan is computed once per (model, response_type).
+    """
+    return tuple(_loader_options(model, response_type, seen=()))
+
+
+def _loader_options(model: Type[SQLModel], response_type: Type[BaseModel], seen: Tuple) -> List:
+    relationships = sa_inspect(model).relationships
+    options = []
+    for name, field in response_type.model_fields.items():
+        if name not in relationships:
+            continue
+        relationship = relationships[name]
+        attribute = getattr(model, name)
+        loader = selectinload(attribute) if relationship.uselist else joinedload(attribute)
+
+        # Recurse into the nested response model, guarding against cycles
+        nested_type = unwrap_model(field.annotation)
+        related_model = relationship.mapper.class_
+        if nested_type is not None and (related_model, nested_type) not in seen:
+            nested = _loader_options(related_model, nested_type, seen + ((model, response_type),))
+            if nested:
+                loader = loader.options(*nested)
+        options.append(loader)
+    return options
+
+
+@lru_cache(maxsize=None)
+def build_read_tables(model: Type[SQLModel], response_type: Type[BaseModel]) -> FrozenSet[str]:
+    """
+    Names of the tables read to serialize `model` as `response_type`:
+    the model table plus the tables (and link tables) of the relationships it includes.
+    """
+    return frozenset(_read_tables(model, response_type, seen=()))
+
+
+def _read_tables(model: Type[SQLModel], response_type: Type[BaseModel], seen: Tuple) -> List[str]:
+    relationships = sa_inspect(model).relationships
+    tables = [model.__tablename__]
+    for name, field in response_type.model_fields.items():
+        if name not in relationships:
+            continue
+        relationship = relationships[name]
+        if relationship.secondary is not None:
+            tables.append(relationship.secondary.name)
+
+        related_model = relationship.mapper.class_
+        nested_type = unwrap_model(field.annotation)
+        if nested_type is None or (related_model, nested_type) in seen:
+            tables.append(related_model.__tablename__)
+        else:
+            tables.extend(_read_tables(related_model, nested_type, seen + ((model, response_type),)))
+    return tables
\ No newline at end of file
@@ -0,0 +1,64 @@
+from functools import lru_cache
+from typing import Optional, Tuple, Type
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import load_only
+from sqlmodel import SQLModel
+
+from .eager_loading import build_loader_options, unwrap_model
+
+
+def split_fieldset(value: Optional[str]) -> Tuple[str, ...]:
+    """Turn a comma separated query parameter into a sorted tuple of names."""
+    if not value:
+        return ()
+    return tuple(sorted({part.strip() for part in value.split(",") if part.strip()}))
+
+
+@lru_cache(maxsize=256)
+def build_view_model(
+    response_type: Type[BaseModel], fields: Tuple[str, ...], expand: Tuple[str, ...]
+) -> Type[BaseModel]:
+    """
+    Derive a pydantic model exposing a subset of `response_type`.
+    `fields` selects scalar fields (all of them when empty, `id` always included),
+    `expand` selects the nested relationships to include.
+    Raises ValueError on names that are not part of `response_type`.
+    """
+    model_fields = response_type.model_fields
+    nested = {name for name, field in model_fields.items() if unwrap_model(field.annotation) is not None}
+
+    unknown_fields = [name for name in fields if name not in model_fields or name in nested]
+    if unknown_fields:
+        raise ValueError(f"Unknown fields: {', '.join(unknown_fields)}")
+    unknown_relationships = [name for name in expand if name not in nested]
+    if unknown_relationships:
+        raise ValueError(f"Unknown relationships: {', '.join(unknown_relationships)}")
+
+    selected = set(fields) | {"id"} if fields else set(model_fields) - nested
+    selected |= set(expand)
+    definitions = {
+        name: (field.annotation, field)
+        for name, field in model_fields.items()
+        if name in selected
+    }
+    return create_model(
+        f"{response_type.__name__}View",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions,
+    )
+
+
+@lru_cache(maxsize=256)
+def build_view_options(model: Type[SQLModel], view: Type[BaseModel]) -> Tuple:
+    """
+    Loader options fetching only what `view` serializes: its columns (plus the keys
+    needed to load its relationships) and the eager-loading plan of its relationships.
+    """
+    mapper = sa_inspect(model)
+    columns = {"id"} | {name for name in view.model_fields if name in mapper.columns}
+    for name in view.model_fields:
+        if name in mapper.relationships:
+            columns |= {column.key for column in mapper.relationships[name].local_columns}
+    attributes = [getattr(model, name) for name in sorted(columns) if name in mapper.columns]
+    return (load_only(*attributes), *build_loader_options(model, view))
@@ -0,0 +1,67 @@
+import atexit
+import json
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional, Tuple
+
+
+# Number of recorded filter sets after which the counters are appended to the log
+FLUSH_EVERY = 500
+
+_usage: Counter = Counter()
+_pending = 0
+_lock = threading.Lock()
+_log_path: Optional[Path] = None
+
+
+def configure_filter_usage_log(path: str) -> None:
+    """
+    Start recording the filter sets received by `apply_filters` into a JSON lines file,
+    consumed by the index advisor (`python -m app.commands.index_advisor`).
+    """
+    global _log_path
+    _log_path = Path(path)
+    atexit.register(flush_filter_usage)
+
+
+def record_filter_usage(table: str, signature: Tuple[Tuple[str, str], ...]) -> None:
+    """Count one use of a (field_path, operator) filter set on a table, if recording is enabled."""
+    global _pending
+    if _log_path is None or not signature:
+        return
+    with _lock:
+        _usage[(table, signature)] += 1
+        _pending += 1
+        should_flush = _pending >= FLUSH_EVERY
+    if should_flush:
+        flush_filter_usage()
+
+
+def flush_filter_usage() -> None:
+    """Append the counters recorded so far to the log and reset them."""
+    global _pending
+    if _log_path is None:
+        return
+    with _lock:
+        usage = list(_usage.items())
+        _usage.clear()
+        _pending = 0
+    if not usage:
+        return
+    with open(_log_path, "a") as log:
+        for (table, signature), count in usage:
+            log.write(json.dumps({"table": table, "filters": signature, "count": count}) + "\n")
+
+
+def load_filter_usage(path: str) -> Counter:
+    """Aggregate a filter usage log, possibly written by several processes."""
+    usage = Counter()
+    with open(path) as log:
+        for line in log:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            signature = tuple(tuple(item) for item in entry["filters"])
+            usage[(entry["table"], signature)] += entry["count"]
+    return usage
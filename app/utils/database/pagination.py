@@ -0,0 +1,25 @@
+import base64
+import binascii
+import json
+from typing import Any, List, Optional
+
+
+def encode_cursor(sort_key: List[Any]) -> str:
+    """Encode the sort key of a row into an opaque, url-safe cursor."""
+    raw = json.dumps(sort_key, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[List[Any]]:
+    """
+    Decode a cursor produced by `encode_cursor`.
+    Returns None when the cursor is malformed.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        sort_key = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        return None
+    if not isinstance(sort_key, list) or not sort_key:
+        return None
+    return sort_key
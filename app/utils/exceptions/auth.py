@@ -61,3 +61,9 @@ something_went_wrong = HTTPException(
     headers={"WWW-Authenticate": "Bearer"},
 )
 
+
+hashing_busy = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail='Too many authentication requests, please retry shortly',
+    headers={"Retry-After": "1"},
+)
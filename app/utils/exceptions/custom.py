@@ -40,4 +40,35 @@ class CustomHTTPException:
         return HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=detail
+        )
+        
+    @staticmethod
+    def invalid_query_parameter(parameter: str):
+        detail = f"Invalid value for query parameter '{parameter}'"
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail
+        )
+        
+    @staticmethod
+    def operation_not_supported(operation: str, item_name: str):
+        detail = f"{operation.capitalize()} is not supported for model '{item_name}'"
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail
+        )
+        
+    @staticmethod
+    def invalid_filter_value(field: str):
+        detail = f"Invalid value for filter '{field}'"
+        return HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=detail
+        )        
+    @staticmethod
+    def operation_in_progress(operation: str):
+        detail = f"A {operation} is already in progress"
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=detail
         )
\ No newline at end of file
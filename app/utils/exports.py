@@ -0,0 +1,43 @@
+import csv
+import enum
+import io
+import orjson
+from datetime import date, datetime
+from typing import Any, Iterable, Iterator, List, Sequence, Tuple
+
+
+EXPORT_MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def ndjson_chunks(columns: Sequence[str], batches: Iterable[List[Tuple]]) -> Iterator[bytes]:
+    """
+    One JSON object per line, written one batch of rows at a time.
+    """
+    for rows in batches:
+        yield b''.join(orjson.dumps(dict(zip(columns, row))) + b'\n' for row in rows)
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def csv_chunks(columns: Sequence[str], batches: Iterable[List[Tuple]]) -> Iterator[bytes]:
+    """
+    Header line first, sent before the query runs, then one chunk per batch of rows.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode()
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
\ No newline at end of file
@@ -0,0 +1,42 @@
+import orjson
+from functools import lru_cache
+from typing import Any, Dict, Optional, Type
+from fastapi import Response as HTTPResponse
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+
+class ORJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+
+@lru_cache(maxsize=None)
+def envelope_adapter(envelope: Type[BaseModel], data_type: Any) -> TypeAdapter:
+    """
+    Compiled validator/serializer of `envelope[data_type]` (e.g. `ItemEnvelope[Idea]`),
+    built once per response type or sparse view.
+    """
+    return TypeAdapter(envelope[data_type])
+
+
+def render_envelope(
+    adapter: TypeAdapter,
+    headers: Optional[Dict[str, str]] = None,
+    status_code: int = 200,
+    **fields: Any
+) -> HTTPResponse:
+    """
+    Read the ORM graph into the envelope and write it straight to JSON bytes, skipping
+    FastAPI's response model validation and `jsonable_encoder`.
+    """
+    envelope = adapter.validate_python(fields, from_attributes=True)
+    return HTTPResponse(
+        content=adapter.dump_json(envelope),
+        status_code=status_code,
+        media_type='application/json',
+        headers=headers
+    )
\ No newline at end of file
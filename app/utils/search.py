@@ -0,0 +1,53 @@
+import html
+import re
+from typing import List, Optional
+
+
+# Longest query honoured, extra terms are ignored
+MAX_SEARCH_TERMS = 8
+
+_TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def parse_search_terms(query: str) -> List[str]:
+    """
+    Distinct lowercase words of a search query, in order.
+    """
+    terms = []
+    for term in _TERM_PATTERN.findall(query.lower()):
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_SEARCH_TERMS]
+
+
+def fulltext_condition(terms: List[str]) -> str:
+    """
+    SQL Server full-text condition matching every term as a word prefix, e.g. `"conv*" AND "line*"`.
+    Terms only hold word characters, so nothing needs escaping.
+    """
+    return ' AND '.join(f'"{term}*"' for term in terms)
+
+
+def highlight(text: Optional[str], terms: List[str], fragment_size: int = 200) -> Optional[str]:
+    """
+    HTML-escaped fragment of `text` around the first matched term, every term wrapped in <mark>.
+    None when no term occurs in the text.
+    """
+    if not text or not terms:
+        return None
+    pattern = re.compile('|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    first = pattern.search(text)
+    if first is None:
+        return None
+
+    start = max(0, first.start() - fragment_size // 4)
+    end = min(len(text), start + fragment_size)
+    fragment = text[start:end]
+
+    parts, position = [], 0
+    for match in pattern.finditer(fragment):
+        parts.append(html.escape(fragment[position:match.start()]))
+        parts.append(f'<mark>{html.escape(match.group())}</mark>')
+        position = match.end()
+    parts.append(html.escape(fragment[position:]))
+    return ('…' if start else '') + ''.join(parts) + ('…' if end < len(text) else '')
\ No newline at end of file
@@ -1,27 +1,19 @@
-import orjson
 import uvicorn
 
-from typing import Any
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
 from app.db.models import *
 from app.core.config import get_settings
+from app.core.security import get_password_hasher
 from app.api.routers import api_router
+from app.utils.responses import ORJSONResponse
 
 settings = get_settings()
 
 origins = ['http://localhost:4200']
 
-class ORJSONResponse(JSONResponse):
-    media_type = "application/json"
-
-    def render(self, content: Any) -> bytes:
-        return orjson.dumps(content)
-
-
-app = FastAPI(title=settings.PROJECT_TITLE)
+app = FastAPI(title=settings.PROJECT_TITLE, default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -31,6 +23,9 @@ app.add_middleware(
     allow_credentials=True
 )
 
+# Stop the password hashing processes with the worker
+app.add_event_handler('shutdown', lambda: get_password_hasher().shutdown())
+
 app.include_router(router=api_router, prefix='/api')
 
 app.mount("/api/static", StaticFiles(directory="static"), name="static")
@@ -0,0 +1,29 @@
+import os
+
+# Settings read when the app modules are imported, the tests use their own in-memory engines
+for name, value in {
+    'PROJECT_TITLE': 'e-suggestion-tests', 'MODE': 'test', 'APP_PROTOCOL': 'http', 'APP_HOST': 'localhost',
+    'APP_PORT': '8000', 'APP_WORKERS': '1',
+    'DB_HOST': 'localhost', 'DB_USER': 'test', 'DB_PASSWORD': 'test', 'DB_NAME': 'test', 'DB_URL': 'sqlite://',
+    'JWT_SECRET': 'test-secret', 'JWT_REFRESH_SECRET': 'test-refresh-secret', 'JWT_FORGET_PWD_SECRET': 'test-forget-secret',
+    'JWT_ACCESS_TOKEN_EXPIRE_MINUTES': '30', 'JWT_REFRESH_TOKEN_EXPIRE_MINUTES': '60', 'JWT_FORGET_PWD_EXPIRE_MINUTES': '10',
+    'JWT_ALGORITHM': 'HS256',
+}.items():
+    os.environ.setdefault(name, value)
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+import app.db.models  # noqa: F401 - register every table in the metadata
+
+
+@pytest.fixture
+def database():
+    """
+    In-memory SQLite engine holding the whole schema, shared by the sessions of a test.
+    """
+    engine = create_engine('sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False})
+    Base.metadata.create_all(engine)
+    return engine
@@ -0,0 +1,114 @@
+import pytest
+from sqlmodel import Session, select
+
+from app.db.crud_repository import CRUDBaseRepository
+from app.db.models import AttachmentModel, CommentModel, IdeaModel, RoleModel, User, UserBatchRow, UserModel
+from app.db.models.associations import UserRoleLink
+from app.db.repositories.user import UserRepository
+
+
+@pytest.fixture
+def foreign_keys(database):
+    # Enforced as on SQL Server, so a delete relying on ON DELETE CASCADE would remove the children
+    with database.connect() as connection:
+        connection.exec_driver_sql('PRAGMA foreign_keys = ON')
+    return database
+
+
+@pytest.fixture
+def repository():
+    return CRUDBaseRepository(UserModel, User, natural_key='te_id')
+
+
+def user_row(number: int, **values) -> UserBatchRow:
+    values = {'email': f'user{number}@te.com', 'hashed_password': '-', **values}
+    return UserBatchRow(te_id=f'TE{number}', first_name='First', last_name='Last', **values)
+
+
+def conflicts(result):
+    return [(conflict.index, conflict.detail) for conflict in result.conflicts]
+
+
+def add_user(session: Session, number: int) -> UserModel:
+    user = UserModel(
+        te_id=f'TE{number}', first_name='First', last_name='Last', email=f'user{number}@te.com', hashed_password='-'
+    )
+    session.add(user)
+    session.flush()
+    return user
+
+
+def test_bulk_delete_keeps_the_comments_and_uploads_of_users(foreign_keys):
+    with Session(foreign_keys) as session:
+        author, commenter = add_user(session, 1), add_user(session, 2)
+        role = RoleModel(name='submitter')
+        commenter.roles.append(role)
+        idea = IdeaModel(title='Idea', actual_situation='Now', description='Later', submitter_id=author.id)
+        session.add(idea)
+        session.flush()
+        session.add(CommentModel(body='Good', commenter_id=commenter.id, idea_id=idea.id))
+        session.add(AttachmentModel(name='plan.pdf', file_path='uploads/plan.pdf', uploaded_by=commenter.id, idea_id=idea.id))
+        session.commit()
+
+        assert UserRepository().delete_by_ids(session, [commenter.id]) == [commenter.id]
+        session.commit()
+
+        assert session.exec(select(UserModel.id)).all() == [author.id]
+        assert session.exec(select(CommentModel.commenter_id)).all() == [None]
+        assert session.exec(select(AttachmentModel.uploaded_by)).all() == [None]
+        assert session.exec(select(UserRoleLink)).all() == []
+        assert session.exec(select(RoleModel.name)).all() == ['submitter']
+
+
+def test_insert_many_replays_a_failing_batch_row_by_row(database, repository):
+    with Session(database) as session:
+        # No pre-check covers the NOT NULL password: the executemany fails as a whole
+        result = repository.insert_many(session, [user_row(1), user_row(2, hashed_password=None), user_row(3)])
+        session.commit()
+
+        assert [index for index, _ in conflicts(result)] == [1]
+        assert 'NOT NULL' in result.conflicts[0].detail
+        assert sorted(session.exec(select(UserModel.te_id)).all()) == ['TE1', 'TE3']
+        assert sorted(result.created) == sorted(session.exec(select(UserModel.id)).all())
+
+
+def test_insert_many_rejects_unique_values_of_the_table_and_the_batch(database, repository):
+    with Session(database) as session:
+        add_user(session, 1)
+        session.commit()
+
+        result = repository.insert_many(session, [
+            user_row(2, email='user1@te.com'), user_row(3), user_row(4, email='user3@te.com'), user_row(1, email='other@te.com')
+        ])
+        session.commit()
+
+        assert conflicts(result) == [(3, "'te_id' already exists"), (0, "'email' already exists"), (2, "'email' already exists")]
+        assert sorted(session.exec(select(UserModel.te_id)).all()) == ['TE1', 'TE3']
+
+
+def test_upsert_many_rejects_duplicate_keys_in_the_batch(database, repository):
+    with Session(database) as session:
+        result = repository.upsert_many(session, [user_row(1), user_row(1, email='again@te.com')])
+        session.commit()
+
+        assert conflicts(result) == [(1, "Duplicate 'te_id' in batch")]
+        assert session.exec(select(UserModel.email)).all() == ['user1@te.com']
+
+
+def test_upsert_many_updates_only_the_fields_sent(database, repository):
+    with Session(database) as session:
+        user = add_user(session, 1)
+        user.account_status = True
+        session.commit()
+
+        result = repository.upsert_many(session, [
+            UserBatchRow(te_id='TE1', first_name='Renamed', last_name='Last', email='user1@te.com'), user_row(2)
+        ])
+        session.commit()
+
+        assert result.updated == [user.id] and len(result.created) == 1
+        updated = session.exec(select(UserModel).where(UserModel.id == user.id).execution_options(populate_existing=True)).one()
+        assert updated.first_name == 'Renamed'
+        # Not sent: kept as stored
+        assert updated.hashed_password == '-' and updated.account_status is True
+        assert updated.updated_at is not None
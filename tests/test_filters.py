@@ -0,0 +1,52 @@
+import pytest
+from sqlmodel import Session, select
+
+from app.db.models import PlantModel, RoleModel, UserModel
+from app.utils.database import apply_filters, compile_filter_plan, parse_filters
+from app.utils.database.crud_util import COLLECTION_MODE_JOIN
+
+
+@pytest.fixture
+def session(database):
+    with Session(database) as session:
+        plant = PlantModel(name='Tangier')
+        session.add(plant)
+        roles = [RoleModel(name=name) for name in ('submitter', 'committee', 'teoa')]
+        for number, user_roles in enumerate([roles[:2], roles[1:], roles[2:]], start=1):
+            session.add(UserModel(
+                te_id=f'TE{number}', first_name='First', last_name='Last', email=f'user{number}@te.com',
+                hashed_password='-', plant=plant, roles=user_roles
+            ))
+        session.commit()
+        yield session
+
+
+def matching_users(session, query, **options):
+    statement = apply_filters(UserModel, select(UserModel.te_id), parse_filters(query, UserModel), **options)
+    return session.exec(statement.order_by(UserModel.te_id)).all(), str(statement)
+
+
+def test_collection_filter_returns_each_parent_once(session):
+    te_ids, sql = matching_users(session, {'roles__name__in': 'submitter,committee'})
+    assert te_ids == ['TE1', 'TE2']
+    assert 'EXISTS' in sql and 'JOIN' not in sql
+    # What the EXISTS avoids: TE1 has both roles
+    te_ids, _ = matching_users(session, {'roles__name__in': 'submitter,committee'}, collection_mode=COLLECTION_MODE_JOIN)
+    assert te_ids == ['TE1', 'TE1', 'TE2']
+
+
+def test_collection_filters_share_their_subquery():
+    plan = compile_filter_plan(UserModel, (('roles__id', 'gt'), ('roles__name', 'in')))
+    assert plan.joins == ()
+    assert list(plan.root.children) == [('roles',)]
+    _, uselist, child, _ = plan.root.children[('roles',)]
+    assert uselist and len(child.conditions) == 2
+
+
+def test_scalar_hops_are_joined_once_through_an_alias(session):
+    plan = compile_filter_plan(UserModel, (('plant__id', 'gt'), ('plant__name', 'eq')))
+    assert len(plan.joins) == 1 and plan.root.children == {}
+
+    te_ids, sql = matching_users(session, {'plant__name': 'Tangier', 'plant__id__gt': '0'})
+    assert te_ids == ['TE1', 'TE2', 'TE3']
+    assert sql.count('JOIN plants AS') == 1 and 'EXISTS' not in sql
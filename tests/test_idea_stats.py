@@ -0,0 +1,91 @@
+from collections import Counter
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlmodel import Session, select
+
+from app.db import unit_of_work
+from app.db.models import IdeaCreate, IdeaStatsModel, UserModel
+from app.db.models.idea import IdeaStatus
+from app.db.repositories.idea import IdeaRepository
+from app.db.repositories.idea_stats import IdeaStatsRepository
+from app.db.repositories.user import UserRepository
+
+KEY = (date(2026, 10, 1), IdeaStatus.CREATED, 1, 2)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://')
+    IdeaStatsModel.__table__.create(engine)
+    return engine
+
+
+@pytest.fixture
+def published(monkeypatch):
+    committed = []
+    monkeypatch.setattr(unit_of_work, '_commit_listeners', [committed.append])
+    return committed
+
+
+def counts(engine):
+    with Session(engine) as session:
+        return [row.idea_count for row in session.exec(select(IdeaStatsModel))]
+
+
+def test_new_combination_is_published_at_commit(engine, published):
+    with Session(engine) as session:
+        IdeaStatsRepository().apply_deltas(session, Counter({KEY: 1}))
+        # The row is inserted in a savepoint, released here
+        assert published == []
+        session.commit()
+    assert published == [{'idea_stats'}]
+    assert counts(engine) == [1]
+
+
+def test_new_combination_is_dropped_with_the_transaction(engine, published):
+    with Session(engine) as session:
+        IdeaStatsRepository().apply_deltas(session, Counter({KEY: 1}))
+        session.rollback()
+    assert published == []
+    assert counts(engine) == []
+
+
+def test_existing_combination_is_incremented(engine, published):
+    repository = IdeaStatsRepository()
+    for delta in (2, -1):
+        with Session(engine) as session:
+            repository.apply_deltas(session, Counter({KEY: delta}))
+            session.commit()
+    assert published == [{'idea_stats'}, {'idea_stats'}]
+    assert counts(engine) == [1]
+
+
+def test_negative_count_is_served(engine):
+    with Session(engine) as session:
+        repository = IdeaStatsRepository()
+        repository.apply_deltas(session, Counter({KEY: -1}))
+        assert repository.summary(session).total == -1
+
+
+def test_idea_is_removed_from_the_row_it_was_counted_in(database):
+    ideas = IdeaRepository()
+    with Session(database) as session:
+        user = UserModel(te_id='TE1', first_name='Ada', last_name='L', email='ada@te.com', hashed_password='-', plant_id=1, bu_id=2)
+        session.add(user)
+        session.flush()
+        idea = ideas.insert_line(session, IdeaCreate(
+            title='Idea', actual_situation='Now', description='Later', submitter_id=user.id, created_at=datetime(2026, 10, 5)
+        ))
+        session.commit()
+        assert counts(database) == [1]
+
+        # The submitter moves, then the idea is deleted
+        UserRepository().find_by_id_and_update(session, user.id, {'plant_id': 3, 'bu_id': 4})
+        ideas.delete_by_id(session, idea.id)
+        session.commit()
+
+        assert [(row.plant_id, row.bu_id, row.idea_count) for row in session.exec(select(IdeaStatsModel))] == [(1, 2, 0)]
+        assert ideas.stats_summary(session).total == 0
+        assert IdeaStatsRepository().rebuild(session) == 0
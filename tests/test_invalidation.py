@@ -0,0 +1,103 @@
+from collections import defaultdict
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.db import invalidation
+from app.db.invalidation import RedisChannel, SharedMemoryChannel, configure_invalidation_channel
+
+metadata = MetaData()
+plants = Table('plants', metadata, Column('id', Integer, primary_key=True))
+ideas = Table('ideas', metadata, Column('id', Integer, primary_key=True))
+
+
+class RedisStandIn:
+    """
+    In-memory stand-in for the hash commands of a Redis server.
+    """
+    def __init__(self) -> None:
+        self.hashes = defaultdict(dict)
+
+    def hincrby(self, key, field, amount):
+        self.hashes[key][field] = int(self.hashes[key].get(field, 0)) + amount
+        return self.hashes[key][field]
+
+    def hgetall(self, key):
+        return {field.encode(): str(value).encode() for field, value in self.hashes[key].items()}
+
+    def hsetnx(self, key, field, value):
+        return self.hashes[key].setdefault(field, value) == value
+
+
+@pytest.fixture(params=['redis', 'shared-memory'])
+def workers(request, tmp_path, monkeypatch):
+    """
+    Two channels on the same store: the one of this process and the one of another worker.
+    """
+    if request.param == 'redis':
+        client = RedisStandIn()
+        writer, reader = RedisChannel(client, poll_interval=0), RedisChannel(client, poll_interval=0)
+    else:
+        path = str(tmp_path / 'versions')
+        writer, reader = SharedMemoryChannel(path), SharedMemoryChannel(path)
+    # Restored after the test
+    monkeypatch.setattr(invalidation, '_channel', invalidation._channel)
+    monkeypatch.setattr(invalidation, '_covers_workers', invalidation._covers_workers)
+    configure_invalidation_channel(writer, workers=2)
+    assert invalidation.versions_cover_workers()
+    return writer, reader
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+    return engine
+
+
+def test_commit_bumps_the_versions_seen_by_other_workers(engine, workers):
+    writer, reader = workers
+    epoch, before = reader.epoch(), reader.version('plants')
+    with Session(engine) as session:
+        session.execute(insert(plants).values(id=1))
+        session.commit()
+    assert reader.version('plants') == before + 1
+    assert reader.version('ideas') == 0
+    assert reader.epoch() == epoch
+
+
+def test_rollback_bumps_nothing(engine, workers):
+    writer, reader = workers
+    with Session(engine) as session:
+        session.execute(insert(plants).values(id=1))
+        session.rollback()
+    assert reader.version('plants') == 0
+
+
+def test_savepoint_is_bumped_with_the_committed_transaction(engine, workers):
+    writer, reader = workers
+    with Session(engine) as session:
+        session.execute(insert(ideas).values(id=1))
+        with session.begin_nested():
+            session.execute(insert(plants).values(id=1))
+        # Released only: the other workers must not see it before the commit
+        assert reader.version('plants') == 0
+        rolled_back = session.begin_nested()
+        session.execute(insert(plants).values(id=2))
+        rolled_back.rollback()
+        session.commit()
+    assert reader.version('plants') == 1
+    assert reader.version('ideas') == 1
+
+
+def test_unreachable_redis_makes_versions_unknown():
+    class Down:
+        def __getattr__(self, name):
+            def fail(*args, **kwargs):
+                raise ConnectionError('down')
+            return fail
+
+    channel = RedisChannel(Down(), poll_interval=0)
+    assert channel.version('plants') is None
+    assert channel.epoch() is None
@@ -0,0 +1,74 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.api.endpoints.plant import PlantRouter
+from app.db.base import get_db_session
+from app.db.models import PlantModel
+from app.utils.database import encode_cursor
+
+
+@pytest.fixture
+def client(database):
+    with Session(database) as session:
+        # A1, B1, A2, B2, ... A6, B6: ids 1 to 12
+        for number in range(1, 7):
+            session.add(PlantModel(name=f'A{number}'))
+            session.add(PlantModel(name=f'B{number}'))
+        session.commit()
+
+    def get_test_session():
+        with Session(database, expire_on_commit=False) as session:
+            yield session
+            session.commit()
+
+    app = FastAPI()
+    app.include_router(PlantRouter().router, prefix='/plants')
+    app.dependency_overrides[get_db_session] = get_test_session
+    return TestClient(app)
+
+
+def ids(body):
+    return [item['id'] for item in body['content']]
+
+
+def test_cursors_walk_the_pages_both_ways(client):
+    first = client.get('/plants', params={'items_per_page': 5}).json()
+    assert ids(first) == [1, 2, 3, 4, 5]
+    assert (first['page'], first['total'], first['previous_cursor']) == (1, 12, None)
+
+    second = client.get('/plants', params={'items_per_page': 5, 'after': first['next_cursor']}).json()
+    assert ids(second) == [6, 7, 8, 9, 10]
+    # Neither page number nor count past the first page
+    assert (second['page'], second['total']) == (None, None)
+
+    last = client.get('/plants', params={'items_per_page': 5, 'after': second['next_cursor']}).json()
+    assert ids(last) == [11, 12]
+    assert last['next_cursor'] is None
+
+    back = client.get('/plants', params={'items_per_page': 5, 'before': last['previous_cursor']}).json()
+    assert ids(back) == [6, 7, 8, 9, 10]
+    back = client.get('/plants', params={'items_per_page': 5, 'before': back['previous_cursor']}).json()
+    assert ids(back) == [1, 2, 3, 4, 5]
+    assert back['previous_cursor'] is None
+
+
+def test_cursors_keep_the_filters(client):
+    params = {'items_per_page': 2, 'name__startswith': 'A'}
+    first = client.get('/plants', params=params).json()
+    assert ids(first) == [1, 3]
+    assert first['total'] == 6
+
+    second = client.get('/plants', params={**params, 'after': first['next_cursor']}).json()
+    assert ids(second) == [5, 7]
+    back = client.get('/plants', params={**params, 'before': second['previous_cursor']}).json()
+    assert ids(back) == [1, 3]
+
+
+@pytest.mark.parametrize('cursor', ['not a cursor', encode_cursor(['A1']), encode_cursor([True]), 'e30'])
+def test_malformed_cursors_are_rejected(client, cursor):
+    for parameter in ('after', 'before'):
+        response = client.get('/plants', params={parameter: cursor})
+        assert response.status_code == 400
+        assert parameter in response.json()['detail']
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session, select
+
+from app.db.models import RatingMatrixModel, RatingWeightSetModel, RescoreJobModel
+from app.db.scoring import RESCORE_JOB_STALE_AFTER, rescore_job_status, start_rescore_job
+
+
+@pytest.fixture
+def session_factory(database):
+    with Session(database) as session:
+        session.add(RatingWeightSetModel(name='Quality first', quality=3))
+        session.add(RatingMatrixModel(quality=2, ehs=1))
+        session.commit()
+    return lambda: Session(database)
+
+
+def test_one_job_at_a_time_across_processes(session_factory):
+    job = start_rescore_job(session_factory, 1)
+    # Whichever worker asks, the pending job is in the way
+    assert start_rescore_job(session_factory, 1) is None
+
+    job.run()
+    with session_factory() as session:
+        assert session.exec(select(RatingMatrixModel.total_score)).all() == [7]
+        status = rescore_job_status(session, job.id)
+    assert (status['status'], status['processed'], status['total'], status['error']) == ('done', 1, 1, None)
+    assert start_rescore_job(session_factory, 1) is not None
+
+
+def test_failed_job_is_recorded(session_factory):
+    job = start_rescore_job(session_factory, 99)
+    job.run()
+    with session_factory() as session:
+        status = rescore_job_status(session, job.id)
+        assert rescore_job_status(session, 'unknown') is None
+    assert status['status'] == 'failed' and 'not found' in status['error']
+    assert start_rescore_job(session_factory, 1) is not None
+
+
+def test_abandoned_job_no_longer_blocks(session_factory):
+    abandoned = start_rescore_job(session_factory, 1)
+    with session_factory() as session:
+        row = session.get(RescoreJobModel, abandoned.id)
+        row.heartbeat_at = datetime.now() - timedelta(seconds=RESCORE_JOB_STALE_AFTER + 1)
+        session.commit()
+
+    assert start_rescore_job(session_factory, 1) is not None
+    with session_factory() as session:
+        assert rescore_job_status(session, abandoned.id)['status'] == 'failed'
@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.db import unit_of_work
+from app.db.unit_of_work import after_commit, written_tables
+
+metadata = MetaData()
+plants = Table('plants', metadata, Column('id', Integer, primary_key=True))
+ideas = Table('ideas', metadata, Column('id', Integer, primary_key=True))
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def published(monkeypatch):
+    committed = []
+    monkeypatch.setattr(unit_of_work, '_commit_listeners', [committed.append])
+    return committed
+
+
+def test_commit_publishes_written_tables_and_runs_callbacks(engine, published):
+    ran = []
+    with Session(engine) as session:
+        session.execute(insert(plants).values(id=1))
+        after_commit(session, lambda: ran.append('callback'))
+        assert written_tables(session) == {'plants'}
+        session.commit()
+    assert published == [{'plants'}]
+    assert ran == ['callback']
+
+
+def test_rollback_publishes_nothing(engine, published):
+    ran = []
+    with Session(engine) as session:
+        session.execute(insert(plants).values(id=1))
+        after_commit(session, lambda: ran.append('callback'))
+        session.rollback()
+        session.commit()
+    assert published == []
+    assert ran == []
+
+
+def test_released_savepoint_is_published_with_the_transaction(engine, published):
+    ran = []
+    with Session(engine) as session:
+        session.execute(insert(ideas).values(id=1))
+        with session.begin_nested():
+            session.execute(insert(plants).values(id=1))
+            after_commit(session, lambda: ran.append('callback'))
+        # Released, not committed yet
+        assert published == [] and ran == []
+        assert written_tables(session) == {'ideas', 'plants'}
+        session.commit()
+    assert published == [{'ideas', 'plants'}]
+    assert ran == ['callback']
+
+
+def test_released_savepoint_is_dropped_with_the_transaction(engine, published):
+    ran = []
+    with Session(engine) as session:
+        with session.begin_nested():
+            session.execute(insert(plants).values(id=1))
+            after_commit(session, lambda: ran.append('callback'))
+        session.rollback()
+    assert published == []
+    assert ran == []
+
+
+def test_rolled_back_savepoint_only_drops_its_own_work(engine, published):
+    ran = []
+    with Session(engine) as session:
+        session.execute(insert(ideas).values(id=1))
+        after_commit(session, lambda: ran.append('transaction'))
+        savepoint = session.begin_nested()
+        session.execute(insert(plants).values(id=1))
+        after_commit(session, lambda: ran.append('savepoint'))
+        savepoint.rollback()
+        assert written_tables(session) == {'ideas'}
+        session.commit()
+    assert published == [{'ideas'}]
+    assert ran == ['transaction']
+
+
+def test_nested_savepoints_merge_into_their_parent(engine, published):
+    with Session(engine) as session:
+        with session.begin_nested():
+            session.execute(insert(ideas).values(id=1))
+            inner = session.begin_nested()
+            session.execute(insert(plants).values(id=1))
+            inner.rollback()
+        session.commit()
+    assert published == [{'ideas'}]
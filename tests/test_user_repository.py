@@ -0,0 +1,54 @@
+from sqlmodel import Session, select
+
+from app.db.models import RoleModel, UserBatchRow, UserModel
+from app.db.models.associations import UserRoleLink
+from app.db.repositories.user import UserRepository
+
+
+def user_row(number: int, **values) -> UserBatchRow:
+    return UserBatchRow(
+        te_id=f'TE{number}', first_name='First', last_name='Last', email=f'user{number}@te.com', hashed_password='-', **values
+    )
+
+
+def roles(session: Session):
+    return sorted(session.exec(select(UserModel.te_id, UserRoleLink.role_id).join(UserRoleLink)).all())
+
+
+def add_roles(session: Session) -> None:
+    session.add(RoleModel(id=1, name='submitter'))
+    session.add(RoleModel(id=2, name='committee'))
+    session.commit()
+
+
+def test_batch_insert_links_the_roles(database):
+    with Session(database) as session:
+        add_roles(session)
+        result = UserRepository().insert_many(session, [user_row(1, role_id=1), user_row(2, role_id=99), user_row(3)])
+        session.commit()
+
+        assert [(conflict.index, conflict.detail) for conflict in result.conflicts] == [(1, "Unknown role 99")]
+        assert len(result.created) == 2
+        assert roles(session) == [('TE1', 1)]
+
+
+def test_batch_upsert_replaces_the_roles_of_existing_users(database):
+    repository = UserRepository()
+    with Session(database) as session:
+        add_roles(session)
+        repository.insert_many(session, [user_row(1, role_id=1), user_row(2, role_id=1)])
+        session.commit()
+
+        result = repository.upsert_many(session, [
+            UserBatchRow(te_id='TE1', first_name='First', last_name='Last', email='user1@te.com', role_id=2),
+            UserBatchRow(te_id='TE2', first_name='First', last_name='Last', email='user2@te.com', role_id=1),
+            user_row(3, role_id=2),
+        ])
+        session.commit()
+
+        assert result.conflicts == []
+        assert roles(session) == [('TE1', 2), ('TE2', 1), ('TE3', 2)]
+        # Only the user whose role changed loses its tokens
+        assert sorted(session.exec(select(UserModel.te_id, UserModel.token_version)).all()) == [
+            ('TE1', 1), ('TE2', 0), ('TE3', 0)
+        ]